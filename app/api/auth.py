@@ -2,6 +2,7 @@ import asyncio
 
 from ..model.wallet import Wallet
 from ..service.auth_service import AuthService
+from ..service.chat_service import ChatService
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from ..config.database import get_db
@@ -500,6 +501,10 @@ async def update_profile(
         if hasattr(current_user, key):
             setattr(current_user, key, value)
 
+    # O nome também fica copiado nas salas de chat
+    if "full_name" in update_data:
+        ChatService(db).update_participant_name(current_user)
+
     try:
         db.commit()
         db.refresh(current_user)
@@ -1,5 +1,6 @@
 import json
 from datetime import datetime
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
@@ -38,6 +39,9 @@ async def create_chat_room(
     if not success:
         raise HTTPException(status_code=400, detail=message)
 
+    # Título do job guardado na sala: a lista de chats não consulta blockchain/IPFS
+    await service.ensure_room_summaries([room])
+
     return APIResponse.success_response(
         data={
             "room_id": room.id,
@@ -58,7 +62,7 @@ async def get_user_chat_rooms(
         db: Session = Depends(get_db)
 ):
     service = ChatService(db)
-    rooms = service.get_user_rooms(current_user.id, only_active)
+    rooms = await service.get_user_rooms(current_user.id, only_active)
 
     return APIResponse.success_response(
         data={
@@ -74,16 +78,24 @@ async def get_room_messages(
     room_id: str,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     service = ChatService(db)
 
-    success, message, messages = service.get_room_messages(
+    before = None
+    if cursor:
+        before = ChatService.decode_cursor(cursor)
+        if not before:
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    success, message, messages, next_cursor = service.get_room_messages(
         room_id=room_id,
         user_id=current_user.id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        before=before
     )
 
     if not success:
@@ -95,7 +107,9 @@ async def get_room_messages(
             "messages": messages,
             "total": len(messages),
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
         },
         message="Mensagens recuperadas com sucesso"
     )
@@ -117,29 +131,10 @@ async def get_room_info(
         if room.client_id != current_user.id and room.provider_id != current_user.id:
             raise HTTPException(status_code=403, detail="Sem permissão para acessar esta sala")
 
-        # Buscar título do job no IPFS
-        job_title = 'Chat'
-        try:
-            from ..model.bico_certo_main import BicoCerto
-            from app.service.ipfs_service import IPFSService
-
-            bico_certo = BicoCerto()
-            job_obj = bico_certo.get_job(bytes.fromhex(room.job_id))
-
-            if hasattr(job_obj, 'ipfs_hash') and job_obj.ipfs_hash:
-                ipfs_service = IPFSService()
-                success, _, ipfs_data = ipfs_service.get_job_data(job_obj.ipfs_hash)
+        await ChatService(db).ensure_room_summaries([room])
+        summary = ChatService.room_summary(room, current_user.id)
 
-                if success and ipfs_data:
-                    job_title = ipfs_data.get('data', {}).get('title', 'Chat')
-                    if job_title:
-                        job_title = job_title.title()
-        except Exception as e:
-            print(f"Erro ao buscar título do IPFS: {e}")
-
-        # Buscar dados do outro participante
-        other_user_id = room.provider_id if room.client_id == current_user.id else room.client_id
-        other_user = db.query(User).filter(User.id == other_user_id).first()
+        job_title = room.job_title.title() if room.job_title else 'Chat'
 
         return APIResponse.success_response(
             data={
@@ -147,11 +142,7 @@ async def get_room_info(
                 "job_id": room.job_id,
                 "job_title": job_title,
                 "is_active": room.is_active,
-                "other_user": {
-                    "id": other_user.id if other_user else None,
-                    "name": other_user.full_name if other_user else "Usuário",
-                    "email": other_user.email if other_user else None
-                } if other_user else None
+                "other_user": summary["other_user"] if summary["other_user"]["id"] else None
             },
             message="Informações da sala recuperadas"
         )
@@ -162,6 +153,27 @@ async def get_room_info(
         raise HTTPException(status_code=500, detail=f"Erro ao buscar informações: {str(e)}")
 
 
+@router.get("/room/{room_id}/online", response_model=APIResponse)
+async def get_room_online_users(
+        room_id: str,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Usuários conectados à sala (em qualquer worker), com o número de dispositivos de cada um"""
+    room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+
+    if not room:
+        raise HTTPException(status_code=404, detail="Sala não encontrada")
+
+    if room.client_id != current_user.id and room.provider_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Sem permissão para acessar esta sala")
+
+    return APIResponse.success_response(
+        data={"online_users": await chat_handler.manager.get_room_users(room_id)},
+        message="Usuários online recuperados"
+    )
+
+
 @router.post("/send", response_model=APIResponse)
 async def send_message(
         request: SendMessageRequest,
@@ -438,9 +450,10 @@ async def websocket_notifications_endpoint(
             await websocket.close(code=4001, reason="No user_id in token")
             return
 
-        await notifications_manager.connect(user_id, websocket)
+        # Envios passam pela fila da conexão, na ordem, sem concorrer com os broadcasts
+        outbound = await notifications_manager.connect(user_id, websocket)
 
-        await websocket.send_json({
+        outbound.send({
             "type": "connected",
             "user_id": user_id,
             "timestamp": datetime.now(fuso_local).isoformat()
@@ -451,7 +464,7 @@ async def websocket_notifications_endpoint(
             data = await websocket.receive_text()
 
             if data == "ping":
-                await websocket.send_json({"type": "pong"})
+                outbound.send({"type": "pong"})
 
     except Exception as e:
         try:
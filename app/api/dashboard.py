@@ -1,24 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Dict, Any, Iterable
 from datetime import datetime, timedelta
-from collections import defaultdict
+from io import BytesIO
 
-from starlette.responses import StreamingResponse
+from starlette.responses import StreamingResponse, FileResponse
+from web3 import Web3
 
 from app.auth.dependencies import get_current_user
-from app.service.ipfs_service import IPFSService
-from app.model.bico_certo_main import BicoCerto, JobStatus
+from app.config.settings import fuso_local
+from app.service.async_ipfs_client import async_ipfs
+from app.service.dashboard_stats import DashboardStats
+from app.model.bico_certo_main import AsyncBicoCerto, JobStatus, ProposalStatus
+from app.model.job_index import IndexedJob, IndexedProposal
 from app.model.wallet import Wallet
+from app.model.export_job import ExportJob, ExportStatus
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.model.user import User
-from app.service.report_generator import ReportGenerator
+from app.service.export_service import export_service, EXPORT_FORMATS
+from app.service.job_history_export import HISTORY_FORMATS, STREAMERS
 from app.util.responses import APIResponse
 
 router = APIRouter(prefix="/api", tags=["dashboard"])
 
-bico_certo = BicoCerto()
-ipfs_service = IPFSService()
+async_bico_certo = AsyncBicoCerto()
 
 
 @router.get("/provider/dashboard")
@@ -28,181 +36,49 @@ async def get_provider_dashboard(
 ):
     """Dashboard completo do prestador"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
-
-        user_address = wallet.address
-        user_jobs = bico_certo.contract.functions.getUserJobs(user_address).call()
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "provider")
 
         # Usa a nova função getProviderProfile para obter dados como Provider
-        provider_profile = bico_certo.contract.functions.getProviderProfile(user_address).call()
-        # provider_profile retorna: (averageRating, totalRatings, totalJobs, totalEarned)
-        average_rating = provider_profile[0] / 100.0  # Converte de 425 para 4.25
-        total_ratings = provider_profile[1]
-        total_jobs_completed = provider_profile[2]
-        total_earned_wei = provider_profile[3]
-
-        provider_jobs = []
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[2].lower() == user_address.lower():
-                    provider_jobs.append({
-                        'id': job_id,
-                        'data': job_data
-                    })
-            except Exception:
-                continue
-
-        active_jobs = sum(
-            1 for job in provider_jobs
-            if JobStatus(job['data'][9]) in [JobStatus.ACCEPTED, JobStatus.IN_PROGRESS]
-        )
-
-        completed_jobs = sum(
-            1 for job in provider_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        )
-
-        total_earnings = sum(
-            float(bico_certo.w3.from_wei(job['data'][3], 'ether'))
-            for job in provider_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        )
-
-        now = datetime.now()
-        last_month_start = now - timedelta(days=30)
-        previous_month_start = now - timedelta(days=60)
-
-        last_month_completed = sum(
-            1 for job in provider_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-            and job['data'][7] > 0
-            and datetime.fromtimestamp(job['data'][7]) >= last_month_start
-        )
-
-        previous_month_completed = sum(
-            1 for job in provider_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-            and job['data'][7] > 0
-            and previous_month_start <= datetime.fromtimestamp(job['data'][7]) < last_month_start
-        )
+        provider_profile = await async_bico_certo.get_provider_profile(wallet.address)
 
-        if previous_month_completed > 0:
-            jobs_trend = ((last_month_completed - previous_month_completed) / previous_month_completed) * 100
-        else:
-            jobs_trend = 100 if last_month_completed > 0 else 0
-
-        last_month_earnings = sum(
-            float(bico_certo.w3.from_wei(job['data'][3], 'ether'))
-            for job in provider_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-            and job['data'][7] > 0
-            and datetime.fromtimestamp(job['data'][7]) >= last_month_start
-        )
-
-        previous_month_earnings = sum(
-            float(bico_certo.w3.from_wei(job['data'][3], 'ether'))
-            for job in provider_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-            and job['data'][7] > 0
-            and previous_month_start <= datetime.fromtimestamp(job['data'][7]) < last_month_start
-        )
-
-        if previous_month_earnings > 0:
-            earnings_trend = ((last_month_earnings - previous_month_earnings) / previous_month_earnings) * 100
-        else:
-            earnings_trend = 100 if last_month_earnings > 0 else 0
-
-        monthly_earnings = _calculate_monthly_data(provider_jobs, is_provider=True)
-        category_performance = _calculate_category_performance(provider_jobs)
-        recent_activity = _calculate_recent_activity(provider_jobs, days=7)
-
-        try:
-            proposal_ids = bico_certo.contract.functions.getProviderProposals(user_address).call()
-            pending_proposals = 0
-            total_proposals = len(proposal_ids)
-            accepted_proposals = 0
-
-            for proposal_id in proposal_ids:
-                try:
-                    proposal_data = bico_certo.contract.functions.getProposal(proposal_id).call()
-                    status = proposal_data[6]
-                    if status == 1:
-                        pending_proposals += 1
-                    elif status == 2:
-                        accepted_proposals += 1
-                except:
-                    continue
-
-            proposal_acceptance_rate = int((accepted_proposals / total_proposals * 100) if total_proposals > 0 else 0)
-        except Exception:
-            pending_proposals = 0
-            proposal_acceptance_rate = 0
-
-        motivation_message = _get_motivation_message(
-            average_rating=average_rating,
-            jobs_trend=jobs_trend,
-            earnings_trend=earnings_trend,
-            completed_jobs=completed_jobs,
-            proposal_acceptance_rate=proposal_acceptance_rate
-        )
-
-        completed_job_list = [
-            job for job in provider_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        ]
+        return APIResponse.success_response(
+            data=_build_provider_dashboard(db, stats, wallet.address, provider_profile),
+            message="Dashboard carregado com sucesso"
+        ).model_dump()
 
-        average_job_value = (total_earnings / len(completed_job_list)) if completed_job_list else 0
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar dashboard: {str(e)}")
 
-        delivery_times = []
-        for job in completed_job_list:
-            job_data = job['data']
-            accepted_at = job_data[6]
-            completed_at = job_data[7]
-            if accepted_at > 0 and completed_at > 0:
-                days = (completed_at - accepted_at) / 86400
-                delivery_times.append(days)
 
-        average_delivery_time = sum(delivery_times) / len(delivery_times) if delivery_times else 0
+@router.get("/provider/dashboard/bundle")
+async def get_provider_dashboard_bundle(
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db),
+        months: int = 6
+):
+    """
+    Todas as seções da tela inicial do prestador (dashboard, quick-stats,
+    earnings e categories) calculadas sobre uma única leitura dos agregados
+    """
+    try:
+        wallet = _get_wallet(db, current_user)
 
-        highest_earning = max(
-            (float(bico_certo.w3.from_wei(job['data'][3], 'ether')) for job in completed_job_list),
-            default=0
+        stats, provider_profile = await asyncio.gather(
+            _load_stats(db, wallet.address, "provider"),
+            async_bico_certo.get_provider_profile(wallet.address)
         )
 
-        last_job_date = None
-        if completed_job_list:
-            latest_job = max(completed_job_list, key=lambda j: j['data'][7])
-            last_job_date = datetime.fromtimestamp(latest_job['data'][7]).strftime('%Y-%m-%d')
-
-        unique_clients = set(job['data'][1] for job in completed_job_list)
+        dashboard = _build_provider_dashboard(db, stats, wallet.address, provider_profile)
 
         return APIResponse.success_response(
             data={
-                "completedJobs": completed_jobs,
-                "totalEarnings": total_earnings,
-                "averageRating": round(average_rating, 2),  # Usa a média do Provider
-                "totalRatings": total_ratings,  # Número total de avaliações
-                "proposalAcceptanceRate": proposal_acceptance_rate,
-                "activeJobs": active_jobs,
-                "pendingProposals": pending_proposals,
-                "monthlyEarnings": monthly_earnings,
-                "jobsByCategory": category_performance,
-                "recentActivity": recent_activity,
-                "trends": {
-                    "jobsTrend": round(jobs_trend, 1),
-                    "earningsTrend": round(earnings_trend, 1),
-                    "motivationMessage": motivation_message
-                },
-                "metrics": {
-                    "averageJobValue": round(average_job_value, 2),
-                    "averageDeliveryTime": round(average_delivery_time, 1),
-                    "totalClients": len(unique_clients),
-                    "highestEarningJob": round(highest_earning, 2),
-                    "lastJobDate": last_job_date
-                }
+                "dashboard": dashboard,
+                "quickStats": _build_provider_quick_stats(stats, provider_profile[0] / 100.0),
+                "earnings": stats.monthly(months),
+                "categories": dashboard["jobsByCategory"]
             },
             message="Dashboard carregado com sucesso"
         ).model_dump()
@@ -220,43 +96,15 @@ async def get_provider_quick_stats(
 ):
     """Estatísticas rápidas do prestador"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
-
-        user_address = wallet.address
-        user_jobs = bico_certo.contract.functions.getUserJobs(user_address).call()
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "provider")
 
         # Usa getProviderAverageRating para obter apenas a média
-        average_rating_raw = bico_certo.contract.functions.getProviderAverageRating(user_address).call()
+        average_rating_raw = await async_bico_certo.get_provider_average_rating(wallet.address)
         average_rating = average_rating_raw / 100.0  # Converte de 425 para 4.25
 
-        active_jobs = 0
-        completed_jobs = 0
-        total_earnings = 0.0
-
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[2].lower() != user_address.lower():
-                    continue
-
-                status = JobStatus(job_data[9])
-                if status in [JobStatus.ACCEPTED, JobStatus.IN_PROGRESS]:
-                    active_jobs += 1
-                elif status == JobStatus.APPROVED:
-                    completed_jobs += 1
-                    total_earnings += float(bico_certo.w3.from_wei(job_data[3], 'ether'))
-            except Exception:
-                continue
-
         return APIResponse.success_response(
-            data={
-                "activeJobs": active_jobs,
-                "completedJobs": completed_jobs,
-                "totalEarnings": total_earnings,
-                "rating": round(average_rating, 2)
-            }
+            data=_build_provider_quick_stats(stats, average_rating)
         ).model_dump()
 
     except HTTPException:
@@ -273,24 +121,10 @@ async def get_provider_earnings(
 ):
     """Ganhos mensais do prestador"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
-
-        user_jobs = bico_certo.contract.functions.getUserJobs(wallet.address).call()
-
-        provider_jobs = []
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[2].lower() == wallet.address.lower():
-                    provider_jobs.append({'id': job_id, 'data': job_data})
-            except:
-                continue
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "provider")
 
-        monthly_data = _calculate_monthly_data(provider_jobs, is_provider=True, months=months)
-
-        return APIResponse.success_response(data=monthly_data).model_dump()
+        return APIResponse.success_response(data=stats.monthly(months)).model_dump()
 
     except HTTPException:
         raise
@@ -305,24 +139,10 @@ async def get_provider_categories(
 ):
     """Performance por categoria"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
-
-        user_jobs = bico_certo.contract.functions.getUserJobs(wallet.address).call()
-
-        provider_jobs = []
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[2].lower() == wallet.address.lower():
-                    provider_jobs.append({'id': job_id, 'data': job_data})
-            except:
-                continue
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "provider")
 
-        categories = _calculate_category_performance(provider_jobs)
-
-        return APIResponse.success_response(data=categories).model_dump()
+        return APIResponse.success_response(data=stats.by_category("earnings")).model_dump()
 
     except HTTPException:
         raise
@@ -337,126 +157,15 @@ async def export_provider_dashboard_pdf(
 ):
     """Exporta dashboard do prestador em PDF"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
-
-        user_address = wallet.address
-        user_jobs = bico_certo.contract.functions.getUserJobs(user_address).call()
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "provider")
 
         # Usa getProviderProfile
-        provider_profile = bico_certo.contract.functions.getProviderProfile(user_address).call()
-        average_rating = provider_profile[0] / 100.0
-
-        provider_jobs = []
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[2].lower() == user_address.lower():
-                    provider_jobs.append({'id': job_id, 'data': job_data})
-            except:
-                continue
-
-        active_jobs = sum(
-            1 for job in provider_jobs if JobStatus(job['data'][9]) in [JobStatus.ACCEPTED, JobStatus.IN_PROGRESS])
-        completed_jobs = sum(1 for job in provider_jobs if JobStatus(job['data'][9]) == JobStatus.APPROVED)
-        total_earnings = sum(float(bico_certo.w3.from_wei(job['data'][3], 'ether')) for job in provider_jobs if
-                             JobStatus(job['data'][9]) == JobStatus.APPROVED)
-
-        now = datetime.now()
-        last_month_start = now - timedelta(days=30)
-        previous_month_start = now - timedelta(days=60)
-
-        last_month_completed = sum(1 for job in provider_jobs if
-                                   JobStatus(job['data'][9]) == JobStatus.APPROVED and job['data'][
-                                       7] > 0 and datetime.fromtimestamp(job['data'][7]) >= last_month_start)
-        previous_month_completed = sum(1 for job in provider_jobs if
-                                       JobStatus(job['data'][9]) == JobStatus.APPROVED and job['data'][
-                                           7] > 0 and previous_month_start <= datetime.fromtimestamp(
-                                           job['data'][7]) < last_month_start)
-
-        jobs_trend = ((
-                              last_month_completed - previous_month_completed) / previous_month_completed) * 100 if previous_month_completed > 0 else 100 if last_month_completed > 0 else 0
-
-        last_month_earnings = sum(float(bico_certo.w3.from_wei(job['data'][3], 'ether')) for job in provider_jobs if
-                                  JobStatus(job['data'][9]) == JobStatus.APPROVED and job['data'][
-                                      7] > 0 and datetime.fromtimestamp(job['data'][7]) >= last_month_start)
-        previous_month_earnings = sum(float(bico_certo.w3.from_wei(job['data'][3], 'ether')) for job in provider_jobs if
-                                      JobStatus(job['data'][9]) == JobStatus.APPROVED and job['data'][
-                                          7] > 0 and previous_month_start <= datetime.fromtimestamp(
-                                          job['data'][7]) < last_month_start)
-
-        earnings_trend = ((
-                                  last_month_earnings - previous_month_earnings) / previous_month_earnings) * 100 if previous_month_earnings > 0 else 100 if last_month_earnings > 0 else 0
-
-        proposal_ids = bico_certo.contract.functions.getProviderProposals(user_address).call()
-        pending_proposals = 0
-        accepted_proposals = 0
-        for proposal_id in proposal_ids:
-            try:
-                proposal_data = bico_certo.contract.functions.getProposal(proposal_id).call()
-                if proposal_data[6] == 1:
-                    pending_proposals += 1
-                elif proposal_data[6] == 2:
-                    accepted_proposals += 1
-            except:
-                continue
-
-        proposal_acceptance_rate = int((accepted_proposals / len(proposal_ids) * 100) if len(proposal_ids) > 0 else 0)
-
-        completed_job_list = [
-            job for job in provider_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        ]
-
-        average_job_value = (total_earnings / len(completed_job_list)) if completed_job_list else 0
-
-        delivery_times = []
-        for job in completed_job_list:
-            job_data = job['data']
-            accepted_at = job_data[6]
-            completed_at = job_data[7]
-            if accepted_at > 0 and completed_at > 0:
-                days = (completed_at - accepted_at) / 86400
-                delivery_times.append(days)
-
-        average_delivery_time = sum(delivery_times) / len(delivery_times) if delivery_times else 0
-
-        highest_earning = max(
-            (float(bico_certo.w3.from_wei(job['data'][3], 'ether')) for job in completed_job_list),
-            default=0
-        )
-
-        last_job_date = None
-        if completed_job_list:
-            latest_job = max(completed_job_list, key=lambda j: j['data'][7])
-            last_job_date = datetime.fromtimestamp(latest_job['data'][7]).strftime('%Y-%m-%d')
-
-        unique_clients = set(job['data'][1] for job in completed_job_list)
-
-        dashboard_data = {
-            "completedJobs": completed_jobs,
-            "totalEarnings": total_earnings,
-            "averageRating": round(average_rating, 2),
-            "proposalAcceptanceRate": proposal_acceptance_rate,
-            "activeJobs": active_jobs,
-            "pendingProposals": pending_proposals,
-            "monthlyEarnings": _calculate_monthly_data(provider_jobs, is_provider=True),
-            "jobsByCategory": _calculate_category_performance(provider_jobs),
-            "trends": {
-                "jobsTrend": round(jobs_trend, 1),
-                "earningsTrend": round(earnings_trend, 1),
-            },
-            "metrics": {
-                "averageJobValue": round(average_job_value, 2),
-                "averageDeliveryTime": round(average_delivery_time, 1),
-                "totalClients": len(unique_clients),
-                "highestEarningJob": round(highest_earning, 2),
-                "lastJobDate": last_job_date
-            }
-        }
+        provider_profile = await async_bico_certo.get_provider_profile(wallet.address)
+        dashboard_data = _build_provider_dashboard(db, stats, wallet.address, provider_profile)
 
-        pdf_buffer = ReportGenerator.generate_provider_pdf(dashboard_data, current_user.full_name)
+        # Renderização no pool de processos: não trava o event loop
+        pdf_buffer = BytesIO(await export_service.render("provider_pdf", dashboard_data, current_user.full_name))
 
         filename = f"dashboard_prestador_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
@@ -477,126 +186,15 @@ async def export_provider_dashboard_excel(
 ):
     """Exporta dashboard do prestador em Excel"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
-
-        user_address = wallet.address
-        user_jobs = bico_certo.contract.functions.getUserJobs(user_address).call()
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "provider")
 
         # Usa getProviderProfile
-        provider_profile = bico_certo.contract.functions.getProviderProfile(user_address).call()
-        average_rating = provider_profile[0] / 100.0
-
-        provider_jobs = []
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[2].lower() == user_address.lower():
-                    provider_jobs.append({'id': job_id, 'data': job_data})
-            except:
-                continue
-
-        active_jobs = sum(
-            1 for job in provider_jobs if JobStatus(job['data'][9]) in [JobStatus.ACCEPTED, JobStatus.IN_PROGRESS])
-        completed_jobs = sum(1 for job in provider_jobs if JobStatus(job['data'][9]) == JobStatus.APPROVED)
-        total_earnings = sum(float(bico_certo.w3.from_wei(job['data'][3], 'ether')) for job in provider_jobs if
-                             JobStatus(job['data'][9]) == JobStatus.APPROVED)
-
-        now = datetime.now()
-        last_month_start = now - timedelta(days=30)
-        previous_month_start = now - timedelta(days=60)
-
-        last_month_completed = sum(1 for job in provider_jobs if
-                                   JobStatus(job['data'][9]) == JobStatus.APPROVED and job['data'][
-                                       7] > 0 and datetime.fromtimestamp(job['data'][7]) >= last_month_start)
-        previous_month_completed = sum(1 for job in provider_jobs if
-                                       JobStatus(job['data'][9]) == JobStatus.APPROVED and job['data'][
-                                           7] > 0 and previous_month_start <= datetime.fromtimestamp(
-                                           job['data'][7]) < last_month_start)
-
-        jobs_trend = ((
-                              last_month_completed - previous_month_completed) / previous_month_completed) * 100 if previous_month_completed > 0 else 100 if last_month_completed > 0 else 0
-
-        last_month_earnings = sum(float(bico_certo.w3.from_wei(job['data'][3], 'ether')) for job in provider_jobs if
-                                  JobStatus(job['data'][9]) == JobStatus.APPROVED and job['data'][
-                                      7] > 0 and datetime.fromtimestamp(job['data'][7]) >= last_month_start)
-        previous_month_earnings = sum(float(bico_certo.w3.from_wei(job['data'][3], 'ether')) for job in provider_jobs if
-                                      JobStatus(job['data'][9]) == JobStatus.APPROVED and job['data'][
-                                          7] > 0 and previous_month_start <= datetime.fromtimestamp(
-                                          job['data'][7]) < last_month_start)
-
-        earnings_trend = ((
-                                  last_month_earnings - previous_month_earnings) / previous_month_earnings) * 100 if previous_month_earnings > 0 else 100 if last_month_earnings > 0 else 0
-
-        proposal_ids = bico_certo.contract.functions.getProviderProposals(user_address).call()
-        pending_proposals = 0
-        accepted_proposals = 0
-        for proposal_id in proposal_ids:
-            try:
-                proposal_data = bico_certo.contract.functions.getProposal(proposal_id).call()
-                if proposal_data[6] == 1:
-                    pending_proposals += 1
-                elif proposal_data[6] == 2:
-                    accepted_proposals += 1
-            except:
-                continue
-
-        proposal_acceptance_rate = int((accepted_proposals / len(proposal_ids) * 100) if len(proposal_ids) > 0 else 0)
-
-        completed_job_list = [
-            job for job in provider_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        ]
-
-        average_job_value = (total_earnings / len(completed_job_list)) if completed_job_list else 0
-
-        delivery_times = []
-        for job in completed_job_list:
-            job_data = job['data']
-            accepted_at = job_data[6]
-            completed_at = job_data[7]
-            if accepted_at > 0 and completed_at > 0:
-                days = (completed_at - accepted_at) / 86400
-                delivery_times.append(days)
-
-        average_delivery_time = sum(delivery_times) / len(delivery_times) if delivery_times else 0
-
-        highest_earning = max(
-            (float(bico_certo.w3.from_wei(job['data'][3], 'ether')) for job in completed_job_list),
-            default=0
-        )
-
-        last_job_date = None
-        if completed_job_list:
-            latest_job = max(completed_job_list, key=lambda j: j['data'][7])
-            last_job_date = datetime.fromtimestamp(latest_job['data'][7]).strftime('%Y-%m-%d')
-
-        unique_clients = set(job['data'][1] for job in completed_job_list)
-
-        dashboard_data = {
-            "completedJobs": completed_jobs,
-            "totalEarnings": total_earnings,
-            "averageRating": round(average_rating, 2),
-            "proposalAcceptanceRate": proposal_acceptance_rate,
-            "activeJobs": active_jobs,
-            "pendingProposals": pending_proposals,
-            "monthlyEarnings": _calculate_monthly_data(provider_jobs, is_provider=True),
-            "jobsByCategory": _calculate_category_performance(provider_jobs),
-            "trends": {
-                "jobsTrend": round(jobs_trend, 1),
-                "earningsTrend": round(earnings_trend, 1),
-            },
-            "metrics": {
-                "averageJobValue": round(average_job_value, 2),
-                "averageDeliveryTime": round(average_delivery_time, 1),
-                "totalClients": len(unique_clients),
-                "highestEarningJob": round(highest_earning, 2),
-                "lastJobDate": last_job_date
-            }
-        }
+        provider_profile = await async_bico_certo.get_provider_profile(wallet.address)
+        dashboard_data = _build_provider_dashboard(db, stats, wallet.address, provider_profile)
 
-        excel_buffer = ReportGenerator.generate_provider_excel(dashboard_data, current_user.full_name)
+        # Renderização no pool de processos: não trava o event loop
+        excel_buffer = BytesIO(await export_service.render("provider_excel", dashboard_data, current_user.full_name))
 
         filename = f"dashboard_prestador_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
 
@@ -610,6 +208,42 @@ async def export_provider_dashboard_excel(
         raise HTTPException(status_code=500, detail=f"Erro ao gerar Excel: {str(e)}")
 
 
+@router.post("/provider/dashboard/export")
+async def create_provider_dashboard_export(
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db),
+        export_format: str = Query("pdf", alias="format", description="pdf ou excel")
+):
+    """
+    Inicia a exportação do dashboard do prestador em background.
+    O resultado é avisado pelo websocket de notificações (export_update) ou
+    consultado em /api/exports/{export_id}.
+    """
+    try:
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "provider")
+
+        provider_profile = await async_bico_certo.get_provider_profile(wallet.address)
+        dashboard_data = _build_provider_dashboard(db, stats, wallet.address, provider_profile)
+
+        return _submit_export(db, current_user, "provider", export_format, dashboard_data)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao iniciar exportação: {str(e)}")
+
+
+@router.get("/provider/jobs/export")
+async def export_provider_job_history(
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db),
+        export_format: str = Query("csv", alias="format", description="csv, ndjson ou xlsx")
+):
+    """Histórico completo de jobs do prestador, enviado em streaming"""
+    return await _stream_job_history(db, current_user, "provider", export_format)
+
+
 @router.get("/client/dashboard")
 async def get_client_dashboard(
         current_user: User = Depends(get_current_user),
@@ -617,88 +251,65 @@ async def get_client_dashboard(
 ):
     """Dashboard completo do cliente"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
-
-        user_address = wallet.address
-        user_jobs = bico_certo.contract.functions.getUserJobs(user_address).call()
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "client")
 
         # Usa getClientProfile para obter dados como Cliente
-        client_profile = bico_certo.contract.functions.getClientProfile(user_address).call()
-        # client_profile retorna: (averageRating, totalRatings, totalJobs, totalSpent)
-        client_average_rating = client_profile[0] / 100.0  # Converte de 425 para 4.25
-        client_total_ratings = client_profile[1]
-
-        client_jobs = []
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[1].lower() == user_address.lower() and JobStatus(job_data[9]) != JobStatus.CANCELLED:
-                    client_jobs.append({'id': job_id, 'data': job_data})
-            except Exception:
-                continue
-
-        active_jobs = sum(
-            1 for job in client_jobs
-            if JobStatus(job['data'][9]) in [
-                JobStatus.CREATED, JobStatus.OPEN, JobStatus.ACCEPTED,
-                JobStatus.IN_PROGRESS, JobStatus.COMPLETED
-            ]
-        )
+        client_profile = await async_bico_certo.get_client_profile(wallet.address)
 
-        completed_jobs = sum(
-            1 for job in client_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        )
+        data = _build_client_dashboard(stats, client_profile)
+        data["recentJobs"] = await _get_recent_jobs(db, wallet.address, limit=10, include_cancelled=False)
 
-        total_spent = sum(
-            float(bico_certo.w3.from_wei(job['data'][3] + job['data'][4], 'ether'))
-            for job in client_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        )
+        return APIResponse.success_response(
+            data=data,
+            message="Dashboard carregado com sucesso"
+        ).model_dump()
 
-        monthly_spending = _calculate_monthly_data(client_jobs, is_provider=False)
-        spending_by_category = _calculate_spending_by_category(client_jobs)
-        jobs_by_status = _calculate_jobs_by_status(client_jobs)
-        recent_jobs = _get_recent_jobs(client_jobs, limit=10, db=db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        approved_jobs = [
-            job for job in client_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        ]
-        average_job_cost = total_spent / len(approved_jobs) if approved_jobs else 0
 
-        completion_rate = int((completed_jobs / len(client_jobs) * 100) if client_jobs else 0)
+@router.get("/client/dashboard/bundle")
+async def get_client_dashboard_bundle(
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db),
+        months: int = 6,
+        limit: int = 10
+):
+    """
+    Todas as seções da tela inicial do cliente (dashboard, quick-stats,
+    spending e recent-jobs) calculadas sobre uma única leitura dos agregados
+    """
+    try:
+        wallet = _get_wallet(db, current_user)
 
-        pending_approvals = sum(
-            1 for job in client_jobs
-            if JobStatus(job['data'][9]) == JobStatus.COMPLETED
+        stats, client_profile = await asyncio.gather(
+            _load_stats(db, wallet.address, "client"),
+            async_bico_certo.get_client_profile(wallet.address)
         )
 
-        providers_hired = len(set(
-            job['data'][2] for job in client_jobs
-            if job['data'][2] != '0x0000000000000000000000000000000000000000'
-        ))
+        dashboard = _build_client_dashboard(stats, client_profile)
+
+        # Uma leitura para as duas listas; o dashboard não mostra os cancelados
+        window = max(limit, 10)
+        rows = _recent_job_rows(db, wallet.address, window)
+        active_rows = [row for row in rows if row.status != JobStatus.CANCELLED.value][:10]
+        if len(active_rows) < 10 and len(rows) == window:
+            # Cancelados ocuparam a janela: pode haver ativos mais antigos
+            active_rows = _recent_job_rows(db, wallet.address, 10, include_cancelled=False)
+
+        formatted = await _format_recent_jobs(db, {row.id: row for row in rows + active_rows}.values())
+        dashboard["recentJobs"] = [formatted[row.id] for row in active_rows if row.id in formatted]
+        recent_jobs = [formatted[row.id] for row in rows[:limit] if row.id in formatted]
 
         return APIResponse.success_response(
             data={
-                "activeJobs": active_jobs,
-                "completedJobs": completed_jobs,
-                "totalSpent": total_spent,
-                "averageJobCost": round(average_job_cost, 2),
-                "providersHired": providers_hired,
-                "pendingApprovals": pending_approvals,
-                "monthlySpending": monthly_spending,
-                "spendingByCategory": spending_by_category,
-                "jobsByStatus": jobs_by_status,
-                "recentJobs": recent_jobs,
-                "metrics": {
-                    "clientRating": round(client_average_rating, 2),  # Avaliação do cliente
-                    "clientTotalRatings": client_total_ratings,  # Total de avaliações recebidas
-                    "completionRate": completion_rate,
-                    "favoriteCategory": spending_by_category[0]["category"] if spending_by_category else "N/A"
-                }
+                "dashboard": dashboard,
+                "quickStats": _build_client_quick_stats(stats),
+                "spending": stats.monthly(months),
+                "recentJobs": recent_jobs
             },
             message="Dashboard carregado com sucesso"
         ).model_dump()
@@ -716,38 +327,11 @@ async def get_client_quick_stats(
 ):
     """Estatísticas rápidas do cliente"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
-
-        user_jobs = bico_certo.contract.functions.getUserJobs(wallet.address).call()
-
-        active_jobs = 0
-        completed_jobs = 0
-        total_spent = 0.0
-
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[1].lower() != wallet.address.lower():
-                    continue
-
-                status = JobStatus(job_data[9])
-                if status in [JobStatus.CREATED, JobStatus.OPEN, JobStatus.ACCEPTED, JobStatus.IN_PROGRESS]:
-                    active_jobs += 1
-                elif status == JobStatus.APPROVED:
-                    completed_jobs += 1
-                    total_spent += float(bico_certo.w3.from_wei(job_data[3] + job_data[4], 'ether'))
-            except Exception:
-                continue
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "client")
 
         return APIResponse.success_response(
-            data={
-                "activeJobs": active_jobs,
-                "completedJobs": completed_jobs,
-                "totalSpent": total_spent,
-                "savedProviders": 0
-            }
+            data=_build_client_quick_stats(stats)
         ).model_dump()
 
     except HTTPException:
@@ -764,24 +348,10 @@ async def get_client_spending(
 ):
     """Gastos mensais do cliente"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
-
-        user_jobs = bico_certo.contract.functions.getUserJobs(wallet.address).call()
-
-        client_jobs = []
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[1].lower() == wallet.address.lower():
-                    client_jobs.append({'id': job_id, 'data': job_data})
-            except:
-                continue
-
-        monthly_data = _calculate_monthly_data(client_jobs, is_provider=False, months=months)
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "client")
 
-        return APIResponse.success_response(data=monthly_data).model_dump()
+        return APIResponse.success_response(data=stats.monthly(months)).model_dump()
 
     except HTTPException:
         raise
@@ -797,22 +367,9 @@ async def get_client_recent_jobs(
 ):
     """Jobs recentes do cliente"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
+        wallet = _get_wallet(db, current_user)
 
-        user_jobs = bico_certo.contract.functions.getUserJobs(wallet.address).call()
-
-        client_jobs = []
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[1].lower() == wallet.address.lower():
-                    client_jobs.append({'id': job_id, 'data': job_data})
-            except:
-                continue
-
-        recent = _get_recent_jobs(client_jobs, limit=limit, db=db)
+        recent = await _get_recent_jobs(db, wallet.address, limit=limit)
 
         return APIResponse.success_response(data=recent).model_dump()
 
@@ -829,76 +386,15 @@ async def export_client_dashboard_pdf(
 ):
     """Exporta dashboard do cliente em PDF"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
-
-        user_address = wallet.address
-        user_jobs = bico_certo.contract.functions.getUserJobs(user_address).call()
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "client")
 
         # Usa getClientProfile
-        client_profile = bico_certo.contract.functions.getClientProfile(user_address).call()
-        client_average_rating = client_profile[0] / 100.0
-
-        client_jobs = []
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[1].lower() == user_address.lower():
-                    client_jobs.append({'id': job_id, 'data': job_data})
-            except:
-                continue
-
-        active_jobs = sum(
-            1 for job in client_jobs
-            if JobStatus(job['data'][9]) in [
-                JobStatus.CREATED, JobStatus.OPEN, JobStatus.ACCEPTED,
-                JobStatus.IN_PROGRESS, JobStatus.COMPLETED
-            ]
-        )
+        client_profile = await async_bico_certo.get_client_profile(wallet.address)
+        dashboard_data = _build_client_dashboard(stats, client_profile)
 
-        completed_jobs = sum(
-            1 for job in client_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        )
-
-        total_spent = sum(
-            float(bico_certo.w3.from_wei(job['data'][3] + job['data'][4], 'ether'))
-            for job in client_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        )
-
-        providers_hired = len(set(
-            job['data'][2] for job in client_jobs
-            if job['data'][2] != '0x0000000000000000000000000000000000000000'
-        ))
-
-        pending_approvals = sum(
-            1 for job in client_jobs
-            if JobStatus(job['data'][9]) == JobStatus.COMPLETED
-        )
-
-        completion_rate = int((completed_jobs / len(client_jobs) * 100) if client_jobs else 0)
-
-        spending_by_category = _calculate_spending_by_category(client_jobs)
-        favorite_category = spending_by_category[0]["category"] if spending_by_category else "N/A"
-
-        dashboard_data = {
-            "activeJobs": active_jobs,
-            "completedJobs": completed_jobs,
-            "totalSpent": total_spent,
-            "providersHired": providers_hired,
-            "pendingApprovals": pending_approvals,
-            "monthlySpending": _calculate_monthly_data(client_jobs, is_provider=False),
-            "spendingByCategory": spending_by_category,
-            "metrics": {
-                "clientRating": round(client_average_rating, 2),
-                "completionRate": completion_rate,
-                "favoriteCategory": favorite_category
-            }
-        }
-
-        pdf_buffer = ReportGenerator.generate_client_pdf(dashboard_data, current_user.full_name)
+        # Renderização no pool de processos: não trava o event loop
+        pdf_buffer = BytesIO(await export_service.render("client_pdf", dashboard_data, current_user.full_name))
 
         filename = f"dashboard_cliente_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
@@ -919,76 +415,15 @@ async def export_client_dashboard_excel(
 ):
     """Exporta dashboard do cliente em Excel"""
     try:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet:
-            raise HTTPException(status_code=400, detail="Carteira não encontrada")
-
-        user_address = wallet.address
-        user_jobs = bico_certo.contract.functions.getUserJobs(user_address).call()
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "client")
 
         # Usa getClientProfile
-        client_profile = bico_certo.contract.functions.getClientProfile(user_address).call()
-        client_average_rating = client_profile[0] / 100.0
-
-        client_jobs = []
-        for job_id in user_jobs:
-            try:
-                job_data = bico_certo.contract.functions.getJob(job_id).call()
-                if job_data[1].lower() == user_address.lower():
-                    client_jobs.append({'id': job_id, 'data': job_data})
-            except:
-                continue
-
-        active_jobs = sum(
-            1 for job in client_jobs
-            if JobStatus(job['data'][9]) in [
-                JobStatus.CREATED, JobStatus.OPEN, JobStatus.ACCEPTED,
-                JobStatus.IN_PROGRESS, JobStatus.COMPLETED
-            ]
-        )
+        client_profile = await async_bico_certo.get_client_profile(wallet.address)
+        dashboard_data = _build_client_dashboard(stats, client_profile)
 
-        completed_jobs = sum(
-            1 for job in client_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        )
-
-        total_spent = sum(
-            float(bico_certo.w3.from_wei(job['data'][3] + job['data'][4], 'ether'))
-            for job in client_jobs
-            if JobStatus(job['data'][9]) == JobStatus.APPROVED
-        )
-
-        providers_hired = len(set(
-            job['data'][2] for job in client_jobs
-            if job['data'][2] != '0x0000000000000000000000000000000000000000'
-        ))
-
-        pending_approvals = sum(
-            1 for job in client_jobs
-            if JobStatus(job['data'][9]) == JobStatus.COMPLETED
-        )
-
-        completion_rate = int((completed_jobs / len(client_jobs) * 100) if client_jobs else 0)
-
-        spending_by_category = _calculate_spending_by_category(client_jobs)
-        favorite_category = spending_by_category[0]["category"] if spending_by_category else "N/A"
-
-        dashboard_data = {
-            "activeJobs": active_jobs,
-            "completedJobs": completed_jobs,
-            "totalSpent": total_spent,
-            "providersHired": providers_hired,
-            "pendingApprovals": pending_approvals,
-            "monthlySpending": _calculate_monthly_data(client_jobs, is_provider=False),
-            "spendingByCategory": spending_by_category,
-            "metrics": {
-                "clientRating": round(client_average_rating, 2),
-                "completionRate": completion_rate,
-                "favoriteCategory": favorite_category
-            }
-        }
-
-        excel_buffer = ReportGenerator.generate_client_excel(dashboard_data, current_user.full_name)
+        # Renderização no pool de processos: não trava o event loop
+        excel_buffer = BytesIO(await export_service.render("client_excel", dashboard_data, current_user.full_name))
 
         filename = f"dashboard_cliente_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
 
@@ -1002,220 +437,362 @@ async def export_client_dashboard_excel(
         raise HTTPException(status_code=500, detail=f"Erro ao gerar Excel: {str(e)}")
 
 
-def _calculate_monthly_data(jobs: List[Dict], is_provider: bool = True, months: int = 6) -> List[Dict]:
-    """Calcula dados mensais (ganhos ou gastos)"""
-    monthly = defaultdict(float)
-
-    for job in jobs:
-        try:
-            job_data = job['data']
-            status = JobStatus(job_data[9])
-
-            if status != JobStatus.APPROVED:
-                continue
+@router.get("/platform/dashboard")
+async def get_platform_dashboard(
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db),
+        months: int = 12
+):
+    """Visão geral da plataforma (todos os jobs indexados). Só para administradores"""
+    if not getattr(current_user, 'is_admin', False):
+        raise HTTPException(status_code=403, detail="Acesso restrito a administradores")
 
-            completed_at = job_data[7]
-            if completed_at == 0:
-                continue
+    # NumPy só é carregado na primeira chamada, não no startup de cada worker
+    from app.service.dashboard_analytics import platform_jobs_cache, platform_summary
 
-            date = datetime.fromtimestamp(completed_at)
-            month_key = date.strftime('%b')
+    try:
+        # Carga (compartilhada entre requisições) e agrupamento vetorizado fora do event loop
+        jobs = await asyncio.to_thread(platform_jobs_cache.get, db)
+        summary = await asyncio.to_thread(platform_summary, jobs, months)
 
-            if is_provider:
-                amount = float(bico_certo.w3.from_wei(job_data[3], 'ether'))
-            else:
-                amount = float(bico_certo.w3.from_wei(job_data[3] + job_data[4], 'ether'))
+        return APIResponse.success_response(
+            data=summary,
+            message="Dashboard da plataforma carregado com sucesso"
+        ).model_dump()
 
-            monthly[month_key] += amount
-        except Exception:
-            continue
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-    result = []
-    now = datetime.now()
-    for i in range(months):
-        date = now - timedelta(days=30 * i)
-        month_key = date.strftime('%b')
-        result.insert(0, {
-            "month": month_key,
-            "value": round(monthly.get(month_key, 0), 2)
-        })
 
-    return result
+@router.post("/client/dashboard/export")
+async def create_client_dashboard_export(
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db),
+        export_format: str = Query("pdf", alias="format", description="pdf ou excel")
+):
+    """Inicia a exportação do dashboard do cliente em background"""
+    try:
+        wallet = _get_wallet(db, current_user)
+        stats = await _load_stats(db, wallet.address, "client")
 
+        client_profile = await async_bico_certo.get_client_profile(wallet.address)
+        dashboard_data = _build_client_dashboard(stats, client_profile)
 
-def _calculate_category_performance(jobs: List[Dict]) -> List[Dict]:
-    """Calcula performance por categoria"""
-    categories = defaultdict(lambda: {"count": 0, "earnings": 0.0})
+        return _submit_export(db, current_user, "client", export_format, dashboard_data)
 
-    for job in jobs:
-        try:
-            job_data = job['data']
-            status = JobStatus(job_data[9])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao iniciar exportação: {str(e)}")
 
-            if status != JobStatus.APPROVED:
-                continue
 
-            category = job_data[10]
-            categories[category]["count"] += 1
-            categories[category]["earnings"] += float(bico_certo.w3.from_wei(job_data[3], 'ether'))
-        except Exception:
-            continue
+@router.get("/client/jobs/export")
+async def export_client_job_history(
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db),
+        export_format: str = Query("csv", alias="format", description="csv, ndjson ou xlsx")
+):
+    """Histórico completo de jobs do cliente, enviado em streaming"""
+    return await _stream_job_history(db, current_user, "client", export_format)
 
-    result = [
-        {
-            "category": cat,
-            "count": data["count"],
-            "earnings": round(data["earnings"], 2)
-        }
-        for cat, data in categories.items()
-    ]
-    result.sort(key=lambda x: x["earnings"], reverse=True)
 
-    return result[:5]
+@router.get("/exports/{export_id}")
+async def get_export_status(
+        export_id: str,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Status de uma exportação"""
+    export_job = _get_export(db, export_id, current_user)
 
+    return APIResponse.success_response(data=export_service.to_dict(export_job)).model_dump()
 
-def _calculate_recent_activity(jobs: List[Dict], days: int = 7) -> List[Dict]:
-    """Calcula atividade recente (últimos N dias)"""
-    activity = defaultdict(int)
-    cutoff_date = datetime.now() - timedelta(days=days)
 
-    for job in jobs:
-        try:
-            job_data = job['data']
-            completed_at = job_data[7]
+@router.get("/exports/{export_id}/download")
+async def download_export(
+        export_id: str,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Download do arquivo de uma exportação concluída"""
+    export_job = _get_export(db, export_id, current_user)
 
-            if completed_at == 0:
-                continue
+    if export_job.status == ExportStatus.EXPIRED:
+        raise HTTPException(status_code=410, detail="Exportação expirada. Gere novamente")
 
-            date = datetime.fromtimestamp(completed_at)
-            if date < cutoff_date:
-                continue
+    if export_job.status != ExportStatus.READY or not export_job.file_path:
+        raise HTTPException(status_code=409, detail="Exportação ainda não concluída")
 
-            date_key = date.strftime('%Y-%m-%d')
-            activity[date_key] += 1
-        except Exception:
-            continue
+    return FileResponse(
+        export_job.file_path,
+        media_type=export_job.media_type,
+        filename=export_job.filename
+    )
 
-    result = []
-    for i in range(days):
-        date = datetime.now() - timedelta(days=i)
-        date_key = date.strftime('%Y-%m-%d')
-        result.insert(0, {
-            "date": date_key,
-            "jobs": activity.get(date_key, 0)
-        })
 
-    return result
+def _submit_export(db: Session, user: User, role: str, export_format: str, dashboard_data: Dict[str, Any]):
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Formato inválido. Use pdf ou excel")
 
+    success, message, export_job = export_service.submit(
+        db,
+        user_id=user.id,
+        role=role,
+        export_format=export_format,
+        data=dashboard_data,
+        user_name=user.full_name
+    )
 
-def _calculate_spending_by_category(jobs: List[Dict]) -> List[Dict]:
-    """Calcula gastos por categoria"""
-    categories = defaultdict(lambda: {"count": 0, "spent": 0.0})
+    if not success:
+        raise HTTPException(status_code=429, detail=message)
 
-    for job in jobs:
-        try:
-            job_data = job['data']
-            status = JobStatus(job_data[9])
+    return APIResponse.success_response(
+        data=export_service.to_dict(export_job),
+        message=message
+    ).model_dump()
 
-            if status != JobStatus.APPROVED:
-                continue
 
-            category = job_data[10]
-            categories[category]["count"] += 1
-            categories[category]["spent"] += float(bico_certo.w3.from_wei(job_data[3] + job_data[4], 'ether'))
-        except Exception:
-            continue
+async def _stream_job_history(db: Session, user: User, role: str, export_format: str) -> StreamingResponse:
+    if export_format not in HISTORY_FORMATS:
+        raise HTTPException(status_code=400, detail="Formato inválido. Use csv, ndjson ou xlsx")
 
-    result = [
-        {
-            "category": cat,
-            "count": data["count"],
-            "spent": round(data["spent"], 2)
+    wallet = _get_wallet(db, user)
+
+    media_type, extension = HISTORY_FORMATS[export_format]
+    label = "prestador" if role == "provider" else "cliente"
+    filename = f"jobs_{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+    # Gerador síncrono: o Starlette consome em threadpool, fora do event loop
+    return StreamingResponse(
+        STREAMERS[export_format](wallet.address, role),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+def _get_export(db: Session, export_id: str, user: User) -> ExportJob:
+    export_job = db.query(ExportJob).filter(
+        ExportJob.id == export_id,
+        ExportJob.user_id == user.id
+    ).first()
+
+    if not export_job:
+        raise HTTPException(status_code=404, detail="Exportação não encontrada")
+
+    return export_job
+
+
+def _get_wallet(db: Session, user: User) -> Wallet:
+    wallet = db.query(Wallet).filter(Wallet.user_id == user.id).first()
+    if not wallet:
+        raise HTTPException(status_code=400, detail="Carteira não encontrada")
+    return wallet
+
+
+async def _load_stats(db: Session, address: str, role: str) -> DashboardStats:
+    """Agregados pré-calculados do endereço (mantidos em dia pelo run_job_indexer)"""
+    return DashboardStats(db, address, role)
+
+
+def _trend(current: float, previous: float) -> float:
+    if previous > 0:
+        return ((current - previous) / previous) * 100
+    return 100 if current > 0 else 0
+
+
+def _proposal_stats(db: Session, address: str) -> Dict[str, int]:
+    """Quantidade de propostas do provider por status (índice local)"""
+    rows = db.query(IndexedProposal.status, func.count(IndexedProposal.id)).filter(
+        IndexedProposal.provider == Web3.to_checksum_address(address)
+    ).group_by(IndexedProposal.status).all()
+
+    counts = {status: count for status, count in rows}
+    total = sum(counts.values())
+    accepted = counts.get(ProposalStatus.ACCEPTED.value, 0)
+
+    return {
+        "pending": counts.get(ProposalStatus.PENDING.value, 0),
+        "acceptance_rate": int((accepted / total * 100) if total > 0 else 0)
+    }
+
+
+def _build_provider_dashboard(db: Session, stats: DashboardStats, address: str, provider_profile: tuple) -> Dict[str, Any]:
+    """Dados do dashboard do prestador (tela, PDF e Excel)"""
+    # provider_profile retorna: (averageRating, totalRatings, totalJobs, totalEarned)
+    average_rating = provider_profile[0] / 100.0  # Converte de 425 para 4.25
+    total_ratings = provider_profile[1]
+
+    completed_jobs = stats.count(JobStatus.APPROVED)
+    total_earnings = stats.approved_amount()
+
+    now = datetime.now(fuso_local)
+    last_month_start = (now - timedelta(days=30)).strftime('%Y-%m-%d')
+    previous_month_start = (now - timedelta(days=60)).strftime('%Y-%m-%d')
+
+    jobs_trend = _trend(
+        stats.approved_count(since=last_month_start),
+        stats.approved_count(since=previous_month_start, until=last_month_start)
+    )
+    earnings_trend = _trend(
+        stats.approved_amount(since=last_month_start),
+        stats.approved_amount(since=previous_month_start, until=last_month_start)
+    )
+
+    proposals = _proposal_stats(db, address)
+
+    motivation_message = _get_motivation_message(
+        average_rating=average_rating,
+        jobs_trend=jobs_trend,
+        earnings_trend=earnings_trend,
+        completed_jobs=completed_jobs,
+        proposal_acceptance_rate=proposals["acceptance_rate"]
+    )
+
+    return {
+        "completedJobs": completed_jobs,
+        "totalEarnings": total_earnings,
+        "averageRating": round(average_rating, 2),  # Usa a média do Provider
+        "totalRatings": total_ratings,  # Número total de avaliações
+        "proposalAcceptanceRate": proposals["acceptance_rate"],
+        "activeJobs": stats.count(JobStatus.ACCEPTED, JobStatus.IN_PROGRESS),
+        "pendingProposals": proposals["pending"],
+        "monthlyEarnings": stats.monthly(),
+        "jobsByCategory": stats.by_category("earnings"),
+        "recentActivity": stats.recent_activity(days=7),
+        "trends": {
+            "jobsTrend": round(jobs_trend, 1),
+            "earningsTrend": round(earnings_trend, 1),
+            "motivationMessage": motivation_message
+        },
+        "metrics": {
+            "averageJobValue": round(total_earnings / completed_jobs if completed_jobs else 0, 2),
+            "averageDeliveryTime": round(stats.average_delivery_days(), 1),
+            "totalClients": stats.counterparty_count(approved_only=True),
+            "highestEarningJob": round(stats.highest_amount(), 2),
+            "lastJobDate": stats.last_approved_day()
         }
-        for cat, data in categories.items()
-    ]
-    result.sort(key=lambda x: x["spent"], reverse=True)
-
-    return result[:5]
-
-
-def _calculate_jobs_by_status(jobs: List[Dict]) -> List[Dict]:
-    """Calcula distribuição de jobs por status"""
-    status_count = defaultdict(int)
-    total = len(jobs)
-
-    for job in jobs:
-        try:
-            job_data = job['data']
-            status = JobStatus(job_data[9]).name.lower()
-            status_count[status] += 1
-        except Exception:
-            continue
-
-    result = []
-    for status, count in status_count.items():
-        percentage = (count / total * 100) if total > 0 else 0
-        result.append({
-            "status": status,
-            "count": count,
-            "percentage": round(percentage, 1)
-        })
-
-    return result
-
-
-def _get_recent_jobs(jobs: List[Dict], limit: int = 10, db: Session = None) -> List[Dict]:
-    """Retorna jobs recentes com dados do IPFS e nome do provider"""
-    sorted_jobs = sorted(jobs, key=lambda x: x['data'][5], reverse=True)
-
-    result = []
-    for job in sorted_jobs[:limit]:
+    }
+
+
+def _build_provider_quick_stats(stats: DashboardStats, average_rating: float) -> Dict[str, Any]:
+    return {
+        "activeJobs": stats.count(JobStatus.ACCEPTED, JobStatus.IN_PROGRESS),
+        "completedJobs": stats.count(JobStatus.APPROVED),
+        "totalEarnings": stats.approved_amount(),
+        "rating": round(average_rating, 2)
+    }
+
+
+def _build_client_quick_stats(stats: DashboardStats) -> Dict[str, Any]:
+    return {
+        "activeJobs": stats.count(
+            JobStatus.CREATED, JobStatus.OPEN, JobStatus.ACCEPTED, JobStatus.IN_PROGRESS
+        ),
+        "completedJobs": stats.count(JobStatus.APPROVED),
+        "totalSpent": stats.approved_amount(),
+        "savedProviders": 0
+    }
+
+
+def _build_client_dashboard(stats: DashboardStats, client_profile: tuple) -> Dict[str, Any]:
+    """Dados do dashboard do cliente (tela, PDF e Excel); jobs cancelados não entram"""
+    # client_profile retorna: (averageRating, totalRatings, totalJobs, totalSpent)
+    client_average_rating = client_profile[0] / 100.0  # Converte de 425 para 4.25
+    client_total_ratings = client_profile[1]
+
+    completed_jobs = stats.count(JobStatus.APPROVED)
+    total_spent = stats.approved_amount()
+    total_jobs = stats.total_jobs - stats.count(JobStatus.CANCELLED)
+
+    spending_by_category = stats.by_category("spent")
+
+    return {
+        "activeJobs": stats.count(
+            JobStatus.CREATED, JobStatus.OPEN, JobStatus.ACCEPTED,
+            JobStatus.IN_PROGRESS, JobStatus.COMPLETED
+        ),
+        "completedJobs": completed_jobs,
+        "totalSpent": total_spent,
+        "averageJobCost": round(total_spent / completed_jobs if completed_jobs else 0, 2),
+        "providersHired": stats.counterparty_count(),
+        "pendingApprovals": stats.count(JobStatus.COMPLETED),
+        "monthlySpending": stats.monthly(),
+        "spendingByCategory": spending_by_category,
+        "jobsByStatus": stats.by_status(exclude=(JobStatus.CANCELLED,)),
+        "metrics": {
+            "clientRating": round(client_average_rating, 2),  # Avaliação do cliente
+            "clientTotalRatings": client_total_ratings,  # Total de avaliações recebidas
+            "completionRate": int((completed_jobs / total_jobs * 100) if total_jobs > 0 else 0),
+            "favoriteCategory": spending_by_category[0]["category"] if spending_by_category else "N/A"
+        }
+    }
+
+
+async def _get_recent_jobs(
+        db: Session,
+        address: str,
+        limit: int = 10,
+        include_cancelled: bool = True
+) -> List[Dict]:
+    """Retorna jobs recentes do cliente com dados do IPFS e nome do provider"""
+    rows = _recent_job_rows(db, address, limit, include_cancelled)
+    formatted = await _format_recent_jobs(db, rows)
+    return [formatted[row.id] for row in rows if row.id in formatted]
+
+
+def _recent_job_rows(
+        db: Session,
+        address: str,
+        limit: int,
+        include_cancelled: bool = True
+) -> List[IndexedJob]:
+    query = db.query(IndexedJob).filter(IndexedJob.client == Web3.to_checksum_address(address))
+    if not include_cancelled:
+        query = query.filter(IndexedJob.status != JobStatus.CANCELLED.value)
+
+    return query.order_by(IndexedJob.created_at.desc()).limit(limit).all()
+
+
+async def _format_recent_jobs(db: Session, rows: Iterable[IndexedJob]) -> Dict[str, Dict]:
+    """Itens da lista de jobs recentes por id do job (jobs com erro ficam de fora)"""
+    rows = list(rows)
+
+    # Metadados do IPFS de todos os jobs buscados em paralelo
+    ipfs_results = await async_ipfs.get_json_many([row.ipfs_hash for row in rows])
+
+    # Nomes dos providers em uma única consulta
+    provider_addresses = {row.provider for row in rows} - {'0x0000000000000000000000000000000000000000'}
+    provider_names = {
+        wallet.address: wallet.user.full_name
+        for wallet in db.query(Wallet).filter(Wallet.address.in_(provider_addresses)).all()
+        if wallet.user
+    } if provider_addresses else {}
+
+    result = {}
+    for row, ipfs_data in zip(rows, ipfs_results):
         try:
-            job_id = job['id']
-            job_data = job['data']
-            status = JobStatus(job_data[9])
-
-            job_obj = bico_certo.get_job(job_id)
-
-            ipfs_data = {}
-            try:
-                ipfs_data = ipfs_service.get_job_data(job_obj.ipfs_hash)
-            except Exception:
-                ipfs_data = {
-                    'title': 'Serviço sem título',
-                    'category': job_obj.service_type
-                }
+            job_obj = row.to_job()
 
             provider_name = "Provider sem nome"
             provider_address = job_obj.provider
 
             if provider_address and provider_address != '0x0000000000000000000000000000000000000000':
-                try:
-                    if db:
-                        wallet = db.query(Wallet).filter(
-                            Wallet.address == provider_address
-                        ).first()
-
-                        if wallet and wallet.user:
-                            provider_name = wallet.user.full_name
-                        else:
-                            provider_name = f"{provider_address[:6]}...{provider_address[-4:]}"
-                    else:
-                        provider_name = f"{provider_address[:6]}...{provider_address[-4:]}"
-                except Exception:
-                    provider_name = f"{provider_address[:6]}...{provider_address[-4:]}"
+                provider_name = provider_names.get(
+                    provider_address,
+                    f"{provider_address[:6]}...{provider_address[-4:]}"
+                )
 
             job_title = ipfs_data[2]['data']['title'].title()
             category = job_obj.service_type
             full_title = f"{job_title} - {category}"
 
-            result.append({
+            result[row.id] = {
                 "title": full_title,
                 "provider": provider_name,
                 "date": datetime.fromtimestamp(job_obj.created_at).strftime('%Y-%m-%d'),
                 "value": float(job_obj.amount + job_obj.platform_fee),
-                "status": status.name.lower()
-            })
+                "status": job_obj.status.name.lower()
+            }
 
         except Exception:
             continue
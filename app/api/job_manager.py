@@ -1,18 +1,23 @@
+import asyncio
 import base64
 from datetime import datetime
 from typing import Optional
 
-from eth_account import Account
 
-from app.service.ipfs_service import IPFSService
-from app.model.bico_certo_main import BicoCerto, ProposalStatus, Reputation
+from app.service.async_ipfs_client import async_ipfs
+from app.service.ipfs_service import get_ipfs_service
+from app.model.bico_certo_main import AsyncBicoCerto, BicoCerto, ProposalStatus, Reputation
+from app.model.job_index import IndexedJob, IndexedProposal
 from app.model.wallet import Wallet
 from app.schema.job_manager import (
     CreateJobRequest, CreateOpenJobRequest, SubmitProposalRequest, AcceptJobRequest, AnswerProposalRequest,
     CompleteJobRequest, ApproveJobRequest, CancelJobRequest)
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from web3 import Web3
 
 from app.service.job_notification_service import JobNotificationService
+from app.service.transaction_tracker import transaction_tracker
 from app.util.responses import APIResponse
 from sqlalchemy.orm import Session
 from app.config.database import get_db
@@ -24,12 +29,149 @@ from app.config.settings import fuso_local
 
 router = APIRouter(prefix="/jobs", tags=["JobManager"])
 bico_certo = BicoCerto()
-ipfs_service = IPFSService()
+async_bico_certo = AsyncBicoCerto()
+ipfs_service = get_ipfs_service()
+
+
+def _pending_proposals_subquery(db: Session):
+    """Subquery com a contagem de propostas pendentes por job no índice local"""
+    return db.query(
+        IndexedProposal.job_id.label("job_id"),
+        func.count(IndexedProposal.id).label("pending_count")
+    ).filter(
+        IndexedProposal.status == ProposalStatus.PENDING.value
+    ).group_by(IndexedProposal.job_id).subquery()
+
+
+async def _wait_for_receipt(signer: TransactionSigner, tx_hash, timeout: int):
+    """Espera o recibo em uma thread, sem travar o event loop"""
+    return await asyncio.to_thread(signer.w3.eth.wait_for_transaction_receipt, tx_hash, timeout=timeout)
+
+
+def _pending_response(db: Session, tx_hash_hex: str, user: User, action: str, context: dict):
+    """Registra a transação no TransactionTracker e responde sem esperar o recibo"""
+    pending = transaction_tracker.track(db, tx_hash_hex, user.id, action, context)
+
+    return APIResponse.success_response(
+        data={
+            **context,
+            "tracking_id": pending.id,
+            "transaction_hash": tx_hash_hex,
+            "status": "pending"
+        },
+        message="Transação enviada. A confirmação será notificada pelo websocket"
+    )
+
+
+# Ações executadas após a confirmação (no request quando wait=True, ou pelo TransactionTracker)
+
+def _on_job_created(db: Session, user: User, context: dict, receipt):
+    job_info = bico_certo.get_job_from_receipt(receipt)
+    return {"job_id": job_info['jobId'].hex()} if job_info else None
+
+
+def _on_open_job_created(db: Session, user: User, context: dict, receipt):
+    job_info = bico_certo.get_job_open_from_receipt(receipt)
+    return {"job_id": job_info['jobId'].hex()} if job_info else None
+
+
+def _notify_new_proposal(db: Session, user: User, context: dict, receipt=None):
+    job = bico_certo.get_job(bytes.fromhex(context["job_id"]))
+    JobNotificationService.notify_new_proposal(
+        db=db,
+        client_address=job.client,
+        job_id=context["job_id"],
+        ipfs_hash=job.ipfs_hash,
+        provider_name=user.full_name
+    )
+
+
+def _on_proposal_submitted(db: Session, user: User, context: dict, receipt):
+    _notify_new_proposal(db, user, context)
+    proposal_info = bico_certo.get_proposal_from_receipt(receipt)
+    return {"proposal_id": proposal_info['proposal_id'].hex()} if proposal_info else None
+
+
+def _notify_job_completed(db: Session, user: User, context: dict, receipt=None):
+    job = bico_certo.get_job(bytes.fromhex(context["job_id"]))
+    JobNotificationService.notify_job_completed(
+        db=db,
+        client_address=job.client,
+        job_id=context["job_id"],
+        ipfs_hash=job.ipfs_hash,
+        provider_name=user.full_name
+    )
+
+
+def _notify_job_approved(db: Session, user: User, context: dict, receipt=None):
+    job = bico_certo.get_job(bytes.fromhex(context["job_id"]))
+    JobNotificationService.notify_provider_to_rate_client(
+        db=db,
+        provider_address=job.provider,
+        job_id=context["job_id"],
+        ipfs_hash=job.ipfs_hash,
+        client_name=user.full_name
+    )
+
+
+def _notify_job_rejected(db: Session, user: User, context: dict, receipt=None):
+    job = bico_certo.get_job(bytes.fromhex(context["job_id"]))
+    JobNotificationService.notify_job_rejected(
+        db=db,
+        provider_address=job.provider,
+        job_id=context["job_id"],
+        ipfs_hash=job.ipfs_hash,
+        client_name=user.full_name
+    )
+
+
+def _notify_proposal_answered(db: Session, user: User, context: dict, receipt=None):
+    """Notifica o provider sobre a proposta aceita ou rejeitada (context['status'])"""
+    proposal = bico_certo.contract.functions.getProposal(
+        bytes.fromhex(context["proposal_id"])
+    ).call()
+    job = bico_certo.get_job(proposal[1])
+
+    notify = (
+        JobNotificationService.notify_proposal_accepted
+        if context["status"] == "accepted"
+        else JobNotificationService.notify_proposal_rejected
+    )
+    notify(
+        db=db,
+        provider_address=proposal[2],
+        job_id=proposal[1].hex(),
+        ipfs_hash=job.ipfs_hash,
+        client_name=user.full_name
+    )
+
+
+def _notify_proposal_canceled(db: Session, user: User, context: dict, receipt=None):
+    job = bico_certo.get_job(bytes.fromhex(context["job_id"]))
+    JobNotificationService.notify_cancel_proposal(
+        db=db,
+        client_address=job.client,
+        job_id=context["job_id"],
+        ipfs_hash=job.ipfs_hash,
+        provider_name=user.full_name
+    )
+
+
+transaction_tracker.register_handler("create_job", _on_job_created)
+transaction_tracker.register_handler("create_open_job", _on_open_job_created)
+transaction_tracker.register_handler("submit_proposal", _on_proposal_submitted)
+transaction_tracker.register_handler("complete_job", _notify_job_completed)
+transaction_tracker.register_handler("approve_job", _notify_job_approved)
+transaction_tracker.register_handler("reject_job", _notify_job_rejected)
+transaction_tracker.register_handler("accept_proposal", _notify_proposal_answered)
+transaction_tracker.register_handler("reject_proposal", _notify_proposal_answered)
+transaction_tracker.register_handler("cancel_proposal", _notify_proposal_canceled)
 
 
 @router.post("/create", response_model=APIResponse)
 async def create_job(
         request: CreateJobRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -113,13 +255,13 @@ async def create_job(
         )
 
     try:
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = signer.sign_and_send(private_key, transaction)
         tx_hash_hex = tx_hash.hex()
 
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+        if not wait:
+            return _pending_response(db, tx_hash_hex, current_user, "create_job", {"ipfs_cid": ipfs_cid})
+
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=30)
 
         if receipt['status'] != 1:
             raise HTTPException(
@@ -168,6 +310,7 @@ async def create_job(
 @router.post("/create-open", response_model=APIResponse)
 async def create_open_job(
         request: CreateOpenJobRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -263,13 +406,13 @@ async def create_open_job(
             max_budget_eth=request.max_budget_eth
         )
 
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = signer.sign_and_send(private_key, transaction)
         tx_hash_hex = tx_hash.hex()
 
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+        if not wait:
+            return _pending_response(db, tx_hash_hex, current_user, "create_open_job", {"ipfs_cid": ipfs_cid})
+
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=30)
 
         if receipt['status'] != 1:
             raise HTTPException(
@@ -314,7 +457,7 @@ async def get_job_image(
     Retorna uma imagem do job em base64
     """
     try:
-        success, message, image_bytes = ipfs_service.get_bytes_image_data(cid)
+        success, message, image_bytes = await async_ipfs.cat(cid)
 
         if not success or image_bytes is None:
             raise HTTPException(
@@ -342,6 +485,7 @@ async def get_job_image(
 @router.post("/submit-proposal", response_model=APIResponse)
 async def submit_proposal(
         request: SubmitProposalRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -401,13 +545,14 @@ async def submit_proposal(
         )
 
         # Assinar e enviar
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = signer.sign_and_send(private_key, transaction)
         tx_hash_hex = tx_hash.hex()
 
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+        context = {"job_id": request.job_id, "ipfs_cid": ipfs_cid}
+        if not wait:
+            return _pending_response(db, tx_hash_hex, current_user, "submit_proposal", context)
+
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=30)
 
         if receipt['status'] != 1:
             raise HTTPException(
@@ -418,14 +563,7 @@ async def submit_proposal(
         proposal_info = bico_certo.get_proposal_from_receipt(receipt)
 
         try:
-            job = bico_certo.get_job(bytes.fromhex(request.job_id))
-            JobNotificationService.notify_new_proposal(
-                db=db,
-                client_address=job.client,
-                job_id=request.job_id,
-                ipfs_hash=job.ipfs_hash,
-                provider_name=current_user.full_name
-            )
+            _notify_new_proposal(db, current_user, context)
         except Exception as e:
             print(f"Erro ao enviar notificação de nova proposta: {e}")
 
@@ -450,6 +588,7 @@ async def submit_proposal(
 @router.post("/accept", response_model=APIResponse)
 async def accept_job(
         request: AcceptJobRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -480,13 +619,13 @@ async def accept_job(
             job_id=job_id_bytes
         )
 
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = signer.sign_and_send(private_key, transaction)
         tx_hash_hex = tx_hash.hex()
 
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+        if not wait:
+            return _pending_response(db, tx_hash_hex, current_user, "accept_job", {"job_id": request.job_id})
+
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=60)
 
         if receipt['status'] != 1:
             raise HTTPException(
@@ -515,6 +654,7 @@ async def accept_job(
 @router.post("/complete", response_model=APIResponse)
 async def complete_job(
         request: CompleteJobRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -535,24 +675,19 @@ async def complete_job(
         job_id_bytes = bytes.fromhex(request.job_id)
         transaction = bico_certo.prepare_complete_job_transaction(wallet["address"], job_id_bytes)
 
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+        tx_hash = signer.sign_and_send(private_key, transaction)
+
+        context = {"job_id": request.job_id}
+        if not wait:
+            return _pending_response(db, tx_hash.hex(), current_user, "complete_job", context)
+
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=60)
 
         if receipt['status'] != 1:
             raise HTTPException(status_code=400, detail="Transação falhou na blockchain.")
 
         try:
-            job = bico_certo.get_job(job_id_bytes)
-
-            JobNotificationService.notify_job_completed(
-                db=db,
-                client_address=job.client,
-                job_id=request.job_id,
-                ipfs_hash=job.ipfs_hash,
-                provider_name=current_user.full_name
-            )
+            _notify_job_completed(db, current_user, context)
         except Exception as e:
             print(f"Erro ao enviar notificação: {e}")
 
@@ -566,6 +701,7 @@ async def complete_job(
 @router.post("/approve", response_model=APIResponse)
 async def approve_job(
         request: ApproveJobRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -586,34 +722,20 @@ async def approve_job(
         job_id_bytes = bytes.fromhex(request.job_id)
         transaction = bico_certo.prepare_approve_job_transaction(wallet["address"], job_id_bytes, request.rating)
 
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+        tx_hash = signer.sign_and_send(private_key, transaction)
+
+        context = {"job_id": request.job_id, "rating": request.rating}
+        if not wait:
+            return _pending_response(db, tx_hash.hex(), current_user, "approve_job", context)
+
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=60)
 
         if receipt['status'] != 1:
             raise HTTPException(status_code=400, detail="Transação falhou na blockchain.")
 
         try:
-            job = bico_certo.get_job(job_id_bytes)
-
-            # JobNotificationService.notify_job_approved(
-            #     db=db,
-            #     provider_address=job.provider,
-            #     job_id=request.job_id,
-            #     ipfs_hash=job.ipfs_hash,
-            #     client_name=current_user.full_name,
-            #     rating=request.rating
-            # )
-
             # Após aprovar o job com sucesso
-            JobNotificationService.notify_provider_to_rate_client(
-                db=db,
-                provider_address=job.provider,
-                job_id=request.job_id,
-                ipfs_hash=job.ipfs_hash,
-                client_name=current_user.full_name
-            )
+            _notify_job_approved(db, current_user, context)
         except Exception as e:
             print(f"Erro ao enviar notificação: {e}")
 
@@ -628,6 +750,7 @@ async def approve_job(
 @router.post("/cancel", response_model=APIResponse)
 async def cancel_job(
         request: CancelJobRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -648,10 +771,12 @@ async def cancel_job(
         job_id_bytes = bytes.fromhex(request.job_id)
         transaction = bico_certo.prepare_cancel_job_transaction(wallet["address"], job_id_bytes)
 
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+        tx_hash = signer.sign_and_send(private_key, transaction)
+
+        if not wait:
+            return _pending_response(db, tx_hash.hex(), current_user, "cancel_job", {"job_id": request.job_id})
+
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=60)
 
         if receipt['status'] != 1:
             raise HTTPException(status_code=400, detail="Transação falhou na blockchain.")
@@ -667,6 +792,7 @@ async def cancel_job(
 @router.post("/cancel-open", response_model=APIResponse)
 async def cancel_open_job(
         request: CancelJobRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -687,10 +813,12 @@ async def cancel_open_job(
         job_id_bytes = bytes.fromhex(request.job_id)
         transaction = bico_certo.prepare_cancel_open_job_transaction(wallet["address"], job_id_bytes)
 
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+        tx_hash = signer.sign_and_send(private_key, transaction)
+
+        if not wait:
+            return _pending_response(db, tx_hash.hex(), current_user, "cancel_open_job", {"job_id": request.job_id})
+
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=60)
 
         if receipt['status'] != 1:
             raise HTTPException(status_code=400, detail="Transação falhou na blockchain.")
@@ -706,6 +834,7 @@ async def cancel_open_job(
 @router.post("/reject-job", response_model=APIResponse)
 async def reject_job(
         request: CancelJobRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -726,24 +855,19 @@ async def reject_job(
         job_id_bytes = bytes.fromhex(request.job_id)
         transaction = bico_certo.prepare_reject_job_transaction(wallet["address"], job_id_bytes)
 
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+        tx_hash = signer.sign_and_send(private_key, transaction)
+
+        context = {"job_id": request.job_id}
+        if not wait:
+            return _pending_response(db, tx_hash.hex(), current_user, "reject_job", context)
+
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=60)
 
         if receipt['status'] != 1:
             raise HTTPException(status_code=400, detail="Transação falhou na blockchain.")
 
         try:
-            job = bico_certo.get_job(job_id_bytes)
-
-            JobNotificationService.notify_job_rejected(
-                db=db,
-                provider_address=job.provider,
-                job_id=request.job_id,
-                ipfs_hash=job.ipfs_hash,
-                client_name=current_user.full_name
-            )
+            _notify_job_rejected(db, current_user, context)
         except Exception as e:
             print(f"Erro ao enviar notificação: {e}")
 
@@ -758,6 +882,7 @@ async def reject_job(
 @router.post("/accept-proposal", response_model=APIResponse)
 async def accept_proposal(
         request: AnswerProposalRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -815,15 +940,16 @@ async def accept_proposal(
         transaction = bico_certo.prepare_accept_proposal_transaction(wallet.address, bytes.fromhex(request.proposal_id), additional_funds_needed)
 
         # Assinar e enviar
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-
         signer = TransactionSigner()
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = signer.sign_and_send(private_key, transaction)
         tx_hash_hex = tx_hash.hex()
 
+        context = {"proposal_id": request.proposal_id, "status": "accepted"}
+        if not wait:
+            return _pending_response(db, tx_hash_hex, current_user, "accept_proposal", context)
+
         # Aguardar confirmação
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=30)
 
         if receipt['status'] != 1:
             raise HTTPException(
@@ -832,18 +958,7 @@ async def accept_proposal(
             )
 
         try:
-            proposal = bico_certo.contract.functions.getProposal(
-                bytes.fromhex(request.proposal_id)
-            ).call()
-            job = bico_certo.get_job(proposal[1])
-
-            JobNotificationService.notify_proposal_accepted(
-                db=db,
-                provider_address=proposal[2],
-                job_id=proposal[1].hex(),
-                ipfs_hash=job.ipfs_hash,
-                client_name=current_user.full_name
-            )
+            _notify_proposal_answered(db, current_user, context)
         except Exception as e:
             print(f"Erro ao enviar notificação: {e}")
 
@@ -866,6 +981,7 @@ async def accept_proposal(
 @router.post("/reject-proposal", response_model=APIResponse)
 async def reject_proposal(
         request: AnswerProposalRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -904,14 +1020,15 @@ async def reject_proposal(
         signer = TransactionSigner()
 
         # Assinar e enviar
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = signer.sign_and_send(private_key, transaction)
         tx_hash_hex = tx_hash.hex()
 
+        context = {"proposal_id": request.proposal_id, "status": "rejected"}
+        if not wait:
+            return _pending_response(db, tx_hash_hex, current_user, "reject_proposal", context)
+
         # Aguardar confirmação
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=30)
 
         if receipt['status'] != 1:
             raise HTTPException(
@@ -920,18 +1037,7 @@ async def reject_proposal(
             )
 
         try:
-            proposal = bico_certo.contract.functions.getProposal(
-                bytes.fromhex(request.proposal_id)
-            ).call()
-            job = bico_certo.get_job(proposal[1])
-
-            JobNotificationService.notify_proposal_rejected(
-                db=db,
-                provider_address=proposal[2],
-                job_id=proposal[1].hex(),
-                ipfs_hash=job.ipfs_hash,
-                client_name=current_user.full_name
-            )
+            _notify_proposal_answered(db, current_user, context)
         except Exception as e:
             print(f"Erro ao enviar notificação: {e}")
 
@@ -954,6 +1060,7 @@ async def reject_proposal(
 @router.post("/cancel-proposal", response_model=APIResponse)
 async def cancel_proposal(
         request: AnswerProposalRequest,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -990,13 +1097,14 @@ async def cancel_proposal(
 
         signer = TransactionSigner()
 
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = signer.sign_and_send(private_key, transaction)
         tx_hash_hex = tx_hash.hex()
 
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+        context = {"proposal_id": request.proposal_id, "job_id": proposal[1].hex()}
+        if not wait:
+            return _pending_response(db, tx_hash_hex, current_user, "cancel_proposal", context)
+
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=30)
 
         if receipt['status'] != 1:
             raise HTTPException(
@@ -1005,14 +1113,7 @@ async def cancel_proposal(
             )
 
         try:
-            job = bico_certo.get_job(proposal[1])
-            JobNotificationService.notify_cancel_proposal(
-                db=db,
-                client_address=job.client,
-                job_id=proposal[1].hex(),
-                ipfs_hash=job.ipfs_hash,
-                provider_name=current_user.full_name
-            )
+            _notify_proposal_canceled(db, current_user, context)
         except Exception as e:
             print(f"Erro ao enviar notificação de nova proposta: {e}")
 
@@ -1040,9 +1141,9 @@ async def get_job(
        Recupera as informações do Job
     """
 
-    job_data = bico_certo.get_job(bytes.fromhex(job_id)).to_dict()
+    job_data = (await async_bico_certo.get_job(bytes.fromhex(job_id))).to_dict()
 
-    success, message, metadata = ipfs_service.get_job_data(job_data['ipfs_hash'])
+    success, message, metadata = await async_ipfs.get_json(job_data['ipfs_hash'])
 
     if not success:
         raise HTTPException(
@@ -1052,15 +1153,14 @@ async def get_job(
     accepted_proposal = None
     pending_proposal_count = 0
     if job_data["total_proposals"] > 0:
-        proposals = bico_certo.contract.functions.getJobProposals(bytes.fromhex(job_id)).call()
-        for proposal_id in proposals:
-            proposal_data = bico_certo.contract.functions.getProposal(proposal_id).call()
+        proposal_ids = await async_bico_certo.get_job_proposals(bytes.fromhex(job_id))
+        for proposal_data in await async_bico_certo.get_proposals(proposal_ids):
             if job_data["openForProposals"]:
                 if ProposalStatus(proposal_data[6]) == ProposalStatus.PENDING:
                     pending_proposal_count += 1
             else:
                 if ProposalStatus(proposal_data[6]) == ProposalStatus.ACCEPTED:
-                    success, message, metadata_proposal = ipfs_service.get_job_data(proposal_data[7])
+                    success, message, metadata_proposal = await async_ipfs.get_json(proposal_data[7])
                     accepted_proposal = metadata_proposal["data"]
 
     return APIResponse.success_response(
@@ -1077,27 +1177,36 @@ async def get_job(
 @router.get("/open-jobs", response_model=APIResponse)
 async def get_open_jobs(
         category: Optional[str] = Query(None, description="Filtrar por categoria"),
-        search: Optional[str] = Query(None, description="Buscar por título ou descrição")
+        search: Optional[str] = Query(None, description="Buscar por título ou descrição"),
+        db: Session = Depends(get_db)
 ):
     """
     Lista todos os jobs abertos para propostas
     Opcionalmente filtra por categoria e/ou busca por texto
     """
     try:
-        open_job_ids = bico_certo.contract.functions.getOpenJobs().call()
+        pending = _pending_proposals_subquery(db)
+        query = db.query(
+            IndexedJob,
+            func.coalesce(pending.c.pending_count, 0)
+        ).outerjoin(
+            pending, pending.c.job_id == IndexedJob.id
+        ).filter(
+            IndexedJob.open_for_proposals == True
+        )
 
-        jobs = []
-        for job_id in open_job_ids:
-            job_data = bico_certo.get_job(job_id).to_dict()
+        # Filtrar por categoria se fornecida
+        if category is not None:
+            query = query.filter(func.lower(IndexedJob.service_type) == category.lower())
 
-            success, message, metadata = ipfs_service.get_job_data(job_data["ipfs_hash"])
-            success_image, message_image, metadata_image = ipfs_service.get_job_data(metadata["data"])
+        rows = query.order_by(IndexedJob.created_at).all()
+        results = await async_ipfs.get_json_many([indexed_job.ipfs_hash for indexed_job, _ in rows])
 
-            if success:
-                # Filtrar por categoria se fornecida
-                if category is not None and job_data["service_type"].lower() != category.lower():
-                    continue
+        jobs = []
+        for (indexed_job, pending_proposal_count), (success, message, metadata) in zip(rows, results):
+            job_data = indexed_job.to_job().to_dict()
 
+            if success:
                 # Filtrar por busca de texto se fornecida
                 if search is not None:
                     search_lower = search.lower()
@@ -1108,15 +1217,6 @@ async def get_open_jobs(
                     if search_lower not in title and search_lower not in description:
                         continue
 
-                pending_proposal_count = 0
-
-                if job_data["total_proposals"] > 0:
-                    proposals = bico_certo.contract.functions.getJobProposals(job_id).call()
-                    for proposal_id in proposals:
-                        proposal_data = bico_certo.contract.functions.getProposal(proposal_id).call()
-                        if ProposalStatus(proposal_data[6]) == ProposalStatus.PENDING:
-                            pending_proposal_count += 1
-
                 jobs.append({
                     **job_data,
                     "pending_proposal_count": pending_proposal_count,
@@ -1167,36 +1267,51 @@ async def get_my_jobs(
 
     try:
         # Buscar jobs onde o usuário é o cliente
-        all_jobs = bico_certo.contract.functions.getUserJobs(wallet.address).call()
+        pending = _pending_proposals_subquery(db)
+        rows = db.query(
+            IndexedJob,
+            func.coalesce(pending.c.pending_count, 0)
+        ).outerjoin(
+            pending, pending.c.job_id == IndexedJob.id
+        ).filter(
+            IndexedJob.client == Web3.to_checksum_address(wallet.address)
+        ).order_by(IndexedJob.created_at).all()
+
+        # Propostas aceitas dos jobs que já saíram do modo aberto
+        accepted_proposals = {
+            proposal.job_id: proposal
+            for proposal in db.query(IndexedProposal).filter(
+                IndexedProposal.job_id.in_([indexed_job.id for indexed_job, _ in rows]),
+                IndexedProposal.status == ProposalStatus.ACCEPTED.value
+            ).all()
+        } if rows else {}
+
+        jobs_data = [indexed_job.to_job().to_dict() for indexed_job, _ in rows]
+        with_accepted = [
+            indexed_job.id
+            for (indexed_job, _), job_data in zip(rows, jobs_data)
+            if not job_data["openForProposals"] and indexed_job.id in accepted_proposals
+        ]
+
+        # Metadados dos jobs e das propostas aceitas buscados em paralelo
+        results, proposal_results = await asyncio.gather(
+            async_ipfs.get_json_many([indexed_job.ipfs_hash for indexed_job, _ in rows]),
+            async_ipfs.get_json_many([accepted_proposals[job_id].ipfs_hash for job_id in with_accepted])
+        )
+        accepted_metadata = {
+            job_id: metadata_proposal.get("data") if success_proposal and metadata_proposal else None
+            for job_id, (success_proposal, _, metadata_proposal) in zip(with_accepted, proposal_results)
+        }
 
         jobs = []
-        for job_id in all_jobs:
-            job_data = bico_certo.get_job(job_id).to_dict()
-
-            # Filtrar apenas jobs onde o usuário é o cliente
-            if job_data["client"].lower() != wallet.address.lower():
-                continue
-
-            ipfs_cid = job_data["ipfs_hash"]
-            success, message, metadata = ipfs_service.get_job_data(ipfs_cid)
-
+        for (indexed_job, pending_count), job_data, (success, message, metadata) in zip(rows, jobs_data, results):
             pending_proposal_count = 0
-            total_proposals = job_data["total_proposals"]
             accepted_proposal = None
 
-            if total_proposals > 0:
-                # Buscar todas as propostas do job
-                proposals = bico_certo.contract.functions.getJobProposals(job_id).call()
-
-                for proposal_id in proposals:
-                    proposal_data = bico_certo.contract.functions.getProposal(proposal_id).call()
-                    if job_data["openForProposals"]:
-                        if ProposalStatus(proposal_data[6]) == ProposalStatus.PENDING:
-                            pending_proposal_count += 1
-                    else:
-                        if ProposalStatus(proposal_data[6]) == ProposalStatus.ACCEPTED:
-                            success, message, metadata_proposal = ipfs_service.get_job_data(proposal_data[7])
-                            accepted_proposal = metadata_proposal["data"]
+            if job_data["openForProposals"]:
+                pending_proposal_count = pending_count
+            else:
+                accepted_proposal = accepted_metadata.get(indexed_job.id)
 
             jobs.append({
                 **job_data,
@@ -1220,38 +1335,35 @@ async def get_my_jobs(
         )
 
 @router.get("/job/{job_id}/proposals", response_model=APIResponse)
-async def get_job_proposals(job_id: str):
+async def get_job_proposals(
+        job_id: str,
+        db: Session = Depends(get_db)
+):
     """
     Lista todas as propostas de um job
     """
     try:
-        # Buscar propostas do job
-        proposal_ids = bico_certo.contract.functions.getJobProposals(
-            bytes.fromhex(job_id)
-        ).call()
-
-        proposals = []
-        for proposal_id in proposal_ids:
-            proposal_data = bico_certo.contract.functions.getProposal(proposal_id).call()
+        # Buscar propostas do job (mais recentes primeiro)
+        indexed_proposals = db.query(IndexedProposal).filter(
+            IndexedProposal.job_id == job_id.lower()
+        ).order_by(IndexedProposal.created_at.desc()).all()
 
-            # Buscar metadata do IPFS
-            ipfs_cid = proposal_data[7]  # ipfsHash
-            success, message, metadata = ipfs_service.get_job_data(ipfs_cid)
+        # Buscar metadata do IPFS de todas as propostas em paralelo
+        results = await async_ipfs.get_json_many([proposal.ipfs_hash for proposal in indexed_proposals])
 
+        proposals = []
+        for proposal, (success, message, metadata) in zip(indexed_proposals, results):
             proposals.append({
-                "proposal_id": proposal_id.hex(),
-                "provider": proposal_data[2],
-                "amount": bico_certo.w3.from_wei(proposal_data[3], 'ether'),
-                "estimated_time_days": proposal_data[4],
-                "created_at": datetime.fromtimestamp(proposal_data[5]).isoformat(),
-                "status": ProposalStatus(proposal_data[6]).name,
+                "proposal_id": proposal.id,
+                "provider": proposal.provider,
+                "amount": proposal.amount,
+                "estimated_time_days": proposal.estimated_time,
+                "created_at": datetime.fromtimestamp(proposal.created_at).isoformat(),
+                "status": proposal.status_name,
                 "metadata": metadata if success else None,
-                "ipfs_cid": ipfs_cid
+                "ipfs_cid": proposal.ipfs_hash
             })
 
-        # Ordenar por data de criação (mais recentes primeiro)
-        proposals.sort(key=lambda x: x["created_at"], reverse=True)
-
         return APIResponse.success_response(
             data={
                 "job_id": job_id,
@@ -1289,26 +1401,27 @@ async def get_my_proposals(
         )
 
     try:
-        # Buscar propostas do provider
-        proposal_ids = bico_certo.contract.functions.getProviderProposals(
-            wallet.address
-        ).call()
+        # Buscar propostas do provider junto com o job de cada uma
+        rows = db.query(IndexedProposal, IndexedJob).join(
+            IndexedJob, IndexedJob.id == IndexedProposal.job_id
+        ).filter(
+            IndexedProposal.provider == Web3.to_checksum_address(wallet.address)
+        ).order_by(IndexedProposal.created_at).all()
 
-        proposals = []
-        for proposal_id in proposal_ids:
-            proposal_data = bico_certo.contract.functions.getProposal(proposal_id).call()
-            job_data = bico_certo.get_job(proposal_data[1]).to_dict()
+        results = await async_ipfs.get_json_many([indexed_job.ipfs_hash for _, indexed_job in rows])
 
-            success, message, metadata = ipfs_service.get_job_data(job_data["ipfs_hash"])
+        proposals = []
+        for (proposal, indexed_job), (success, message, metadata) in zip(rows, results):
+            job_data = indexed_job.to_job().to_dict()
             job_data["metadata"] = metadata
 
             proposals.append({
-                "proposal_id": proposal_id.hex(),
-                "job_id": proposal_data[1].hex(),
-                "amount": bico_certo.w3.from_wei(proposal_data[3], 'ether'),
-                "estimated_time_days": proposal_data[4],
-                "status": ProposalStatus(proposal_data[6]).name,
-                "created_at": datetime.fromtimestamp(proposal_data[5]).isoformat(),
+                "proposal_id": proposal.id,
+                "job_id": proposal.job_id,
+                "amount": proposal.amount,
+                "estimated_time_days": proposal.estimated_time,
+                "status": proposal.status_name,
+                "created_at": datetime.fromtimestamp(proposal.created_at).isoformat(),
                 "job": {**job_data}
             })
 
@@ -1336,13 +1449,11 @@ async def get_proposal(proposal_id: str):
     """
     try:
         # Buscar jobs abertos do contrato
-        proposal = bico_certo.contract.functions.getProposal(
-            bytes.fromhex(proposal_id)
-        ).call()
+        proposal = await async_bico_certo.get_proposal(bytes.fromhex(proposal_id))
 
         # Buscar metadata do IPFS
         ipfs_cid = proposal[7]  # ipfsHash
-        success, message, metadata = ipfs_service.get_job_data(ipfs_cid)
+        success, message, metadata = await async_ipfs.get_json(ipfs_cid)
 
         if success:
             return APIResponse.success_response(
@@ -1372,16 +1483,14 @@ async def get_job_active_proposals(job_id: str):
     """
     try:
         # Buscar propostas do job
-        proposals = bico_certo.contract.functions.getActiveProposalsForJob(
-            bytes.fromhex(job_id)
-        ).call()
+        proposals = await async_bico_certo.get_active_proposals_for_job(bytes.fromhex(job_id))
 
-        proposals_formated = []
-        for proposal_data in proposals:
+        # Buscar metadata do IPFS de todas as propostas em paralelo
+        results = await async_ipfs.get_json_many([proposal_data[7] for proposal_data in proposals])
 
-            # Buscar metadata do IPFS
+        proposals_formated = []
+        for proposal_data, (success, message, metadata) in zip(proposals, results):
             ipfs_cid = proposal_data[7]  # ipfsHash
-            success, message, metadata = ipfs_service.get_job_data(ipfs_cid)
 
             proposals_formated.append({
                 "proposal_id": proposal_data[0].hex(),
@@ -1421,13 +1530,9 @@ async def get_reputation(address: str, client: bool):
     """
     try:
         if client:
-            reputation = Reputation(bico_certo.contract.functions.getClientProfile(
-                address
-            ).call()).to_dict()
+            reputation = Reputation(await async_bico_certo.get_client_profile(address)).to_dict()
         else:
-            reputation = Reputation(bico_certo.contract.functions.getProviderProfile(
-                address
-            ).call()).to_dict()
+            reputation = Reputation(await async_bico_certo.get_provider_profile(address)).to_dict()
 
         return APIResponse.success_response(
             data={
@@ -1445,6 +1550,7 @@ async def get_reputation(address: str, client: bool):
 @router.post("/rate-client", response_model=APIResponse)
 async def rate_client(
     request: ApproveJobRequest,  # Reutilizando o schema existente (job_id, rating, password)
+    wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -1469,10 +1575,14 @@ async def rate_client(
             request.rating
         )
 
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+        tx_hash = signer.sign_and_send(private_key, transaction)
+
+        if not wait:
+            return _pending_response(
+                db, tx_hash.hex(), current_user, "rate_client", {"job_id": request.job_id, "rating": request.rating}
+            )
+
+        receipt = await _wait_for_receipt(signer, tx_hash, timeout=60)
 
         if receipt['status'] != 1:
             raise HTTPException(status_code=400, detail="Transação falhou na blockchain.")
@@ -1,13 +1,14 @@
-from eth_account import Account
+import asyncio
 
 from app.model.bico_certo_main import BicoCerto
 from app.model.wallet import Wallet
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.util.responses import APIResponse
 from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.model.user import User
 from app.auth.dependencies import get_current_user
+from app.service.transaction_tracker import transaction_tracker
 from app.wallet.transaction import TransactionSigner
 from app.wallet.wallet_service import WalletService
 
@@ -18,6 +19,7 @@ bico_certo = BicoCerto()
 @router.post("/withdraw", response_model=APIResponse)
 async def withdraw(
         password: str,
+        wait: bool = Query(True, description="Aguardar o recibo; se falso, retorna um tracking_id na hora"),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -56,13 +58,22 @@ async def withdraw(
         )
 
     try:
-        account = Account.from_key(private_key)
-        signed_tx = account.sign_transaction(transaction)
-
-        tx_hash = signer.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = signer.sign_and_send(private_key, transaction)
         tx_hash_hex = tx_hash.hex()
 
-        receipt = signer.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+        if not wait:
+            pending = transaction_tracker.track(db, tx_hash_hex, current_user.id, "withdraw", {})
+            return APIResponse.success_response(
+                data={
+                    "tracking_id": pending.id,
+                    "transaction_hash": tx_hash_hex,
+                    "status": "pending"
+                },
+                message="Transação enviada. A confirmação será notificada pelo websocket"
+            )
+
+        # Espera o recibo em uma thread, sem travar o event loop
+        receipt = await asyncio.to_thread(signer.w3.eth.wait_for_transaction_receipt, tx_hash, timeout=30)
 
         if receipt['status'] != 1:
             raise HTTPException(
@@ -0,0 +1,61 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from ..auth.dependencies import get_current_user
+from ..config.database import get_db
+from ..model.pending_transaction import PendingTransaction, TransactionStatus
+from ..model.user import User
+from ..service.transaction_tracker import TransactionTracker
+from ..util.responses import APIResponse
+
+router = APIRouter(prefix="/transactions", tags=["Transactions"])
+
+
+@router.get("/{tracking_id}", response_model=APIResponse)
+async def get_transaction_status(
+        tracking_id: str,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Status de uma transação enviada com wait=false
+    """
+    pending = db.query(PendingTransaction).filter(
+        PendingTransaction.id == tracking_id,
+        PendingTransaction.user_id == current_user.id
+    ).first()
+
+    if not pending:
+        raise HTTPException(status_code=404, detail="Transação não encontrada")
+
+    return APIResponse.success_response(
+        data=TransactionTracker.to_dict(pending),
+        message="Status da transação recuperado"
+    )
+
+
+@router.get("", response_model=APIResponse)
+async def list_transactions(
+        status: Optional[TransactionStatus] = Query(None, description="Filtrar por status"),
+        limit: int = Query(20, ge=1, le=100),
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Transações acompanhadas do usuário, das mais recentes para as mais antigas
+    """
+    query = db.query(PendingTransaction).filter(PendingTransaction.user_id == current_user.id)
+    if status:
+        query = query.filter(PendingTransaction.status == status)
+
+    rows = query.order_by(PendingTransaction.created_at.desc()).limit(limit).all()
+
+    return APIResponse.success_response(
+        data={
+            "transactions": [TransactionTracker.to_dict(row) for row in rows],
+            "total": len(rows)
+        },
+        message="Transações recuperadas"
+    )
@@ -1,13 +1,14 @@
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from web3 import Web3
 from ..config.settings import fuso_local, settings
 from ..config.database import get_db
 from ..model.wallet import Wallet
 from ..service.job_notification_service import JobNotificationService
+from ..service.tx_history_indexer import tx_history_indexer
 from ..wallet.blockchain_service import BlockchainService
 from ..wallet.wallet_service import WalletService
 from ..wallet.transaction import TransactionSigner
@@ -259,13 +260,17 @@ async def transfer_eth(
 
 @router.get("/transactions", response_model=APIResponse)
 async def list_blockchain_transactions(
-        limit: int = 20,
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
         filter_type: Optional[str] = None,
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
     """
-    Lista transações diretamente da blockchain
+    Lista as transações da carteira a partir do histórico indexado, como
+    está: a sincronização fica com o indexador em background, e
+    indexed_block diz até onde o histórico vai. Transferências internas sem
+    evento (ex: a taxa da plataforma) não fazem parte do histórico
     """
 
     wallet = db.query(Wallet).filter(
@@ -278,39 +283,33 @@ async def list_blockchain_transactions(
             message="Você não possui uma carteira"
         )
 
-    blockchain_service = BlockchainService()
-
-    result = blockchain_service.get_wallet_transactions(
-        address=wallet.address
+    before = None
+    if cursor:
+        before = tx_history_indexer.decode_cursor(cursor)
+        if before is None:
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    result = tx_history_indexer.get_history(
+        db,
+        address=wallet.address,
+        limit=limit,
+        before=before,
+        direction=filter_type
     )
 
-    transactions = result.get("transactions", [])
-
-    transactions = [tx for tx in transactions if tx.get("value", 0) != 0]
-
-    if filter_type and filter_type in ["send", "receive"]:
-        transactions = [tx for tx in transactions if tx["type"] == filter_type and tx["value"] != 0]
-
-    safe_transactions = []
-
-    for tx in transactions:
-
-        tx_data = dict(tx)
-
-        if 'input' in tx_data and isinstance(tx_data['input'], bytes):
-            tx_data['input'] = blockchain_service.w3.to_hex(tx_data['input'])
-
-        safe_transactions.append(tx_data)
+    signer = TransactionSigner()
+    transactions = result["transactions"]
 
     return APIResponse.success_response(
         data={
-            "transactions": safe_transactions[:limit],
+            "transactions": transactions,
             "wallet_address": wallet.address,
             "total": len(transactions),
-            "limit": limit,
-            "current_balance": blockchain_service.w3.from_wei(
-                blockchain_service.w3.eth.get_balance(wallet.address), 'ether'
-            )
+            "limit": result["limit"],
+            "has_more": result["has_more"],
+            "next_cursor": result["next_cursor"],
+            "indexed_block": result["indexed_block"],
+            "current_balance": signer.get_balance(wallet.address)
         },
         message=f"Encontradas {len(transactions)} transações na blockchain"
     )
@@ -0,0 +1,25 @@
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from .settings import settings
+
+_client: Optional[redis.Redis] = None
+_async_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Cliente Redis compartilhado (o pool de conexões fica no próprio cliente)"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Cliente Redis assíncrono compartilhado, para uso no event loop (ex: pub/sub)"""
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_client
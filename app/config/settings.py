@@ -52,6 +52,12 @@ class Settings(BaseSettings):
     WEB3_PROVIDER_URL: str = "http://127.0.0.1:8545"
     ZERO_GAS_COST: bool = True  # Gas gratuito para rede privada
     NETWORK_CHAIN_ID: int = 1337  # Chain ID do Ganache/Hardhat
+    WEB3_POOL_SIZE: int = 20  # Conexões keep-alive do provider HTTP compartilhado
+    WEB3_TIMEOUT_SECONDS: float = 30.0
+    WEB3_BATCH_SIZE: int = 100  # Chamadas por batch JSON-RPC / multicall
+    MULTICALL_ADDRESS: str = ""  # Endereço do Multicall3, se implantado na rede
+    WEB3_ASYNC_POOL_SIZE: int = 50  # Conexões simultâneas do provider assíncrono
+    WEB3_ASYNC_TIMEOUT_SECONDS: float = 30.0
 
     # Wallet Configuration
     WALLET_ENCRYPTION_KEY: str
@@ -60,6 +66,69 @@ class Settings(BaseSettings):
 
     IPFS_API_URL: str = "/ip4/127.0.0.1/tcp/5001"  # API do IPFS
     IPFS_GATEWAY_URL: str = "http://localhost:8080"  # Gateway para acessar arquivos
+    IPFS_HEALTH_INTERVAL_SECONDS: float = 15.0
+    IPFS_RECONNECT_MIN_SECONDS: float = 1.0
+    IPFS_RECONNECT_MAX_SECONDS: float = 60.0
+    IPFS_MAX_CONCURRENCY: int = 16  # Requisições simultâneas do cliente assíncrono
+    IPFS_TIMEOUT_SECONDS: float = 30.0
+    IPFS_CACHE_MEMORY_BYTES: int = 64 * 1024 * 1024  # Limite do LRU em memória
+    IPFS_CACHE_DIR: str = "./ipfs_cache"  # Vazio desativa a camada em disco
+
+    # Indexador de jobs/propostas (eventos do JobManager)
+    JOB_INDEXER_ENABLED: bool = True
+    JOB_INDEXER_POLL_SECONDS: float = 2.0
+    JOB_INDEXER_START_BLOCK: int = 0
+    JOB_INDEXER_BLOCK_RANGE: int = 2000  # Blocos por chamada eth_getLogs
+    PLATFORM_DASHBOARD_CACHE_SECONDS: float = 60.0  # Validade do snapshot de jobs do dashboard da plataforma
+
+    # Histórico de transações por endereço (ingestão dos blocos)
+    TX_HISTORY_ENABLED: bool = True
+    TX_HISTORY_POLL_SECONDS: float = 2.0
+    TX_HISTORY_START_BLOCK: int = 0
+    TX_HISTORY_BLOCK_BATCH: int = 100  # Blocos lidos por batch JSON-RPC
+
+    # Acompanhamento das transações enviadas sem aguardar o recibo
+    TX_TRACKER_POLL_SECONDS: float = 1.0
+    TX_TRACKER_TIMEOUT_SECONDS: int = 600  # Sem recibo após esse tempo, a transação é marcada como descartada
+    TX_TRACKER_BATCH_SIZE: int = 200  # Transações pendentes verificadas por bloco
+
+    # Redis (estado compartilhado entre workers)
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Alocação de nonces: "memory" (um único worker) ou "redis" (vários workers)
+    NONCE_BACKEND: str = "memory"
+    NONCE_RESYNC_SECONDS: int = 30  # Intervalo para reler o nonce da rede (e prazo de uma reserva esquecida)
+
+    # Eventos de websocket entre workers: "memory" (um worker) ou "redis" (pub/sub)
+    BROADCAST_BACKEND: str = "memory"
+    PRESENCE_HEARTBEAT_SECONDS: float = 15.0  # Com o backend "redis": renovação da presença nas salas
+    PRESENCE_TTL_SECONDS: int = 45  # Presença sem renovação (worker que caiu) expira depois disso
+
+    # Fila de saída de cada websocket
+    WS_SEND_QUEUE_SIZE: int = 100
+    WS_SLOW_CONSUMER_POLICY: str = "disconnect"  # Com a fila cheia: "disconnect" ou "drop_oldest"
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0
+
+    # Salas de cada usuário em memória, para autorizar a entrada no websocket
+    CHAT_MEMBERSHIP_CACHE_SECONDS: int = 300
+    CHAT_JOB_TITLE_RETRY_SECONDS: int = 3600  # Espera para tentar de novo um título de job não resolvido
+
+    # Mensagens do websocket confirmadas na hora e gravadas em lote (write-behind)
+    CHAT_WRITE_BEHIND: bool = False
+    CHAT_WRITER_FLUSH_MS: int = 50
+    CHAT_WRITER_BATCH_SIZE: int = 500  # Fila com esse tamanho é gravada sem esperar o intervalo
+    CHAT_WRITER_JOURNAL_DIR: str = "./chat_journal"  # Journal para recuperar mensagens após uma queda
+
+    # Exportação de relatórios (pool de processos)
+    EXPORT_DIR: str = "./exports"
+    EXPORT_MAX_WORKERS: int = 2  # Relatórios gerados ao mesmo tempo
+    EXPORT_MAX_PENDING_PER_USER: int = 3
+    EXPORT_TTL_SECONDS: int = 3600  # Tempo que o arquivo fica disponível para download
+    EXPORT_STALE_SECONDS: int = 900  # Gerando há mais tempo que isso é considerado falha
+    EXPORT_HEARTBEAT_SECONDS: float = 30.0  # Intervalo do sinal de vida dos jobs em andamento
+    EXPORT_HEARTBEAT_TIMEOUT_SECONDS: int = 120  # Sem sinal há mais tempo que isso: processo caiu
+    EXPORT_CLEANUP_INTERVAL_SECONDS: float = 300.0
+    EXPORT_VECTOR_CHARTS: bool = False  # Gráficos do PDF com o ReportLab em vez de PNG do matplotlib
 
     BASE_URL: str
 
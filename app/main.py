@@ -1,3 +1,4 @@
+import asyncio
 import os
 from datetime import datetime
 
@@ -5,11 +6,29 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from .api import auth, job_manager, two_factor, password_recovery, wallet, dashboard, chat, upload
+from .api import auth, job_manager, two_factor, password_recovery, wallet, dashboard, chat, upload, transactions
 from .config.database import engine, Base
 from .config.settings import fuso_local
 from .config.settings import settings
+from .model import job_index  # noqa: F401 - registra as tabelas do índice
+from .model import pending_transaction  # noqa: F401 - registra a tabela de transações pendentes
+from .model import address_transaction  # noqa: F401 - registra a tabela do histórico de transações
+from .model import dashboard_stats  # noqa: F401 - registra as tabelas de agregados dos dashboards
+from .model import export_job  # noqa: F401 - registra a tabela de exportações
 from .service.fcm_service import FCMService
+from .service.job_notification_service import JobNotificationService
+from .service.async_ipfs_client import async_ipfs
+from .service.chat_writer import chat_writer
+from .service.export_service import export_service, run_export_cleanup, run_export_heartbeat
+from .service.ipfs_cache import ipfs_cache
+from .service.ipfs_service import get_ipfs_service, run_ipfs_health_probe
+from .service.job_indexer import run_job_indexer
+from .service.transaction_tracker import run_transaction_tracker
+from .service.tx_history_indexer import run_tx_history_indexer
+from .util.w3_util import init_async_w3, close_async_w3
+from .websocket.broadcast import broadcaster
+from .websocket.chat_handler import run_presence_heartbeat
+from .websocket.outbound import outbound_metrics
 
 from .util.responses import APIResponse
 
@@ -87,6 +106,7 @@ app.include_router(job_manager.router)
 app.include_router(chat.router)
 app.include_router(dashboard.router)
 app.include_router(upload.router)
+app.include_router(transactions.router)
 
 
 # Root endpoint
@@ -108,13 +128,20 @@ async def health_check():
     return APIResponse.success_response(
         data={
             "status": "healthy",
-            "timestamp": datetime.now(fuso_local).isoformat()
+            "timestamp": datetime.now(fuso_local).isoformat(),
+            "ipfs": get_ipfs_service().health(),
+            "ipfs_cache": ipfs_cache.stats(),
+            "websocket": outbound_metrics.stats()
         },
         message="Sistema operacional"
     )
 
 @app.on_event("startup")
 async def startup_event():
+    await init_async_w3()
+    await broadcaster.start()
+    JobNotificationService.event_loop = asyncio.get_running_loop()
+
     credentials_path = os.path.join(
         os.path.dirname(__file__),
         'firebase-credentials.json'
@@ -124,4 +151,30 @@ async def startup_event():
         FCMService.initialize(credentials_path)
         print("✅ Firebase inicializado com sucesso")
     else:
-        print(f"❌ Arquivo de credenciais não encontrado: {credentials_path}")
\ No newline at end of file
+        print(f"❌ Arquivo de credenciais não encontrado: {credentials_path}")
+
+    if settings.JOB_INDEXER_ENABLED:
+        asyncio.create_task(run_job_indexer())
+
+    if settings.TX_HISTORY_ENABLED:
+        asyncio.create_task(run_tx_history_indexer())
+
+    asyncio.create_task(run_ipfs_health_probe())
+    asyncio.create_task(run_transaction_tracker())
+    asyncio.create_task(run_export_cleanup())
+    asyncio.create_task(run_export_heartbeat())
+
+    if settings.BROADCAST_BACKEND == "redis":
+        asyncio.create_task(run_presence_heartbeat())
+
+    if settings.CHAT_WRITE_BEHIND:
+        await chat_writer.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_async_w3()
+    await async_ipfs.close()
+    await chat_writer.stop()
+    await broadcaster.stop()
+    export_service.shutdown()
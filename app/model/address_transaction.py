@@ -0,0 +1,76 @@
+from typing import Dict, Any
+
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, Index, UniqueConstraint
+from web3 import Web3
+
+from ..config.database import Base
+
+
+class AddressTransaction(Base):
+    """
+    Transação da blockchain vista a partir de um endereço.
+
+    Cada transação gera uma linha para o remetente (send) e outra para o
+    destinatário (receive), para que o histórico de um endereço seja uma
+    consulta indexada por (address, block_number, tx_index, log_index).
+
+    Transferências internas feitas pelo PaymentGateway (pagamento ao
+    provider e reembolso ao cliente) entram como linhas "receive" a partir
+    dos eventos PaymentReleased / RefundIssued, com o log_index do evento;
+    as linhas da transação em si têm log_index -1.
+    """
+    __tablename__ = "address_transactions"
+    __table_args__ = (
+        UniqueConstraint("tx_hash", "address", "log_index", name="uq_address_transactions_tx_address_log"),
+        Index("ix_address_transactions_history", "address", "block_number", "tx_index", "log_index"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Endereço em minúsculas (dono do histórico)
+    address = Column(String, nullable=False)
+    direction = Column(String, nullable=False)  # send | receive
+
+    tx_hash = Column(String, nullable=False, index=True)
+    block_number = Column(BigInteger, nullable=False)
+    tx_index = Column(Integer, nullable=False)
+    log_index = Column(Integer, nullable=False, default=-1, server_default="-1")
+    timestamp = Column(BigInteger, nullable=False)
+
+    from_address = Column(String, nullable=False)
+    to_address = Column(String)  # Nulo na criação de contrato
+    contract_address = Column(String)
+
+    # Valores em wei guardados como texto (uint256 não cabe em BIGINT)
+    value_wei = Column(String, nullable=False, default="0")
+    has_value = Column(Boolean, nullable=False, default=False)
+    is_contract_call = Column(Boolean, nullable=False, default=False)
+    is_internal = Column(Boolean, nullable=False, default=False, server_default="false")
+
+    gas = Column(BigInteger, default=0)
+    gas_price_wei = Column(String, default="0")
+    gas_used = Column(BigInteger, default=0)
+    status = Column(Integer, nullable=False, default=1)
+
+    def to_dict(self, latest_block: int, zero_gas: bool) -> Dict[str, Any]:
+        """Mesmo formato retornado antes pelo BlockchainService"""
+        gas_price = int(self.gas_price_wei or 0)
+
+        return {
+            "hash": self.tx_hash,
+            "from": self.from_address,
+            "to": self.to_address,
+            "contract_address": self.contract_address,
+            "value": Web3.from_wei(int(self.value_wei), 'ether'),
+            "gas": self.gas,
+            "gasPrice": 0 if zero_gas else Web3.from_wei(gas_price, 'gwei'),
+            "gasUsed": self.gas_used,
+            "gasCost": 0 if zero_gas else Web3.from_wei(self.gas_used * gas_price, 'ether'),
+            "blockNumber": self.block_number,
+            "timestamp": self.timestamp,
+            "status": "success" if self.status == 1 else "failed",
+            "type": self.direction,
+            "is_contract_call": self.is_contract_call,
+            "is_internal": self.is_internal,
+            "confirmations": max(latest_block - self.block_number, 0)
+        }
@@ -1,9 +1,36 @@
 from app.util.w3_util import *
 from app.model.bico_certo_registry import BicoCertoRegistry
+from app.config.settings import settings
+from app.wallet.nonce_manager import nonce_manager
 from dataclasses import dataclass, asdict
 from enum import Enum
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from datetime import datetime
+import asyncio
+
+from eth_utils.abi import get_abi_output_types
+from web3._utils.abi import map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+
+
+def _multicall_calls(contract, functions: List) -> List[tuple]:
+    """Monta os argumentos de Multicall3.aggregate3 para as chamadas"""
+    return [
+        (function.address, False, contract.encode_abi(function.fn_name, args=function.args))
+        for function in functions
+    ]
+
+
+def _decode_multicall(codec, functions: List, responses: List) -> List[Any]:
+    """Decodifica o retorno de aggregate3 na ordem das chamadas"""
+    results = []
+    for function, (_, return_data) in zip(functions, responses):
+        output_types = get_abi_output_types(function.abi)
+        decoded = codec.decode(output_types, return_data)
+        # Mesma normalização do .call() (endereços em checksum, etc.)
+        normalized = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded)
+        results.append(normalized[0] if len(normalized) == 1 else tuple(normalized))
+    return results
 
 
 # Enums
@@ -48,6 +75,28 @@ class Job:
     openForProposals: bool
     total_proposals: int
 
+    @classmethod
+    def from_chain_data(cls, job_data: tuple) -> "Job":
+        """Cria o Job a partir da tupla retornada por getJob"""
+        return cls(
+            id=job_data[0],
+            client=job_data[1],
+            provider=job_data[2],
+            amount=Web3.from_wei(job_data[3], 'ether'),
+            platform_fee=Web3.from_wei(job_data[4], 'ether'),
+            created_at=job_data[5],
+            accepted_at=job_data[6],
+            completed_at=job_data[7],
+            deadline=job_data[8],
+            status=JobStatus(job_data[9]),
+            service_type=job_data[10],
+            ipfs_hash=job_data[11],
+            client_rating=job_data[12],
+            provider_rating=job_data[13],
+            openForProposals=job_data[14],
+            total_proposals=job_data[15]
+        )
+
     def to_dict(self) -> Dict[str, Any]:
         """Converte o Job para dicionário"""
         data = asdict(self)
@@ -121,6 +170,7 @@ class BicoCerto:
         registry_address: str = "",
     ):
         self.w3 = w3
+        self.multicall = get_multicall()
         if deploy:
             self.contract = deploy_contract("BicoCerto", registry_address)
             self.registry = BicoCertoRegistry(contract_address=registry_address)
@@ -269,20 +319,25 @@ class BicoCerto:
 
     def build_transaction(self, from_address: str, function, payment_wei: Optional[float] = None):
 
-        nonce = self.w3.eth.get_transaction_count(from_address)
+        nonce = nonce_manager.allocate(self.w3, from_address)
 
         # Prepara os parâmetros base da transação
         tx_params = {
             'from': from_address,
             'nonce': nonce,
             'gasPrice': 0,
-            'chainId': self.w3.eth.chain_id
+            'chainId': get_chain_id(self.w3)
         }
 
         if payment_wei is not None:
             tx_params['value'] = payment_wei
 
-        transaction = function.build_transaction(tx_params)
+        try:
+            transaction = function.build_transaction(tx_params)
+        except Exception:
+            # A estimativa de gas falhou (ex: revert): o nonce reservado volta para reuso
+            nonce_manager.release(from_address, nonce)
+            raise
 
         return transaction
 
@@ -417,25 +472,48 @@ class BicoCerto:
     def get_job(self, job_id: bytes) -> Job:
         """Get job details through the main contract"""
         job_data = self.contract.functions.getJob(job_id).call()
-        return Job(
-            id=job_data[0],
-            client=job_data[1],
-            provider=job_data[2],
-            amount=w3.from_wei(job_data[3], 'ether'),
-            platform_fee=w3.from_wei(job_data[4], 'ether'),
-            created_at=job_data[5],
-            accepted_at=job_data[6],
-            completed_at=job_data[7],
-            deadline=job_data[8],
-            status=JobStatus(job_data[9]),
-            service_type=job_data[10],
-            ipfs_hash=job_data[11],
-            client_rating=job_data[12],
-            provider_rating=job_data[13],
-            openForProposals=job_data[14],
-            total_proposals=job_data[15]
-        )
-    
+        return Job.from_chain_data(job_data)
+
+    def get_jobs_data(self, job_ids: List[bytes]) -> List[tuple]:
+        """Retorna as tuplas de getJob de vários jobs, na mesma ordem dos IDs"""
+        return self._call_many([self.contract.functions.getJob(job_id) for job_id in job_ids])
+
+    def get_jobs(self, job_ids: List[bytes]) -> List[Job]:
+        """Busca vários jobs com uma única ida ao nó por lote"""
+        return [Job.from_chain_data(job_data) for job_data in self.get_jobs_data(job_ids)]
+
+    def get_proposals(self, proposal_ids: List[bytes]) -> List[tuple]:
+        """Retorna as tuplas de getProposal de várias propostas, na mesma ordem dos IDs"""
+        return self._call_many([self.contract.functions.getProposal(proposal_id) for proposal_id in proposal_ids])
+
+    def _call_many(self, functions: List) -> List[Any]:
+        """
+        Executa várias chamadas view agrupadas.
+        Usa o Multicall3 quando MULTICALL_ADDRESS estiver configurado,
+        senão envia um batch JSON-RPC com até WEB3_BATCH_SIZE chamadas.
+        """
+        results = []
+        batch_size = settings.WEB3_BATCH_SIZE
+
+        for start in range(0, len(functions), batch_size):
+            chunk = functions[start:start + batch_size]
+
+            if self.multicall is not None:
+                results.extend(self._multicall(chunk))
+                continue
+
+            with self.w3.batch_requests() as batch:
+                for function in chunk:
+                    batch.add(function)
+                results.extend(batch.execute())
+
+        return results
+
+    def _multicall(self, functions: List) -> List[Any]:
+        """Agrega as chamadas em um único eth_call via Multicall3.aggregate3"""
+        responses = self.multicall.functions.aggregate3(_multicall_calls(self.contract, functions)).call()
+        return _decode_multicall(self.w3.codec, functions, responses)
+
     def calculate_platform_fee(self, amount: int) -> int:
         """Calculate platform fee for a given amount"""
         return self.contract.functions.calculatePlatformFee(amount).call()
@@ -443,3 +521,78 @@ class BicoCerto:
     def get_address(self) -> str:
         """Get the contract address"""
         return self.contract.address
+
+
+class AsyncBicoCerto:
+    """
+    Leituras do contrato BicoCerto via AsyncWeb3.
+    Usado pelos handlers async para não bloquear o event loop enquanto espera o nó.
+    """
+
+    def __init__(self):
+        self.w3 = async_w3
+        self.multicall = get_async_multicall()
+        contract_addresses = load_contracts_addresses()
+        self.contract = get_async_instance("BicoCerto", contract_addresses["BicoCerto"])
+
+    async def get_job(self, job_id: bytes) -> Job:
+        job_data = await self.contract.functions.getJob(job_id).call()
+        return Job.from_chain_data(job_data)
+
+    async def get_jobs_data(self, job_ids: List[bytes]) -> List[tuple]:
+        """Retorna as tuplas de getJob de vários jobs, na mesma ordem dos IDs"""
+        return await self._call_many([self.contract.functions.getJob(job_id) for job_id in job_ids])
+
+    async def get_jobs(self, job_ids: List[bytes]) -> List[Job]:
+        return [Job.from_chain_data(job_data) for job_data in await self.get_jobs_data(job_ids)]
+
+    async def get_proposal(self, proposal_id: bytes) -> tuple:
+        return await self.contract.functions.getProposal(proposal_id).call()
+
+    async def get_proposals(self, proposal_ids: List[bytes]) -> List[tuple]:
+        """Retorna as tuplas de getProposal de várias propostas, na mesma ordem dos IDs"""
+        return await self._call_many([self.contract.functions.getProposal(proposal_id) for proposal_id in proposal_ids])
+
+    async def get_user_jobs(self, address: str) -> List[bytes]:
+        return await self.contract.functions.getUserJobs(address).call()
+
+    async def get_job_proposals(self, job_id: bytes) -> List[bytes]:
+        return await self.contract.functions.getJobProposals(job_id).call()
+
+    async def get_provider_proposals(self, address: str) -> List[bytes]:
+        return await self.contract.functions.getProviderProposals(address).call()
+
+    async def get_active_proposals_for_job(self, job_id: bytes) -> List[tuple]:
+        return await self.contract.functions.getActiveProposalsForJob(job_id).call()
+
+    async def get_provider_profile(self, address: str) -> tuple:
+        return await self.contract.functions.getProviderProfile(address).call()
+
+    async def get_client_profile(self, address: str) -> tuple:
+        return await self.contract.functions.getClientProfile(address).call()
+
+    async def get_provider_average_rating(self, address: str) -> int:
+        return await self.contract.functions.getProviderAverageRating(address).call()
+
+    async def _call_many(self, functions: List) -> List[Any]:
+        """
+        Mesmo agrupamento de BicoCerto._call_many, mas os lotes
+        (de até WEB3_BATCH_SIZE chamadas) são enviados em paralelo.
+        """
+        batch_size = settings.WEB3_BATCH_SIZE
+        chunks = [functions[start:start + batch_size] for start in range(0, len(functions), batch_size)]
+
+        chunk_results = await asyncio.gather(*(self._call_chunk(chunk) for chunk in chunks))
+        return [result for chunk in chunk_results for result in chunk]
+
+    async def _call_chunk(self, functions: List) -> List[Any]:
+        if self.multicall is not None:
+            responses = await self.multicall.functions.aggregate3(
+                _multicall_calls(self.contract, functions)
+            ).call()
+            return _decode_multicall(self.w3.codec, functions, responses)
+
+        async with self.w3.batch_requests() as batch:
+            for function in functions:
+                batch.add(function)
+            return list(await batch.async_execute())
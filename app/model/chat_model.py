@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, String, Text, DateTime, Boolean, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, DateTime, Boolean, ForeignKey, Index, Integer, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..config.database import Base
@@ -34,16 +34,37 @@ class ChatRoom(Base):
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(fuso_local))
     updated_at = Column(DateTime(timezone=True), onupdate=lambda: datetime.now(fuso_local))
 
-    # Contadores para otimização
-    total_messages = Column(String, default="0")
-    unread_client = Column(String, default="0")
-    unread_provider = Column(String, default="0")
+    # Contadores para otimização. Alterados só com UPDATE atômico
+    # (ChatService.increment_counters / reset_unread), nunca lidos e regravados
+    total_messages = Column(Integer, nullable=False, default=0, server_default="0")
+    unread_client = Column(Integer, nullable=False, default=0, server_default="0")
+    unread_provider = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Resumo desnormalizado para a lista de salas, sem consultar blockchain/IPFS
+    # nem as tabelas de usuários e mensagens. Preenchido na criação da sala e
+    # atualizado a cada mensagem enviada
+    job_title = Column(String)
+    job_title_checked_at = Column(DateTime(timezone=True))  # Última tentativa de resolver o título
+    client_name = Column(String)
+    client_email = Column(String)
+    provider_name = Column(String)
+    provider_email = Column(String)
+
+    last_message_id = Column(String)
+    last_message_preview = Column(String(100))
+    last_message_sender_name = Column(String)
 
     # Relationships
     client = relationship("User", foreign_keys=[client_id], backref="client_chats")
     provider = relationship("User", foreign_keys=[provider_id], backref="provider_chats")
     messages = relationship("ChatMessage", back_populates="room", cascade="all, delete-orphan")
 
+    # Lista de salas do usuário ordenada pela última mensagem
+    __table_args__ = (
+        Index("ix_chat_rooms_client_last_message", "client_id", "last_message_at"),
+        Index("ix_chat_rooms_provider_last_message", "provider_id", "last_message_at"),
+    )
+
 
 class ChatMessage(Base):
     """Mensagens do chat"""
@@ -75,6 +96,11 @@ class ChatMessage(Base):
     reply_to_id = Column(String, ForeignKey("chat_messages.id"), nullable=True)
     reply_to = relationship("ChatMessage", remote_side=[id])
 
+    # Histórico paginado por cursor (created_at, id) dentro da sala
+    __table_args__ = (
+        Index("ix_chat_messages_room_created_id", "room_id", "created_at", "id"),
+    )
+
 
 class ChatNotification(Base):
     """Notificações de chat"""
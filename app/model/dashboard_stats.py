@@ -0,0 +1,54 @@
+from sqlalchemy import Column, String, Integer, BigInteger
+
+from ..config.database import Base
+
+
+# Agregados dos dashboards por endereço, mantidos pelo DashboardAggregator
+# a cada mudança de estado de um job indexado. Endereços em minúsculas;
+# role é "provider" ou "client".
+
+class DashboardStatusCount(Base):
+    """Quantidade de jobs do endereço em cada status"""
+    __tablename__ = "dashboard_status_counts"
+
+    address = Column(String, primary_key=True)
+    role = Column(String, primary_key=True)
+    status = Column(Integer, primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
+
+
+class DashboardDailyBucket(Base):
+    """Jobs concluídos por dia (data de completed_at) e categoria"""
+    __tablename__ = "dashboard_daily_buckets"
+
+    address = Column(String, primary_key=True)
+    role = Column(String, primary_key=True)
+    day = Column(String, primary_key=True)  # YYYY-MM-DD no fuso local
+    category = Column(String, primary_key=True)
+
+    # Jobs com completed_at neste dia, em qualquer status
+    completed_count = Column(Integer, nullable=False, default=0)
+
+    # Só jobs aprovados; valores em wei como texto (uint256 não cabe em BIGINT).
+    # Para o provider o valor é amount, para o cliente amount + platform_fee
+    approved_count = Column(Integer, nullable=False, default=0)
+    approved_amount_wei = Column(String, nullable=False, default="0")
+    max_approved_amount_wei = Column(String, nullable=False, default="0")
+
+    # Soma de completed_at - accepted_at dos aprovados (tempo médio de entrega)
+    delivery_seconds = Column(BigInteger, nullable=False, default=0)
+    delivery_count = Column(Integer, nullable=False, default=0)
+
+
+class DashboardCounterparty(Base):
+    """Contrapartes do endereço (clientes atendidos / prestadores contratados)"""
+    __tablename__ = "dashboard_counterparties"
+
+    address = Column(String, primary_key=True)
+    role = Column(String, primary_key=True)
+    counterparty = Column(String, primary_key=True)
+
+    # Jobs não cancelados e jobs aprovados com essa contraparte
+    jobs = Column(Integer, nullable=False, default=0)
+    approved_jobs = Column(Integer, nullable=False, default=0)
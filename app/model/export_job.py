@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum as SQLEnum
+from ..config.database import Base
+import uuid
+import enum
+
+from ..config.settings import fuso_local
+
+
+class ExportStatus(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    READY = "ready"
+    FAILED = "failed"
+    EXPIRED = "expired"
+
+
+class ExportJob(Base):
+    """Exportação de relatório gerada em background e baixada depois"""
+    __tablename__ = "export_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+
+    # provider_pdf | provider_excel | client_pdf | client_excel
+    kind = Column(String, nullable=False)
+    status = Column(SQLEnum(ExportStatus), default=ExportStatus.PENDING, nullable=False, index=True)
+
+    filename = Column(String, nullable=False)
+    media_type = Column(String, nullable=False)
+    file_path = Column(String)
+    error = Column(Text)
+
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(fuso_local))
+    # Início da geração (status RUNNING) e último sinal do processo da API dono do job
+    started_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    expires_at = Column(DateTime(timezone=True), index=True)
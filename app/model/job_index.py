@@ -0,0 +1,150 @@
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..config.database import Base
+from ..config.settings import fuso_local
+from .bico_certo_main import Job, JobStatus, ProposalStatus
+from web3 import Web3
+
+
+class IndexedJob(Base):
+    """Cópia local de um job da blockchain, mantida pelos eventos do JobManager"""
+    __tablename__ = "indexed_jobs"
+
+    # ID do job em hex (sem 0x), igual ao usado nas rotas
+    id = Column(String, primary_key=True)
+
+    client = Column(String, nullable=False, index=True)
+    provider = Column(String, nullable=False, index=True)
+
+    # Valores em wei guardados como texto (uint256 não cabe em BIGINT)
+    amount_wei = Column(String, nullable=False, default="0")
+    platform_fee_wei = Column(String, nullable=False, default="0")
+
+    created_at = Column(BigInteger, default=0)
+    accepted_at = Column(BigInteger, default=0)
+    completed_at = Column(BigInteger, default=0)
+    deadline = Column(BigInteger, default=0)
+
+    status = Column(Integer, nullable=False, index=True)
+    service_type = Column(String, index=True)
+    ipfs_hash = Column(String)
+    client_rating = Column(Integer, default=0)
+    provider_rating = Column(Integer, default=0)
+    open_for_proposals = Column(Boolean, default=False, index=True)
+    total_proposals = Column(Integer, default=0)
+
+    # Bloco do último evento que atualizou o registro
+    last_block = Column(BigInteger, default=0)
+    indexed_at = Column(DateTime(timezone=True), default=lambda: datetime.now(fuso_local),
+                        onupdate=lambda: datetime.now(fuso_local))
+
+    def apply_chain_data(self, job_data: tuple):
+        """Atualiza o registro com a tupla retornada por getJob"""
+        self.client = job_data[1]
+        self.provider = job_data[2]
+        self.amount_wei = str(job_data[3])
+        self.platform_fee_wei = str(job_data[4])
+        self.created_at = job_data[5]
+        self.accepted_at = job_data[6]
+        self.completed_at = job_data[7]
+        self.deadline = job_data[8]
+        self.status = job_data[9]
+        self.service_type = job_data[10]
+        self.ipfs_hash = job_data[11]
+        self.client_rating = job_data[12]
+        self.provider_rating = job_data[13]
+        self.open_for_proposals = job_data[14]
+        self.total_proposals = job_data[15]
+
+    def to_job(self) -> Job:
+        """Converte para o dataclass Job (mesmo formato de BicoCerto.get_job)"""
+        return Job(
+            id=bytes.fromhex(self.id),
+            client=self.client,
+            provider=self.provider,
+            amount=Web3.from_wei(int(self.amount_wei), 'ether'),
+            platform_fee=Web3.from_wei(int(self.platform_fee_wei), 'ether'),
+            created_at=self.created_at,
+            accepted_at=self.accepted_at,
+            completed_at=self.completed_at,
+            deadline=self.deadline,
+            status=JobStatus(self.status),
+            service_type=self.service_type,
+            ipfs_hash=self.ipfs_hash,
+            client_rating=self.client_rating,
+            provider_rating=self.provider_rating,
+            openForProposals=self.open_for_proposals,
+            total_proposals=self.total_proposals
+        )
+
+
+class IndexedProposal(Base):
+    """Cópia local de uma proposta da blockchain"""
+    __tablename__ = "indexed_proposals"
+
+    id = Column(String, primary_key=True)
+    job_id = Column(String, nullable=False, index=True)
+    provider = Column(String, nullable=False, index=True)
+
+    amount_wei = Column(String, nullable=False, default="0")
+    estimated_time = Column(Integer, default=0)
+    created_at = Column(BigInteger, default=0)
+    status = Column(Integer, nullable=False, index=True)
+    ipfs_hash = Column(String)
+
+    last_block = Column(BigInteger, default=0)
+    indexed_at = Column(DateTime(timezone=True), default=lambda: datetime.now(fuso_local),
+                        onupdate=lambda: datetime.now(fuso_local))
+
+    def apply_chain_data(self, proposal_data: tuple):
+        """Atualiza o registro com a tupla retornada por getProposal"""
+        self.job_id = proposal_data[1].hex()
+        self.provider = proposal_data[2]
+        self.amount_wei = str(proposal_data[3])
+        self.estimated_time = proposal_data[4]
+        self.created_at = proposal_data[5]
+        self.status = proposal_data[6]
+        self.ipfs_hash = proposal_data[7]
+
+    @property
+    def status_name(self) -> str:
+        return ProposalStatus(self.status).name
+
+    @property
+    def amount(self):
+        """Valor da proposta em ETH"""
+        return Web3.from_wei(int(self.amount_wei), 'ether')
+
+
+class SyncCheckpoint(Base):
+    """Último bloco processado por cada indexador"""
+    __tablename__ = "sync_checkpoints"
+
+    name = Column(String, primary_key=True)
+    last_block = Column(BigInteger, nullable=False, default=-1)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(fuso_local),
+                        onupdate=lambda: datetime.now(fuso_local))
+
+    @classmethod
+    def ensure(cls, db: Session, name: str, last_block: int):
+        """Cria a linha na primeira execução (outro worker pode criá-la ao mesmo tempo)"""
+        if db.get(cls, name):
+            return
+
+        db.add(cls(name=name, last_block=last_block))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+
+    @classmethod
+    def lock(cls, db: Session, name: str) -> "SyncCheckpoint":
+        """
+        Lê a linha com SELECT ... FOR UPDATE. A trava serializa os workers até o
+        commit: quem chega depois espera e relê o last_block já avançado
+        """
+        return db.query(cls).filter(cls.name == name).with_for_update().populate_existing().one()
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import Column, String, Text, DateTime, BigInteger, ForeignKey, Enum as SQLEnum
+from ..config.database import Base
+import uuid
+import enum
+
+from ..config.settings import fuso_local
+
+
+class TransactionStatus(enum.Enum):
+    PENDING = "pending"
+    CONFIRMED = "confirmed"
+    FAILED = "failed"
+    DROPPED = "dropped"
+
+
+class PendingTransaction(Base):
+    """Transação enviada sem aguardar o recibo, acompanhada pelo TransactionTracker"""
+    __tablename__ = "pending_transactions"
+
+    # tracking_id devolvido ao cliente
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    tx_hash = Column(String, nullable=False, unique=True, index=True)
+
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    action = Column(String, nullable=False)
+
+    # JSON com os dados da ação (job_id, proposal_id...) e o resultado após a confirmação
+    context = Column(Text, default="{}")
+    result = Column(Text)
+
+    status = Column(SQLEnum(TransactionStatus), default=TransactionStatus.PENDING, nullable=False, index=True)
+    block_number = Column(BigInteger)
+    error = Column(Text)
+
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(fuso_local))
+    resolved_at = Column(DateTime(timezone=True))
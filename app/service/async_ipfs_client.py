@@ -0,0 +1,123 @@
+import asyncio
+import json
+from typing import Dict, Any, Optional, Tuple, List
+
+import httpx
+
+from app.config.settings import settings
+from app.service.ipfs_cache import ipfs_cache
+
+
+def multiaddr_to_url(address: str) -> str:
+    """
+    Converte o multiaddr da API do IPFS (ex: /ip4/127.0.0.1/tcp/5001)
+    para a URL HTTP equivalente. URLs http(s) são retornadas sem alteração.
+    """
+    if address.startswith("http://") or address.startswith("https://"):
+        return address.rstrip("/")
+
+    parts = [part for part in address.split("/") if part]
+    host, port, scheme = "127.0.0.1", "5001", "http"
+
+    for protocol, value in zip(parts[::2], parts[1::2]):
+        if protocol in ("ip4", "dns", "dns4", "dns6"):
+            host = value
+        elif protocol == "ip6":
+            host = f"[{value}]"
+        elif protocol == "tcp":
+            port = value
+
+    if parts and parts[-1] == "https":
+        scheme = "https"
+
+    return f"{scheme}://{host}:{port}"
+
+
+class AsyncIPFSClient:
+    """
+    Cliente assíncrono para leitura da API HTTP do daemon IPFS (/api/v0).
+
+    Usa um httpx.AsyncClient com pool de conexões e limita o número de
+    requisições simultâneas ao daemon com IPFS_MAX_CONCURRENCY.
+    Os retornos seguem o formato do IPFSService: (sucesso, mensagem, dados).
+    """
+
+    def __init__(self, api_url: str = None, max_concurrency: int = None):
+        self.base_url = multiaddr_to_url(api_url or settings.IPFS_API_URL) + "/api/v0"
+        self.max_concurrency = max_concurrency or settings.IPFS_MAX_CONCURRENCY
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=settings.IPFS_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _cat_raw(self, cid: str) -> bytes:
+        data = ipfs_cache.get(cid)
+        if data is not None:
+            return data
+
+        client = self._get_client()
+        async with self._semaphore:
+            response = await client.post("/cat", params={"arg": cid})
+        response.raise_for_status()
+        return response.content
+
+    async def cat(self, cid: str) -> Tuple[bool, str, Optional[bytes]]:
+        """Recupera os bytes de um CID"""
+        try:
+            data = await self._cat_raw(cid)
+            if not data:
+                return False, "Nenhum dado retornado do IPFS", None
+
+            ipfs_cache.put(cid, data)
+            return True, "Dados recuperados do IPFS", data
+
+        except Exception as e:
+            return False, f"Erro ao recuperar do IPFS: {str(e)}", None
+
+    async def get_json(self, cid: str) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Recupera e decodifica o JSON de um CID"""
+        try:
+            raw = await self._cat_raw(cid)
+            data = json.loads(raw)
+
+            # Só entra no cache depois de validar o JSON
+            ipfs_cache.put(cid, raw)
+            return True, "Dados recuperados do IPFS", data
+
+        except Exception as e:
+            return False, f"Erro ao recuperar do IPFS: {str(e)}", None
+
+    async def cat_many(self, cids: List[str]) -> List[Tuple[bool, str, Optional[bytes]]]:
+        """cat de vários CIDs em paralelo; o resultado segue a ordem de entrada"""
+        return await self._many(self.cat, cids)
+
+    async def get_json_many(self, cids: List[str]) -> List[Tuple[bool, str, Optional[Dict[str, Any]]]]:
+        """get_json de vários CIDs em paralelo; o resultado segue a ordem de entrada"""
+        return await self._many(self.get_json, cids)
+
+    @staticmethod
+    async def _many(fetch, cids: List[str]) -> List[Tuple]:
+        # CIDs repetidos são buscados uma única vez
+        unique = list(dict.fromkeys(cids))
+        results = dict(zip(unique, await asyncio.gather(*(fetch(cid) for cid in unique))))
+        return [results[cid] for cid in cids]
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Instância global
+async_ipfs = AsyncIPFSClient()
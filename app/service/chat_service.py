@@ -1,14 +1,57 @@
 # app/service/chat_service.py
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any, Tuple
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from app.service.ipfs_service import IPFSService
-from ..model.bico_certo_main import BicoCerto
+from app.service.async_ipfs_client import async_ipfs
+from ..model.bico_certo_main import AsyncBicoCerto
 from ..model.chat_model import ChatRoom, ChatMessage, MessageStatus, ChatNotification
+from ..model.job_index import IndexedJob
 from ..model.user import User
-from ..config.settings import fuso_local
+from ..config.settings import fuso_local, settings
+import base64
 import json
+import threading
+import time
+
+
+class RoomMembershipCache:
+    """
+    Salas ativas de cada usuário, por worker. Entradas expiram após
+    CHAT_MEMBERSHIP_CACHE_SECONDS e são descartadas quando o usuário ganha
+    uma sala neste worker
+    """
+
+    def __init__(self):
+        self._rooms: Dict[str, Tuple[float, set]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[set]:
+        with self._lock:
+            entry = self._rooms.get(user_id)
+            if entry is None or time.monotonic() - entry[0] > settings.CHAT_MEMBERSHIP_CACHE_SECONDS:
+                return None
+            return entry[1]
+
+    def put(self, user_id: str, room_ids: set):
+        with self._lock:
+            self._rooms[user_id] = (time.monotonic(), room_ids)
+
+    def add(self, user_id: str, room_id: str):
+        with self._lock:
+            entry = self._rooms.get(user_id)
+            if entry is not None:
+                entry[1].add(room_id)
+
+    def invalidate(self, *user_ids: Optional[str]):
+        with self._lock:
+            for user_id in user_ids:
+                self._rooms.pop(user_id, None)
+
+
+# Instância global
+room_membership_cache = RoomMembershipCache()
 
 
 class ChatService:
@@ -49,29 +92,30 @@ class ChatService:
                 provider_id=provider_id,
                 is_active=True
             )
+            self._fill_participants([room])
 
             self.db.add(room)
             self.db.commit()
             self.db.refresh(room)
 
+            room_membership_cache.invalidate(client_id, provider_id)
+
             return True, "Sala criada com sucesso", room
 
         except Exception as e:
             self.db.rollback()
             return False, f"Erro ao criar sala: {str(e)}", None
 
-    def get_user_rooms(
+    async def get_user_rooms(
             self,
             user_id: str,
             only_active: bool = True
     ) -> List[Dict[str, Any]]:
         """
-        Retorna todas as salas de chat de um usuário
+        Retorna todas as salas de chat de um usuário.
+        Uma consulta em chat_rooms: título, participantes e última mensagem já estão na sala
         """
 
-        bico_certo = BicoCerto()
-        ipfs_service = IPFSService()
-
         rooms_query = self.db.query(ChatRoom).filter(
             (ChatRoom.client_id == user_id) | (ChatRoom.provider_id == user_id)
         )
@@ -79,99 +123,265 @@ class ChatService:
         if only_active:
             rooms_query = rooms_query.filter(ChatRoom.is_active == True)
 
-        rooms = rooms_query.options(
-            joinedload(ChatRoom.provider),
-        ).order_by(ChatRoom.last_message_at.desc()).all()
+        rooms = rooms_query.order_by(ChatRoom.last_message_at.desc()).all()
+
+        # Só salas antigas, criadas antes do resumo, precisam ser completadas (uma vez)
+        await self.ensure_room_summaries(rooms)
+
+        return [self.room_summary(room, user_id) for room in rooms]
+
+    def is_room_member(self, room_id: str, user_id: str) -> bool:
+        """
+        Verifica se o usuário participa da sala ativa, sem montar a lista de
+        salas. Usa o cache do worker; sala fora dele (ex: criada em outro
+        worker) é conferida pela chave primária
+        """
+        room_ids = room_membership_cache.get(user_id)
+
+        if room_ids is None:
+            rows = self.db.query(ChatRoom.id).filter(
+                (ChatRoom.client_id == user_id) | (ChatRoom.provider_id == user_id),
+                ChatRoom.is_active == True
+            ).all()
+            room_ids = {row.id for row in rows}
+            room_membership_cache.put(user_id, room_ids)
+
+        if room_id in room_ids:
+            return True
+
+        is_member = self.db.query(ChatRoom.id).filter(
+            ChatRoom.id == room_id,
+            (ChatRoom.client_id == user_id) | (ChatRoom.provider_id == user_id),
+            ChatRoom.is_active == True
+        ).first() is not None
+
+        if is_member:
+            room_membership_cache.add(user_id, room_id)
+        return is_member
+
+    async def ensure_room_summaries(self, rooms: List[ChatRoom]):
+        """
+        Completa o resumo das salas que ainda não o têm: participantes e última
+        mensagem pelo banco, título do job pelo índice local/blockchain + IPFS
+        """
+        changed = self._fill_participants([
+            room for room in rooms
+            if room.client_name is None or (room.provider_id and room.provider_name is None)
+        ])
 
-        result = []
         for room in rooms:
-            # Determinar papel do usuário
-            is_client = room.client_id == user_id
-
-            # Buscar última mensagem
-            last_message = self.db.query(ChatMessage).filter(
-                ChatMessage.room_id == room.id
-            ).options(joinedload(ChatMessage.sender)).order_by(ChatMessage.created_at.desc()).first()
-
-            # Contar mensagens não lidas
-            unread_count = int(room.unread_client if is_client else room.unread_provider)
-
-            job_data = bico_certo.get_job(bytes.fromhex(room.job_id)).to_dict()
-
-            success, message, metadata = ipfs_service.get_job_data(job_data['ipfs_hash'])
-
-            # Buscar dados do outro participante
-            other_user_id = room.provider_id if room.client_id == user_id else room.client_id
-            other_user = self.db.query(User).filter(User.id == other_user_id).first()
-
-            result.append({
-                "room_id": room.id,
-                "job_id": room.job_id,
-                "job_title": metadata["data"]["title"],
-                "is_client": is_client,
-                "is_active": room.is_active,
-                "other_user": {
-                    "id": other_user.id if other_user else None,
-                    "name": other_user.full_name if other_user else "Usuário",
-                    "email": other_user.email if other_user else None
-                },
-                "last_message": {
-                    "id": last_message.id if last_message else None,
-                    "message": last_message.message[:100] if last_message else None,
-                    "full_name": last_message.sender.full_name if last_message else None,
-                    "created_at": last_message.created_at.isoformat() if last_message else None
-                } if last_message else None,
-                "unread_count": unread_count,
-                "total_messages": int(room.total_messages),
-                "created_at": room.created_at.isoformat()
-            })
-
-        return result
+            if room.last_message_id is None and room.total_messages > 0:
+                last_message = self.db.query(ChatMessage).filter(
+                    ChatMessage.room_id == room.id
+                ).order_by(ChatMessage.created_at.desc()).first()
+
+                if last_message:
+                    self._set_last_message(room, last_message, self._participant_name(room, last_message.sender_id))
+                    changed = True
+
+        # Título que não foi resolvido (job sem metadados, IPFS fora do ar) só é
+        # procurado de novo depois de CHAT_JOB_TITLE_RETRY_SECONDS
+        now = datetime.now(fuso_local)
+        retry_before = now - timedelta(seconds=settings.CHAT_JOB_TITLE_RETRY_SECONDS)
+        missing_title = [
+            room for room in rooms
+            if room.job_title is None and (
+                room.job_title_checked_at is None
+                or room.job_title_checked_at.replace(tzinfo=room.job_title_checked_at.tzinfo or fuso_local) < retry_before
+            )
+        ]
+        if missing_title:
+            titles = await self.resolve_job_titles([room.job_id for room in missing_title])
+            for room, title in zip(missing_title, titles):
+                room.job_title = title
+                room.job_title_checked_at = now
+            changed = True
+
+        if changed:
+            self.db.commit()
+
+    async def resolve_job_titles(self, job_ids: List[str]) -> List[Optional[str]]:
+        """
+        Título de cada job, lido dos metadados no IPFS. O hash vem do índice local
+        e, para jobs ainda não indexados, da blockchain (uma chamada em lote)
+        """
+        indexed = {
+            job.id: job.ipfs_hash
+            for job in self.db.query(IndexedJob.id, IndexedJob.ipfs_hash).filter(IndexedJob.id.in_(job_ids))
+        }
+
+        missing = [job_id for job_id in job_ids if not indexed.get(job_id)]
+        if missing:
+            try:
+                jobs = await AsyncBicoCerto().get_jobs([bytes.fromhex(job_id) for job_id in missing])
+                indexed.update({job_id: job.ipfs_hash for job_id, job in zip(missing, jobs)})
+            except Exception as e:
+                print(f"[ChatService] Erro ao buscar jobs das salas: {e}")
+
+        hashes = [indexed.get(job_id) for job_id in job_ids]
+        results = await async_ipfs.get_json_many([ipfs_hash for ipfs_hash in hashes if ipfs_hash])
+        metadata = iter(results)
+
+        titles = []
+        for ipfs_hash in hashes:
+            if not ipfs_hash:
+                titles.append(None)
+                continue
+            success, _, data = next(metadata)
+            titles.append(data.get("data", {}).get("title") if success and data else None)
+
+        return titles
+
+    def _fill_participants(self, rooms: List[ChatRoom]) -> bool:
+        """Copia nome e email dos participantes para as salas (uma consulta para todas)"""
+        if not rooms:
+            return False
+
+        user_ids = {room.client_id for room in rooms} | {room.provider_id for room in rooms if room.provider_id}
+        users = {user.id: user for user in self.db.query(User).filter(User.id.in_(user_ids))}
+
+        for room in rooms:
+            client = users.get(room.client_id)
+            provider = users.get(room.provider_id)
+            room.client_name = client.full_name if client else None
+            room.client_email = client.email if client else None
+            room.provider_name = provider.full_name if provider else None
+            room.provider_email = provider.email if provider else None
+
+        return True
+
+    def update_participant_name(self, user: User):
+        """Propaga a troca de nome do usuário para o resumo das salas (sem commit)"""
+        self.db.query(ChatRoom).filter(ChatRoom.client_id == user.id).update(
+            {ChatRoom.client_name: user.full_name}, synchronize_session=False
+        )
+        self.db.query(ChatRoom).filter(ChatRoom.provider_id == user.id).update(
+            {ChatRoom.provider_name: user.full_name}, synchronize_session=False
+        )
+
+    @staticmethod
+    def _participant_name(room: ChatRoom, user_id: str) -> Optional[str]:
+        if user_id == room.client_id:
+            return room.client_name
+        if user_id == room.provider_id:
+            return room.provider_name
+        return None
+
+    @staticmethod
+    def _set_last_message(room: ChatRoom, message: ChatMessage, sender_name: Optional[str]):
+        room.last_message_id = message.id
+        room.last_message_preview = message.message[:100]
+        room.last_message_sender_name = sender_name
+        room.last_message_at = message.created_at
+
+    @staticmethod
+    def room_summary(room: ChatRoom, user_id: str, pending_provider_label: str = "Usuário") -> Dict[str, Any]:
+        """Sala no formato da lista de chats, do ponto de vista de user_id"""
+        is_client = room.client_id == user_id
+
+        if is_client:
+            other_id, other_name, other_email = room.provider_id, room.provider_name, room.provider_email
+        else:
+            other_id, other_name, other_email = room.client_id, room.client_name, room.client_email
+
+        return {
+            "room_id": room.id,
+            "job_id": room.job_id,
+            "job_title": room.job_title or "Trabalho sem título",
+            "is_client": is_client,
+            "is_active": room.is_active,
+            "other_user": {
+                "id": other_id,
+                "name": other_name or pending_provider_label,
+                "email": other_email
+            },
+            "last_message": {
+                "id": room.last_message_id,
+                "message": room.last_message_preview,
+                "full_name": room.last_message_sender_name,
+                "created_at": room.last_message_at.isoformat() if room.last_message_at else None
+            } if room.last_message_id else None,
+            "unread_count": room.unread_client if is_client else room.unread_provider,
+            "total_messages": room.total_messages,
+            "created_at": room.created_at.isoformat()
+        }
 
     def get_room_messages(
             self,
             room_id: str,
             user_id: str,
             limit: int = 50,
-            offset: int = 0
-    ) -> Tuple[bool, str, Optional[List[Dict]]]:
+            offset: int = 0,
+            before: Optional[Tuple[datetime, str]] = None
+    ) -> Tuple[bool, str, Optional[List[Dict]], Optional[str]]:
         """
-        Recupera mensagens de uma sala
+        Recupera mensagens de uma sala, da mais recente para a mais antiga.
+
+        Com `before` (cursor decodificado) a página começa logo após a mensagem
+        (created_at, id) do cursor, usando o índice (room_id, created_at, id);
+        sem cursor mantém o LIMIT/OFFSET antigo.
+        Retorna: (success, message, mensagens, next_cursor)
         """
 
         # Verificar se sala existe
         room = self.db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
 
         if not room:
-            return False, "Sala não encontrada", None
+            return False, "Sala não encontrada", None, None
 
         # Verificar se usuário tem acesso
         if user_id not in [room.client_id, room.provider_id]:
             user = self.db.query(User).filter(User.id == user_id).first()
             if not user or not getattr(user, 'is_admin', False):
-                return False, "Acesso negado", None
-
-        # Buscar mensagens
-        messages = self.db.query(ChatMessage).filter(
-            ChatMessage.room_id == room_id
-        ).order_by(
-            ChatMessage.created_at.desc()
-        ).limit(limit).offset(offset).all()
+                return False, "Acesso negado", None, None
 
-        # Marcar como lidas
+        # Marcar como lidas antes da leitura: o commit expira os objetos carregados
         self._mark_messages_as_read(room_id, user_id)
 
+        # Buscar mensagens (uma a mais para saber se há página seguinte)
+        query = self.db.query(ChatMessage).filter(ChatMessage.room_id == room_id)
+
+        if before:
+            created_at, message_id = before
+            query = query.filter(
+                (ChatMessage.created_at < created_at) |
+                ((ChatMessage.created_at == created_at) & (ChatMessage.id < message_id))
+            )
+
+        query = query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        if not before:
+            query = query.offset(offset)
+
+        messages = query.limit(limit + 1).all()
+
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        next_cursor = self.encode_cursor(messages[-1]) if has_more else None
+
+        # Mensagens respondidas e remetentes carregados em lote (uma consulta IN cada)
+        reply_ids = {msg.reply_to_id for msg in messages if msg.reply_to_id}
+        replies = {
+            reply.id: reply
+            for reply in self.db.query(ChatMessage).filter(ChatMessage.id.in_(reply_ids))
+        } if reply_ids else {}
+
+        sender_ids = {msg.sender_id for msg in messages} | {reply.sender_id for reply in replies.values()}
+        senders = {
+            sender.id: sender
+            for sender in self.db.query(User).filter(User.id.in_(sender_ids))
+        } if sender_ids else {}
+
         # Formatar mensagens
         result = []
         for msg in reversed(messages):
-            sender = self.db.query(User).filter(User.id == msg.sender_id).first()
+            sender = senders.get(msg.sender_id)
 
             message_data = {
                 "id": msg.id,
                 "sender": {
-                    "id": sender.id,
-                    "name": sender.full_name,
-                    "is_sender": sender.id == user_id
+                    "id": msg.sender_id,
+                    "name": sender.full_name if sender else "Usuário",
+                    "is_sender": msg.sender_id == user_id
                 },
                 "message": msg.message,
                 "message_type": msg.message_type,
@@ -182,57 +392,114 @@ class ChatService:
                 "read_at": msg.read_at.strftime('%d/%m/%Y às %H:%M') if msg.read_at else None
             }
 
-            # ← ADICIONE: Buscar mensagem original se for resposta
-            if msg.reply_to_id:
-                reply = self.db.query(ChatMessage).filter(
-                    ChatMessage.id == msg.reply_to_id
-                ).first()
+            # Mensagem original, se for resposta
+            reply = replies.get(msg.reply_to_id) if msg.reply_to_id else None
+            if reply:
+                reply_sender = senders.get(reply.sender_id)
 
-                if reply:
-                    reply_sender = self.db.query(User).filter(
-                        User.id == reply.sender_id
-                    ).first()
-
-                    message_data["reply_to"] = {
-                        "id": reply.id,
-                        "message": reply.message[:100],  # Limitar tamanho
-                        "sender_id": reply.sender_id,
-                        "sender_name": reply_sender.full_name if reply_sender else "Usuário"
-                    }
+                message_data["reply_to"] = {
+                    "id": reply.id,
+                    "message": reply.message[:100],  # Limitar tamanho
+                    "sender_id": reply.sender_id,
+                    "sender_name": reply_sender.full_name if reply_sender else "Usuário"
+                }
 
             result.append(message_data)
 
-        return True, "Mensagens recuperadas", result
+        return True, "Mensagens recuperadas", result, next_cursor
 
-    def _mark_messages_as_read(self, room_id: str, user_id: str):
+    @staticmethod
+    def encode_cursor(message: ChatMessage) -> str:
+        """Cursor opaco com a posição (created_at, id) da mensagem"""
+        raw = json.dumps([message.created_at.isoformat(), message.id])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[Tuple[datetime, str]]:
+        """Posição (created_at, id) do cursor, ou None se for inválido"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            created_at, message_id = json.loads(raw)
+            return datetime.fromisoformat(created_at), str(message_id)
+        except (ValueError, TypeError):
+            return None
+
+    def increment_counters(self, room_id: str, sender_is_client: bool, count: int = 1):
         """
-        Marca mensagens como lidas
+        Soma `count` mensagens ao total e às não lidas do destinatário em um
+        único UPDATE (x = x + n), sem ler a sala. Não faz commit
         """
+        unread = ChatRoom.unread_provider if sender_is_client else ChatRoom.unread_client
 
-        room = self.db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+        self.db.query(ChatRoom).filter(ChatRoom.id == room_id).update({
+            ChatRoom.total_messages: ChatRoom.total_messages + count,
+            unread: unread + count
+        }, synchronize_session=False)
 
-        if not room:
-            return
+    def reset_unread(self, user_id: str, room_ids: Optional[List[str]] = None):
+        """
+        Zera as não lidas do usuário nas salas informadas (todas, se None),
+        do lado em que ele participa. Não faz commit
+        """
+        for participant, unread in [
+            (ChatRoom.client_id, ChatRoom.unread_client),
+            (ChatRoom.provider_id, ChatRoom.unread_provider)
+        ]:
+            query = self.db.query(ChatRoom).filter(participant == user_id, unread != 0)
+            if room_ids is not None:
+                query = query.filter(ChatRoom.id.in_(room_ids))
+            query.update({unread: 0}, synchronize_session=False)
+
+    def reconcile_counters(self, room_ids: Optional[List[str]] = None) -> int:
+        """
+        Recalcula os contadores a partir de chat_messages (um UPDATE com
+        subconsultas correlacionadas). Corrige o que divergiu, ex: uma
+        mensagem que chegou entre marcar como lidas e zerar o contador.
+        Retorna o número de salas corrigidas
+        """
+        def count(*conditions):
+            return select(func.count(ChatMessage.id)).where(
+                ChatMessage.room_id == ChatRoom.id,
+                *conditions
+            ).scalar_subquery()
+
+        total = count()
+        unread_provider = count(ChatMessage.sender_id == ChatRoom.client_id, ChatMessage.status != MessageStatus.READ)
+        unread_client = count(ChatMessage.sender_id != ChatRoom.client_id, ChatMessage.status != MessageStatus.READ)
+
+        query = self.db.query(ChatRoom).filter(
+            (ChatRoom.total_messages != total)
+            | (ChatRoom.unread_client != unread_client)
+            | (ChatRoom.unread_provider != unread_provider)
+        )
+        if room_ids is not None:
+            query = query.filter(ChatRoom.id.in_(room_ids))
+
+        fixed = query.update({
+            ChatRoom.total_messages: total,
+            ChatRoom.unread_client: unread_client,
+            ChatRoom.unread_provider: unread_provider
+        }, synchronize_session=False)
 
-        # Determinar se é cliente ou provider
-        is_client = user_id == room.client_id
+        self.db.commit()
+        return fixed
 
-        # Atualizar mensagens não lidas
-        unread_messages = self.db.query(ChatMessage).filter(
+    def _mark_messages_as_read(self, room_id: str, user_id: str):
+        """
+        Marca mensagens como lidas
+        """
+
+        # Atualizar mensagens não lidas (um único UPDATE)
+        self.db.query(ChatMessage).filter(
             ChatMessage.room_id == room_id,
             ChatMessage.sender_id != user_id,
             ChatMessage.status != MessageStatus.READ
-        ).all()
+        ).update({
+            ChatMessage.status: MessageStatus.READ,
+            ChatMessage.read_at: datetime.now(fuso_local)
+        }, synchronize_session=False)
 
-        for msg in unread_messages:
-            msg.status = MessageStatus.READ
-            msg.read_at = datetime.now(fuso_local)
-
-        # Resetar contador de não lidas
-        if is_client:
-            room.unread_client = "0"
-        else:
-            room.unread_provider = "0"
+        self.reset_unread(user_id, [room_id])
 
         # Marcar notificações como lidas
         self.db.query(ChatNotification).filter(
@@ -259,55 +526,7 @@ class ChatService:
         if not room:
             return None
 
-        # Determinar papel do usuário
-        is_client = room.client_id == user_id
-        other_user_id = room.provider_id if is_client else room.client_id
-
-        # Buscar outro usuário
-        other_user = self.db.query(User).filter(User.id == other_user_id).first() if other_user_id else None
-
-        # Buscar última mensagem
-        last_message = self.db.query(ChatMessage).filter(
-            ChatMessage.room_id == room.id
-        ).order_by(ChatMessage.created_at.desc()).first()
-
-        last_sender = self.db.query(User).filter(
-            User.id == last_message.sender_id).first() if last_message.sender_id else None
-        # Contar mensagens não lidas
-        unread_count = int(room.unread_client if is_client else room.unread_provider)
-
-        # Buscar dados do job
-        bico_certo = BicoCerto()
-        ipfs_service = IPFSService()
-
-        try:
-            job_data = bico_certo.get_job(bytes.fromhex(room.job_id)).to_dict()
-            success, message, metadata = ipfs_service.get_job_data(job_data['ipfs_hash'])
-            job_title = metadata.get("data", {}).get("title", "Trabalho sem título")
-        except:
-            job_title = "Trabalho sem título"
-
-        return {
-            "room_id": room.id,
-            "job_id": room.job_id,
-            "job_title": job_title,
-            "is_client": is_client,
-            "is_active": room.is_active,
-            "other_user": {
-                "id": other_user.id if other_user else None,
-                "name": other_user.full_name if other_user else "Aguardando provider",
-                "email": other_user.email if other_user else None
-            },
-            "last_message": {
-                "id": last_message.id if last_message else None,
-                "message": last_message.message[:100] if last_message else None,
-                "full_name": last_sender.full_name if last_message else None,
-                "created_at": last_message.created_at.isoformat() if last_message else None
-            } if last_message else None,
-            "unread_count": unread_count,
-            "total_messages": int(room.total_messages),
-            "created_at": room.created_at.isoformat()
-        }
+        return self.room_summary(room, user_id, pending_provider_label="Aguardando provider")
 
     def send_message(
             self,
@@ -359,20 +578,18 @@ class ChatService:
             )
 
             self.db.add(chat_message)
-
-            # Atualizar sala
-            room.last_message_at = datetime.now(fuso_local)
-            room.total_messages = str(int(room.total_messages) + 1)
-
             self.db.flush()
 
-            # Incrementar contador de não lidas para o outro usuário
-            if sender_id == room.client_id:
-                room.unread_provider = str(int(room.unread_provider) + 1)
-                receiver_id = room.provider_id
-            else:
-                room.unread_client = str(int(room.unread_client) + 1)
-                receiver_id = room.client_id
+            sender_name = self._participant_name(room, sender_id)
+            if sender_name is None:
+                sender = self.db.query(User).filter(User.id == sender_id).first()
+                sender_name = sender.full_name if sender else None
+            self._set_last_message(room, chat_message, sender_name)
+
+            # Total e não lidas do outro usuário, no próprio banco
+            sender_is_client = sender_id == room.client_id
+            self.increment_counters(room_id, sender_is_client)
+            receiver_id = room.provider_id if sender_is_client else room.client_id
 
             # Criar notificação se houver receiver
             if receiver_id:
@@ -441,4 +658,5 @@ class ChatService:
                 "read_by": other_user_id
             }
             for msg in read_messages
-        ]
\ No newline at end of file
+        ]
+
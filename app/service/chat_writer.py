@@ -0,0 +1,441 @@
+import asyncio
+import fcntl
+import glob
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from ..config.database import SessionLocal
+from ..config.settings import settings
+from ..model.chat_model import ChatMessage, ChatNotification, ChatRoom, MessageStatus
+from ..model.user import User
+
+# Falhas do banco (conexão, pool, servidor fora do ar), não da mensagem: o lote fica para depois
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, DisconnectionError, PoolTimeoutError, OSError)
+
+
+class JournalSegment:
+    """
+    Arquivo de journal (uma mensagem JSON por linha) de um worker.
+
+    O arquivo fica travado com flock enquanto o processo que o criou está
+    vivo; um arquivo sem trava é de um worker que caiu e pode ser recuperado.
+    """
+
+    SUFFIX = ".journal"
+
+    def __init__(self, path: str, file):
+        self.path = path
+        self._file = file
+
+    @classmethod
+    def create(cls, directory: str) -> "JournalSegment":
+        name = f"chat-{os.getpid()}-{uuid.uuid4().hex}"
+        tmp_path = os.path.join(directory, name + ".tmp")
+        file = open(tmp_path, "ab")
+        fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        # Só aparece como .journal depois de travado, para a recuperação não pegá-lo
+        path = os.path.join(directory, name + cls.SUFFIX)
+        os.rename(tmp_path, path)
+        return cls(path, file)
+
+    @classmethod
+    def claim(cls, path: str) -> Optional["JournalSegment"]:
+        """Trava um journal órfão. None se o dono ainda está vivo"""
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            return None
+        return cls(path, file)
+
+    def append(self, record: dict):
+        # flush sem fsync: sobrevive à queda do processo, não à do sistema operacional
+        self._file.write(json.dumps(record).encode() + b"\n")
+        self._file.flush()
+
+    def read(self) -> List[dict]:
+        records = []
+        with open(self.path, "rb") as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Última linha incompleta: o processo caiu no meio da escrita
+                    break
+        return records
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self._file.close()
+
+    def release(self):
+        """Solta a trava sem apagar: o journal fica para outra recuperação"""
+        self._file.close()
+
+
+class DeadLetterJournal:
+    """
+    Mensagens que nunca vão ser gravadas (ex: remetente apagado, chave
+    estrangeira quebrada), uma por linha com o erro. Ficam fora da fila para
+    não travar as demais; podem ser corrigidas e regravadas manualmente
+    """
+
+    FILENAME = "dead_letter.jsonl"
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, self.FILENAME)
+
+    def append(self, failures: List[Tuple[dict, Exception]]):
+        failed_at = datetime.now().isoformat()
+        lines = b"".join(
+            json.dumps({"record": record, "error": repr(error), "failed_at": failed_at}).encode() + b"\n"
+            for record, error in failures
+        )
+        # Vários workers escrevem no mesmo arquivo
+        with open(self.path, "ab") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            file.write(lines)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def read(self) -> List[dict]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+
+def persist_messages(records: List[dict]):
+    """
+    Grava um lote de mensagens em uma única transação: mensagens,
+    notificações, contadores e última mensagem de cada sala.
+
+    Idempotente pelo id da mensagem: a recuperação pode reenviar um lote
+    que já tinha sido gravado.
+    """
+    from .chat_service import ChatService
+
+    db = SessionLocal()
+    try:
+        ids = [record["id"] for record in records]
+        existing = {row.id for row in db.query(ChatMessage.id).filter(ChatMessage.id.in_(ids))}
+        new_records = [record for record in records if record["id"] not in existing]
+        if not new_records:
+            return
+
+        room_ids = {record["room_id"] for record in new_records}
+        rooms = {room.id: room for room in db.query(ChatRoom).filter(ChatRoom.id.in_(room_ids))}
+        missing = [record for record in new_records if record["room_id"] not in rooms]
+        if missing:
+            # Não é falha do banco: gravada uma a uma, a mensagem vai para o dead letter
+            raise LookupError(f"Sala {missing[0]['room_id']} não existe (mensagem {missing[0]['id']})")
+
+        # (sala, remetente é o cliente) -> mensagens, somadas em um UPDATE por chave
+        increments: Dict[tuple, int] = {}
+
+        for record in new_records:
+            room = rooms[record["room_id"]]
+            chat_message = ChatMessage(
+                id=record["id"],
+                room_id=record["room_id"],
+                sender_id=record["sender_id"],
+                message=record["message"],
+                message_type=record["message_type"],
+                json_metadata=record["json_metadata"],
+                reply_to_id=record["reply_to_id"],
+                status=MessageStatus.SENT,
+                created_at=datetime.fromisoformat(record["created_at"])
+            )
+            db.add(chat_message)
+
+            sender_is_client = record["sender_id"] == room.client_id
+            key = (room.id, sender_is_client)
+            increments[key] = increments.get(key, 0) + 1
+            ChatService._set_last_message(room, chat_message, record["sender_name"])
+
+            if record["receiver_id"]:
+                db.add(ChatNotification(
+                    user_id=record["receiver_id"],
+                    room_id=record["room_id"],
+                    message_id=record["id"]
+                ))
+
+        service = ChatService(db)
+        for (room_id, sender_is_client), count in increments.items():
+            service.increment_counters(room_id, sender_is_client, count)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class ChatWriter:
+    """
+    Gravação em lote (write-behind) das mensagens recebidas pelo websocket.
+
+    accept() anota a mensagem no journal do worker e a coloca na fila; o
+    endpoint confirma e distribui na hora. A cada CHAT_WRITER_FLUSH_MS (ou
+    ao juntar CHAT_WRITER_BATCH_SIZE mensagens) a fila vai para o banco em
+    uma transação e o journal correspondente é apagado. Se o processo cair,
+    o próximo start() de qualquer worker regrava os journals órfãos.
+
+    Se o lote falha por causa de uma mensagem, as mensagens são gravadas uma
+    a uma e as que falham vão para o DeadLetterJournal; com o banco fora do
+    ar, o lote inteiro fica na fila para a próxima tentativa.
+    """
+
+    def __init__(self, journal_dir: Optional[str] = None, persist: Callable[[List[dict]], None] = persist_messages):
+        self._dir = journal_dir or settings.CHAT_WRITER_JOURNAL_DIR
+        self._persist = persist
+        self._dead_letter = DeadLetterJournal(self._dir)
+        self._pending: Dict[str, dict] = {}
+        self._persisted: Dict[str, asyncio.Future] = {}
+        self._segment: Optional[JournalSegment] = None
+        self._written_segments: List[JournalSegment] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self._task:
+            return
+
+        os.makedirs(self._dir, exist_ok=True)
+        try:
+            await asyncio.to_thread(self.recover)
+        except Exception as e:
+            # Os journals continuam no diretório para a próxima recuperação
+            print(f"[ChatWriter] Erro ao recuperar journals: {e}")
+
+        self._segment = JournalSegment.create(self._dir)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+
+        self._task.cancel()
+        self._task = None
+        await self.flush()
+
+        # Sobrou algo sem gravar: o journal fica para a recuperação
+        if not self._pending:
+            self._segment.discard()
+
+    def recover(self) -> int:
+        """Regrava os journals de workers que caíram. Retorna o número de mensagens"""
+        recovered = 0
+        for path in sorted(glob.glob(os.path.join(self._dir, "*" + JournalSegment.SUFFIX))):
+            segment = JournalSegment.claim(path)
+            if segment is None:
+                continue
+
+            try:
+                records = segment.read()
+                retry = self._write(records)[0] if records else []
+            except Exception as e:
+                print(f"[ChatWriter] Erro ao recuperar {path}: {e}")
+                retry = True
+
+            if retry:
+                # Banco indisponível: o journal fica para a próxima recuperação
+                segment.release()
+                continue
+
+            recovered += len(records)
+            segment.discard()
+
+        if recovered:
+            print(f"[ChatWriter] {recovered} mensagens recuperadas do journal")
+        return recovered
+
+    def accept(self, record: dict) -> bool:
+        """Anota e enfileira. False se a mensagem (mesmo id) já está na fila"""
+        if record["id"] in self._pending:
+            return False
+
+        self._segment.append(record)
+        self._pending[record["id"]] = record
+
+        if len(self._pending) >= settings.CHAT_WRITER_BATCH_SIZE:
+            self._wakeup.set()
+        return True
+
+    def get_pending(self, message_id: str) -> Optional[dict]:
+        return self._pending.get(message_id)
+
+    async def find_existing(self, message_id: str) -> Optional[Dict]:
+        """Sala e remetente de uma mensagem com este id, ainda na fila ou já no banco"""
+        record = self._pending.get(message_id)
+        if record:
+            return {"room_id": record["room_id"], "sender_id": record["sender_id"]}
+
+        # Consulta fora do event loop
+        return await asyncio.to_thread(self._load_existing, message_id)
+
+    @staticmethod
+    def _load_existing(message_id: str) -> Optional[Dict]:
+        db = SessionLocal()
+        try:
+            row = db.query(ChatMessage.room_id, ChatMessage.sender_id).filter(ChatMessage.id == message_id).first()
+        finally:
+            db.close()
+        return {"room_id": row.room_id, "sender_id": row.sender_id} if row else None
+
+    async def wait_persisted(self, message_id: str) -> bool:
+        """Aguarda a gravação. False se a mensagem foi para o dead letter"""
+        if message_id not in self._pending:
+            return True
+        future = self._persisted.get(message_id)
+        if future is None:
+            future = self._persisted[message_id] = asyncio.get_running_loop().create_future()
+        return await future
+
+    async def _run(self):
+        interval = settings.CHAT_WRITER_FLUSH_MS / 1000
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if not await self.flush():
+                await asyncio.sleep(1)
+
+    async def flush(self) -> bool:
+        """Grava o que está na fila. False se o banco falhou (o que sobrou é tentado depois)"""
+        if not self._pending:
+            return True
+
+        # Tudo o que está na fila foi anotado nos journals atuais; o que
+        # chegar durante a gravação vai para um journal novo
+        batch = list(self._pending.values())
+        self._written_segments.append(self._segment)
+        self._segment = JournalSegment.create(self._dir)
+
+        try:
+            retry, dead = await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            # Ex: falha ao anotar no dead letter; nada sai da fila
+            print(f"[ChatWriter] Erro ao gravar {len(batch)} mensagens: {e}")
+            return False
+        retry_ids = {record["id"] for record in retry}
+        dead_ids = {record["id"] for record, _ in dead}
+
+        for record in batch:
+            if record["id"] in retry_ids:
+                continue
+            self._pending.pop(record["id"], None)
+            future = self._persisted.pop(record["id"], None)
+            if future and not future.done():
+                future.set_result(record["id"] not in dead_ids)
+
+        if retry:
+            # Os journals ainda têm mensagens sem gravar
+            return False
+
+        for segment in self._written_segments:
+            segment.discard()
+        self._written_segments = []
+        return True
+
+    def _write(self, batch: List[dict]) -> Tuple[List[dict], List[Tuple[dict, Exception]]]:
+        """
+        Grava o lote; se ele falhar por causa de alguma mensagem, grava uma a
+        uma e manda as que falham para o dead letter.
+        Retorna (mensagens para tentar de novo, mensagens descartadas)
+        """
+        try:
+            self._persist(batch)
+            return [], []
+        except TRANSIENT_ERRORS as e:
+            print(f"[ChatWriter] Erro ao gravar {len(batch)} mensagens: {e}")
+            return batch, []
+        except Exception as e:
+            print(f"[ChatWriter] Erro ao gravar {len(batch)} mensagens, gravando uma a uma: {e}")
+
+        dead = []
+        for index, record in enumerate(batch):
+            try:
+                self._persist([record])
+            except TRANSIENT_ERRORS as e:
+                print(f"[ChatWriter] Erro ao gravar mensagens: {e}")
+                self._send_to_dead_letter(dead)
+                return batch[index:], dead
+            except Exception as e:
+                dead.append((record, e))
+
+        self._send_to_dead_letter(dead)
+        return [], dead
+
+    def _send_to_dead_letter(self, dead: List[Tuple[dict, Exception]]):
+        if not dead:
+            return
+        self._dead_letter.append(dead)
+        for record, error in dead:
+            print(f"[ChatWriter] Mensagem {record['id']} não pode ser gravada, enviada ao dead letter: {error}")
+
+    async def find_reply(self, room_id: str, message_id: str) -> Optional[Dict]:
+        """Dados da mensagem respondida, ainda na fila ou já no banco"""
+        record = self._pending.get(message_id)
+        if record:
+            if record["room_id"] != room_id:
+                return None
+            return {
+                'id': record["id"],
+                'message': record["message"],
+                'sender_id': record["sender_id"],
+                'sender_name': record["sender_name"] or 'Usuário'
+            }
+
+        # Consulta fora do event loop
+        return await asyncio.to_thread(self._load_reply, room_id, message_id)
+
+    @staticmethod
+    def _load_reply(room_id: str, message_id: str) -> Optional[Dict]:
+        db = SessionLocal()
+        try:
+            row = db.query(ChatMessage.id, ChatMessage.message, ChatMessage.sender_id, User.full_name).outerjoin(
+                User, User.id == ChatMessage.sender_id
+            ).filter(
+                ChatMessage.id == message_id,
+                ChatMessage.room_id == room_id
+            ).first()
+        finally:
+            db.close()
+
+        if not row:
+            return None
+        return {
+            'id': row.id,
+            'message': row.message,
+            'sender_id': row.sender_id,
+            'sender_name': row.full_name or 'Usuário'
+        }
+
+
+# Instância global
+chat_writer = ChatWriter()
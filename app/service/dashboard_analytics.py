@@ -0,0 +1,201 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..config.settings import settings, fuso_local
+from ..model.bico_certo_main import JobStatus
+from ..model.job_index import IndexedJob
+
+# Valores guardados em gwei (int64 cabe ~9,2 bilhões de ETH sem perda)
+GWEI_PER_ETH = 10 ** 9
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+_COLUMNS = (
+    IndexedJob.id,
+    IndexedJob.client,
+    IndexedJob.provider,
+    IndexedJob.amount_wei,
+    IndexedJob.platform_fee_wei,
+    IndexedJob.status,
+    IndexedJob.service_type,
+    IndexedJob.created_at,
+    IndexedJob.accepted_at,
+    IndexedJob.completed_at,
+)
+
+
+class JobColumns:
+    """
+    Snapshot de jobs em colunas NumPy, para agrupamentos vetorizados.
+
+    Os endereços e IDs ficam em arrays de objetos; valores em gwei (int64),
+    status e datas em inteiros e a categoria como código em `categories`.
+    """
+
+    def __init__(self, rows: List[Tuple]):
+        """rows: tuplas na ordem de _COLUMNS"""
+        count = len(rows)
+        fields = list(zip(*rows)) if rows else [()] * len(_COLUMNS)
+
+        self.ids = np.array(fields[0], dtype=object)
+        self.client = np.array(fields[1], dtype=object)
+        self.provider = np.array(fields[2], dtype=object)
+
+        self.amount_gwei = np.fromiter((int(v or 0) // 10 ** 9 for v in fields[3]), dtype=np.int64, count=count)
+        self.fee_gwei = np.fromiter((int(v or 0) // 10 ** 9 for v in fields[4]), dtype=np.int64, count=count)
+        self.status = np.fromiter((v or 0 for v in fields[5]), dtype=np.int8, count=count)
+
+        self.categories, self.category_codes = np.unique(
+            np.array([v or "" for v in fields[6]], dtype=object), return_inverse=True
+        ) if count else (np.array([], dtype=object), np.array([], dtype=np.intp))
+
+        self.created_at = np.fromiter((v or 0 for v in fields[7]), dtype=np.int64, count=count)
+        self.accepted_at = np.fromiter((v or 0 for v in fields[8]), dtype=np.int64, count=count)
+        self.completed_at = np.fromiter((v or 0 for v in fields[9]), dtype=np.int64, count=count)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, db: Session) -> "JobColumns":
+        """Todos os jobs do índice local"""
+        return cls(db.query(*_COLUMNS).all())
+
+    def has_status(self, *statuses: JobStatus) -> np.ndarray:
+        return np.isin(self.status, [status.value for status in statuses])
+
+    def value_gwei(self, include_fee: bool) -> np.ndarray:
+        """Valor do ponto de vista do provider (amount) ou do cliente (amount + taxa)"""
+        return self.amount_gwei + self.fee_gwei if include_fee else self.amount_gwei
+
+
+def month_boundaries(months: int, now: Optional[datetime] = None) -> Tuple[np.ndarray, List[str]]:
+    """
+    Início (epoch) de cada um dos últimos `months` meses do calendário no fuso local,
+    mais o início do mês seguinte, e o rótulo de cada mês.
+    """
+    now = now or datetime.now(fuso_local)
+    year, month = now.year, now.month
+
+    starts = []
+    for _ in range(months):
+        starts.insert(0, datetime(year, month, 1, tzinfo=fuso_local))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+
+    last = starts[-1]
+    following = datetime(last.year + last.month // 12, last.month % 12 + 1, 1, tzinfo=fuso_local)
+
+    bounds = np.array([int(start.timestamp()) for start in starts + [following]], dtype=np.int64)
+    return bounds, [start.strftime('%b') for start in starts]
+
+
+def _bucket(timestamps: np.ndarray, bounds: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """Soma (ou conta) por intervalo [bounds[i], bounds[i+1]) usando searchsorted + bincount"""
+    slots = len(bounds) - 1
+    index = np.searchsorted(bounds, timestamps, side='right') - 1
+    valid = (index >= 0) & (index < slots)
+
+    return np.bincount(
+        index[valid],
+        weights=None if weights is None else weights[valid].astype(np.float64),
+        minlength=slots
+    )
+
+
+def monthly_series(jobs: JobColumns, include_fee: bool, months: int = 6,
+                   now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Valor dos jobs aprovados por mês real (ano-mês) de conclusão"""
+    bounds, labels = month_boundaries(months, now)
+    approved = jobs.has_status(JobStatus.APPROVED) & (jobs.completed_at > 0)
+
+    totals = _bucket(jobs.completed_at[approved], bounds, jobs.value_gwei(include_fee)[approved]) / GWEI_PER_ETH
+
+    return [{"month": label, "value": round(float(value), 2)} for label, value in zip(labels, totals)]
+
+
+def category_totals(jobs: JobColumns, include_fee: bool, value_key: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """Quantidade e valor dos jobs aprovados por categoria, ordenados pelo valor"""
+    approved = jobs.has_status(JobStatus.APPROVED)
+    codes = jobs.category_codes[approved]
+    size = len(jobs.categories)
+
+    counts = np.bincount(codes, minlength=size)
+    totals = np.bincount(codes, weights=jobs.value_gwei(include_fee)[approved].astype(np.float64),
+                         minlength=size) / GWEI_PER_ETH
+
+    order = np.argsort(-totals, kind='stable')
+    return [
+        {"category": jobs.categories[i], "count": int(counts[i]), value_key: round(float(totals[i]), 2)}
+        for i in order
+        if counts[i] > 0
+    ][:limit]
+
+
+def status_distribution(jobs: JobColumns, exclude: tuple = ()) -> List[Dict[str, Any]]:
+    counts = np.bincount(jobs.status, minlength=len(JobStatus))
+    for status in exclude:
+        counts[status.value] = 0
+
+    total = int(counts.sum())
+    return [
+        {
+            "status": JobStatus(code).name.lower(),
+            "count": int(count),
+            "percentage": round(count / total * 100 if total else 0, 1)
+        }
+        for code, count in enumerate(counts)
+        if count > 0
+    ]
+
+
+def platform_summary(jobs: JobColumns, months: int = 12) -> Dict[str, Any]:
+    """Visão geral da plataforma a partir de todos os jobs indexados"""
+    approved = jobs.has_status(JobStatus.APPROVED)
+    volume_gwei = int(jobs.value_gwei(include_fee=True)[approved].sum())
+    fees_gwei = int(jobs.fee_gwei[approved].sum())
+
+    providers = jobs.provider[approved]
+    clients = jobs.client[approved]
+
+    return {
+        "totalJobs": len(jobs),
+        "completedJobs": int(approved.sum()),
+        "activeJobs": int(jobs.has_status(JobStatus.ACCEPTED, JobStatus.IN_PROGRESS, JobStatus.COMPLETED).sum()),
+        "totalVolume": round(volume_gwei / GWEI_PER_ETH, 2),
+        "platformFees": round(fees_gwei / GWEI_PER_ETH, 2),
+        "activeProviders": len(set(providers[providers != ZERO_ADDRESS])),
+        "activeClients": len(set(clients)),
+        "monthlyVolume": monthly_series(jobs, include_fee=True, months=months),
+        "volumeByCategory": category_totals(jobs, include_fee=True, value_key="volume", limit=10),
+        "jobsByStatus": status_distribution(jobs)
+    }
+
+
+class PlatformJobsCache:
+    """
+    Snapshot de todos os jobs do índice usado pelo dashboard da plataforma.
+
+    A carga é refeita no máximo a cada PLATFORM_DASHBOARD_CACHE_SECONDS; as
+    requisições que chegam durante a carga esperam por ela em vez de repeti-la.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.PLATFORM_DASHBOARD_CACHE_SECONDS
+        self._jobs: Optional[JobColumns] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> JobColumns:
+        with self._lock:
+            if self._jobs is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+                self._jobs = JobColumns.load(db)
+                self._loaded_at = time.monotonic()
+            return self._jobs
+
+
+# Instância global
+platform_jobs_cache = PlatformJobsCache()
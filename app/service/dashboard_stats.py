@@ -0,0 +1,265 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, NamedTuple
+
+from sqlalchemy.orm import Session
+from web3 import Web3
+
+from ..config.settings import fuso_local
+from ..model.bico_certo_main import JobStatus
+from ..model.dashboard_stats import DashboardStatusCount, DashboardDailyBucket, DashboardCounterparty
+from ..model.job_index import IndexedJob, SyncCheckpoint
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+class JobSnapshot(NamedTuple):
+    """Campos de um IndexedJob que entram nos agregados"""
+    client: str
+    provider: str
+    amount_wei: int
+    platform_fee_wei: int
+    status: int
+    category: str
+    accepted_at: int
+    completed_at: int
+
+    @classmethod
+    def of(cls, row: IndexedJob) -> "JobSnapshot":
+        return cls(
+            client=row.client,
+            provider=row.provider,
+            amount_wei=int(row.amount_wei or 0),
+            platform_fee_wei=int(row.platform_fee_wei or 0),
+            status=row.status,
+            category=row.service_type or "",
+            accepted_at=row.accepted_at or 0,
+            completed_at=row.completed_at or 0
+        )
+
+
+def day_key(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, fuso_local).strftime('%Y-%m-%d')
+
+
+class DashboardAggregator:
+    """
+    Mantém as tabelas dashboard_* a partir das mudanças de estado dos jobs.
+
+    Cada job contribui para os agregados do cliente e do provider conforme o
+    seu estado atual. Quando o JobIndexer atualiza um job, a contribuição do
+    estado anterior é removida e a do novo estado é somada.
+    """
+
+    CHECKPOINT_NAME = "dashboard_stats"
+
+    def on_job_changed(self, db: Session, old: Optional[JobSnapshot], new: Optional[JobSnapshot]):
+        if old == new:
+            return
+        if old is not None:
+            self._apply(db, old, -1)
+        if new is not None:
+            self._apply(db, new, 1)
+
+    def is_built(self, db: Session) -> bool:
+        """Sem checkpoint (primeira execução ou checkpoint apagado) os agregados precisam de rebuild()"""
+        return db.get(SyncCheckpoint, self.CHECKPOINT_NAME) is not None
+
+    def rebuild(self, db: Session):
+        """
+        Recalcula tudo a partir de indexed_jobs. Deve rodar com a linha do
+        checkpoint do JobIndexer travada, como os incrementos de _apply
+        """
+        db.query(DashboardStatusCount).delete()
+        db.query(DashboardDailyBucket).delete()
+        db.query(DashboardCounterparty).delete()
+        db.flush()
+
+        for row in db.query(IndexedJob).all():
+            self._apply(db, JobSnapshot.of(row), 1)
+
+        checkpoint = db.get(SyncCheckpoint, self.CHECKPOINT_NAME)
+        if not checkpoint:
+            db.add(SyncCheckpoint(name=self.CHECKPOINT_NAME, last_block=0))
+        db.commit()
+
+    def _apply(self, db: Session, job: JobSnapshot, sign: int):
+        status = JobStatus(job.status)
+        approved = status == JobStatus.APPROVED
+
+        roles = [("client", job.client, job.provider, job.amount_wei + job.platform_fee_wei)]
+        if job.provider and job.provider != ZERO_ADDRESS:
+            roles.append(("provider", job.provider, job.client, job.amount_wei))
+
+        for role, address, counterparty, amount_wei in roles:
+            address = address.lower()
+
+            counts = self._get_or_create(db, DashboardStatusCount, address=address, role=role, status=job.status)
+            counts.count += sign
+
+            if job.completed_at > 0:
+                bucket = self._get_or_create(
+                    db, DashboardDailyBucket,
+                    address=address, role=role, day=day_key(job.completed_at), category=job.category
+                )
+                bucket.completed_count += sign
+
+                if approved:
+                    bucket.approved_count += sign
+                    bucket.approved_amount_wei = str(int(bucket.approved_amount_wei) + sign * amount_wei)
+                    # Aprovado é estado final: o máximo só cresce
+                    if sign > 0 and amount_wei > int(bucket.max_approved_amount_wei):
+                        bucket.max_approved_amount_wei = str(amount_wei)
+                    if job.accepted_at > 0:
+                        bucket.delivery_seconds += sign * (job.completed_at - job.accepted_at)
+                        bucket.delivery_count += sign
+
+            if counterparty and counterparty != ZERO_ADDRESS and status != JobStatus.CANCELLED:
+                party = self._get_or_create(
+                    db, DashboardCounterparty,
+                    address=address, role=role, counterparty=counterparty.lower()
+                )
+                party.jobs += sign
+                if approved:
+                    party.approved_jobs += sign
+
+    @staticmethod
+    def _get_or_create(db: Session, model, **key):
+        row = db.get(model, key)
+        if row is None:
+            row = model(**key)
+            for column in model.__table__.columns:
+                if column.name not in key and column.default is not None:
+                    setattr(row, column.name, column.default.arg)
+            db.add(row)
+            # Sem autoflush: grava já para o próximo db.get encontrar a linha
+            db.flush()
+        return row
+
+
+# Instância global
+dashboard_aggregator = DashboardAggregator()
+
+
+class DashboardStats:
+    """Leitura dos agregados de um endereço em um papel (provider ou client)"""
+
+    def __init__(self, db: Session, address: str, role: str):
+        self.address = address.lower()
+        self.role = role
+
+        self.status_counts: Dict[JobStatus, int] = {
+            JobStatus(row.status): row.count
+            for row in db.query(DashboardStatusCount).filter_by(address=self.address, role=role)
+            if row.count
+        }
+        self.buckets: List[DashboardDailyBucket] = db.query(DashboardDailyBucket).filter_by(
+            address=self.address, role=role
+        ).all()
+        self.counterparties: List[DashboardCounterparty] = db.query(DashboardCounterparty).filter_by(
+            address=self.address, role=role
+        ).all()
+
+    def count(self, *statuses: JobStatus) -> int:
+        return sum(self.status_counts.get(status, 0) for status in statuses)
+
+    @property
+    def total_jobs(self) -> int:
+        return sum(self.status_counts.values())
+
+    @property
+    def approved_buckets(self) -> List[DashboardDailyBucket]:
+        return [bucket for bucket in self.buckets if bucket.approved_count]
+
+    def approved_amount(self, since: str = None, until: str = None) -> float:
+        """Soma em ETH dos aprovados com completed_at em [since, until) (dias YYYY-MM-DD)"""
+        return _eth(sum(
+            int(bucket.approved_amount_wei)
+            for bucket in self.approved_buckets
+            if (since is None or bucket.day >= since) and (until is None or bucket.day < until)
+        ))
+
+    def approved_count(self, since: str = None, until: str = None) -> int:
+        return sum(
+            bucket.approved_count
+            for bucket in self.approved_buckets
+            if (since is None or bucket.day >= since) and (until is None or bucket.day < until)
+        )
+
+    def highest_amount(self) -> float:
+        return _eth(max((int(bucket.max_approved_amount_wei) for bucket in self.approved_buckets), default=0))
+
+    def average_delivery_days(self) -> float:
+        seconds = sum(bucket.delivery_seconds for bucket in self.approved_buckets)
+        count = sum(bucket.delivery_count for bucket in self.approved_buckets)
+        return seconds / count / 86400 if count else 0
+
+    def last_approved_day(self) -> Optional[str]:
+        return max((bucket.day for bucket in self.approved_buckets), default=None)
+
+    def counterparty_count(self, approved_only: bool = False) -> int:
+        return sum(
+            1 for party in self.counterparties
+            if (party.approved_jobs if approved_only else party.jobs) > 0
+        )
+
+    def monthly(self, months: int = 6) -> List[Dict[str, Any]]:
+        """Valor aprovado por mês do calendário, dos últimos `months` meses"""
+        totals = defaultdict(int)
+        for bucket in self.approved_buckets:
+            totals[bucket.day[:7]] += int(bucket.approved_amount_wei)
+
+        result = []
+        year, month = datetime.now(fuso_local).year, datetime.now(fuso_local).month
+        for _ in range(months):
+            key = f"{year:04d}-{month:02d}"
+            result.insert(0, {
+                "month": datetime(year, month, 1).strftime('%b'),
+                "value": round(_eth(totals.get(key, 0)), 2)
+            })
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+
+        return result
+
+    def by_category(self, value_key: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Aprovados por categoria, ordenados pelo valor"""
+        categories = defaultdict(lambda: {"count": 0, "wei": 0})
+        for bucket in self.approved_buckets:
+            categories[bucket.category]["count"] += bucket.approved_count
+            categories[bucket.category]["wei"] += int(bucket.approved_amount_wei)
+
+        result = [
+            {"category": category, "count": data["count"], value_key: round(_eth(data["wei"]), 2)}
+            for category, data in categories.items()
+        ]
+        result.sort(key=lambda item: item[value_key], reverse=True)
+        return result[:limit]
+
+    def recent_activity(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Jobs com completed_at em cada um dos últimos `days` dias"""
+        activity = defaultdict(int)
+        for bucket in self.buckets:
+            activity[bucket.day] += bucket.completed_count
+
+        now = datetime.now(fuso_local)
+        result = []
+        for i in range(days):
+            key = (now - timedelta(days=i)).strftime('%Y-%m-%d')
+            result.insert(0, {"date": key, "jobs": activity.get(key, 0)})
+        return result
+
+    def by_status(self, exclude: tuple = ()) -> List[Dict[str, Any]]:
+        counts = {status: count for status, count in self.status_counts.items() if status not in exclude}
+        total = sum(counts.values())
+        return [
+            {
+                "status": status.name.lower(),
+                "count": count,
+                "percentage": round(count / total * 100 if total else 0, 1)
+            }
+            for status, count in counts.items()
+        ]
+
+
+def _eth(wei: int) -> float:
+    return float(Web3.from_wei(wei, 'ether'))
@@ -0,0 +1,287 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from ..config.database import SessionLocal
+from ..config.settings import settings, fuso_local
+from ..model.export_job import ExportJob, ExportStatus
+from ..websocket.notifications_handler import notifications_manager
+from . import export_worker
+
+EXPORT_FORMATS = {
+    "pdf": ("application/pdf", "pdf"),
+    "excel": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+FILENAME_PREFIX = {
+    "provider": "dashboard_prestador",
+    "client": "dashboard_cliente",
+}
+
+
+class ExportService:
+    """
+    Gera os relatórios (PDF/Excel) em um pool de processos, fora do event loop.
+
+    submit() registra um ExportJob e agenda a renderização; o arquivo fica em
+    EXPORT_DIR até expires_at e o usuário é avisado pelo websocket de
+    notificações. render() é a variante síncrona para quem precisa dos bytes
+    na própria requisição. EXPORT_MAX_WORKERS limita quantos relatórios são
+    gerados ao mesmo tempo e EXPORT_MAX_PENDING_PER_USER quantos um usuário
+    pode ter na fila.
+
+    Um job fica PENDING enquanto espera vaga no pool e RUNNING (com
+    started_at) enquanto é gerado. heartbeat() renova heartbeat_at dos jobs
+    deste processo; cleanup_expired() só marca como falha o job cujo processo
+    parou de dar sinal ou que está gerando há mais de EXPORT_STALE_SECONDS.
+    """
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks = set()
+        # Jobs agendados neste processo (na fila ou gerando)
+        self._job_ids = set()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: os filhos não herdam threads, conexões nem o event loop do processo da API
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.EXPORT_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def render(self, kind: str, data: Dict[str, Any], user_name: str) -> bytes:
+        """Gera o relatório no pool e retorna os bytes"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_pool(), export_worker.render, kind, data, user_name,
+            settings.EXPORT_VECTOR_CHARTS
+        )
+
+    def submit(
+            self,
+            db: Session,
+            user_id: str,
+            role: str,
+            export_format: str,
+            data: Dict[str, Any],
+            user_name: str
+    ) -> Tuple[bool, str, Optional[ExportJob]]:
+        """Registra a exportação e agenda a geração em background"""
+        if export_format not in EXPORT_FORMATS:
+            return False, "Formato inválido. Use pdf ou excel", None
+
+        in_progress = db.query(ExportJob).filter(
+            ExportJob.user_id == user_id,
+            ExportJob.status.in_([ExportStatus.PENDING, ExportStatus.RUNNING])
+        ).count()
+
+        if in_progress >= settings.EXPORT_MAX_PENDING_PER_USER:
+            return False, "Você já possui exportações em andamento. Aguarde a conclusão", None
+
+        media_type, extension = EXPORT_FORMATS[export_format]
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        job = ExportJob(
+            user_id=user_id,
+            kind=f"{role}_{export_format}",
+            filename=f"{FILENAME_PREFIX[role]}_{timestamp}.{extension}",
+            media_type=media_type,
+            heartbeat_at=datetime.now(fuso_local)
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self._job_ids.add(job.id)
+        task = asyncio.create_task(self._run(job.id, job.kind, data, user_name))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        return True, "Exportação iniciada", job
+
+    async def _run(self, job_id: str, kind: str, data: Dict[str, Any], user_name: str):
+        try:
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(settings.EXPORT_MAX_WORKERS)
+
+            # Vaga no pool: a partir daqui o tempo conta para EXPORT_STALE_SECONDS
+            async with self._slots:
+                job = await self._render(job_id, kind, data, user_name)
+        finally:
+            self._job_ids.discard(job_id)
+
+        if job:
+            await notifications_manager.send_to_user(job["user_id"], {
+                "type": "export_update",
+                "data": job
+            })
+
+    async def _render(self, job_id: str, kind: str, data: Dict[str, Any], user_name: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(settings.EXPORT_DIR, job_id)
+        if not self._update(
+                job_id, ExportStatus.PENDING,
+                status=ExportStatus.RUNNING,
+                started_at=datetime.now(fuso_local)
+        ):
+            return None
+
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self._get_pool(), export_worker.render_to_file, kind, data, user_name, path,
+                settings.EXPORT_VECTOR_CHARTS
+            )
+
+            now = datetime.now(fuso_local)
+            job = self._update(
+                job_id, ExportStatus.RUNNING,
+                status=ExportStatus.READY,
+                file_path=path,
+                finished_at=now,
+                expires_at=now + timedelta(seconds=settings.EXPORT_TTL_SECONDS)
+            )
+            if not job and os.path.exists(path):
+                # Já marcado como falha pelo cleanup_expired: o arquivo não será baixado
+                os.remove(path)
+            return job
+        except Exception as e:
+            print(f"[ExportService] Erro ao gerar exportação {job_id}: {e}")
+            return self._update(
+                job_id, ExportStatus.RUNNING,
+                status=ExportStatus.FAILED,
+                error=str(e),
+                finished_at=datetime.now(fuso_local)
+            )
+
+    @staticmethod
+    def _update(job_id: str, expected: ExportStatus, **fields) -> Optional[Dict[str, Any]]:
+        """Altera o job se ele ainda está em `expected`; None se não (ex: já marcado como falha)"""
+        db = SessionLocal()
+        try:
+            job = db.query(ExportJob).filter(
+                ExportJob.id == job_id,
+                ExportJob.status == expected
+            ).with_for_update().first()
+            if not job:
+                return None
+            for name, value in fields.items():
+                setattr(job, name, value)
+            db.commit()
+            return ExportService.to_dict(job)
+        finally:
+            db.close()
+
+    @staticmethod
+    def to_dict(job: ExportJob) -> Dict[str, Any]:
+        return {
+            "export_id": job.id,
+            "user_id": job.user_id,
+            "kind": job.kind,
+            "status": job.status.value,
+            "filename": job.filename,
+            "error": job.error,
+            "download_url": f"/api/exports/{job.id}/download" if job.status == ExportStatus.READY else None,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "expires_at": job.expires_at.isoformat() if job.expires_at else None
+        }
+
+    def heartbeat(self):
+        """Renova heartbeat_at dos jobs deste processo que ainda não terminaram"""
+        job_ids = list(self._job_ids)
+        if not job_ids:
+            return
+
+        db = SessionLocal()
+        try:
+            db.query(ExportJob).filter(
+                ExportJob.id.in_(job_ids),
+                ExportJob.status.in_([ExportStatus.PENDING, ExportStatus.RUNNING])
+            ).update({ExportJob.heartbeat_at: datetime.now(fuso_local)}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def cleanup_expired(self) -> int:
+        """
+        Remove os arquivos vencidos (o registro fica como EXPIRED) e marca como
+        falhas as exportações presas em andamento: as do processo que caiu (sem
+        heartbeat, ex: após reiniciar o servidor) e as que estão gerando há
+        mais de EXPORT_STALE_SECONDS. Jobs na fila de um processo vivo ficam
+        """
+        db = SessionLocal()
+        try:
+            now = datetime.now(fuso_local)
+            # Registros de antes do heartbeat contam a partir da criação
+            last_seen = func.coalesce(ExportJob.heartbeat_at, ExportJob.created_at)
+
+            db.query(ExportJob).filter(
+                ExportJob.status.in_([ExportStatus.PENDING, ExportStatus.RUNNING]),
+                or_(
+                    last_seen < now - timedelta(seconds=settings.EXPORT_HEARTBEAT_TIMEOUT_SECONDS),
+                    and_(
+                        ExportJob.status == ExportStatus.RUNNING,
+                        ExportJob.started_at < now - timedelta(seconds=settings.EXPORT_STALE_SECONDS)
+                    )
+                )
+            ).update({
+                ExportJob.status: ExportStatus.FAILED,
+                ExportJob.error: "Exportação interrompida",
+                ExportJob.finished_at: now
+            }, synchronize_session=False)
+
+            expired = db.query(ExportJob).filter(
+                ExportJob.status == ExportStatus.READY,
+                ExportJob.expires_at < now
+            ).all()
+
+            for job in expired:
+                if job.file_path:
+                    try:
+                        os.remove(job.file_path)
+                    except FileNotFoundError:
+                        pass
+                job.status = ExportStatus.EXPIRED
+                job.file_path = None
+
+            db.commit()
+            return len(expired)
+        finally:
+            db.close()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Instância global
+export_service = ExportService()
+
+
+async def run_export_cleanup():
+    """Loop em background que apaga as exportações vencidas"""
+    while True:
+        try:
+            await asyncio.to_thread(export_service.cleanup_expired)
+        except Exception as e:
+            print(f"[ExportService] Erro ao limpar exportações: {e}")
+        await asyncio.sleep(settings.EXPORT_CLEANUP_INTERVAL_SECONDS)
+
+
+async def run_export_heartbeat():
+    """Loop em background que sinaliza que os jobs deste processo seguem vivos"""
+    while True:
+        try:
+            await asyncio.to_thread(export_service.heartbeat)
+        except Exception as e:
+            print(f"[ExportService] Erro ao renovar heartbeat das exportações: {e}")
+        await asyncio.sleep(settings.EXPORT_HEARTBEAT_SECONDS)
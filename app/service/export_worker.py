@@ -0,0 +1,47 @@
+"""
+Renderização dos relatórios executada nos processos do pool de exportação.
+
+Este módulo não importa nada da aplicação (banco, web3, settings): é o que
+os processos filhos carregam, então precisa ser leve e sem efeitos colaterais.
+"""
+import os
+import tempfile
+from typing import Dict, Any
+
+RENDERERS = {
+    "provider_pdf": "generate_provider_pdf",
+    "provider_excel": "generate_provider_excel",
+    "client_pdf": "generate_client_pdf",
+    "client_excel": "generate_client_excel",
+}
+
+
+def render(kind: str, data: Dict[str, Any], user_name: str, vector_charts: bool = False) -> bytes:
+    """
+    Gera o relatório e retorna os bytes. vector_charts troca os PNGs do
+    matplotlib pelos gráficos nativos do ReportLab (só nos PDFs)
+    """
+    from app.service.report_generator import ReportGenerator
+
+    generator = getattr(ReportGenerator, RENDERERS[kind])
+    options = {"vector_charts": vector_charts} if kind.endswith("_pdf") else {}
+    return generator(data, user_name, **options).getvalue()
+
+
+def render_to_file(kind: str, data: Dict[str, Any], user_name: str, path: str, vector_charts: bool = False) -> int:
+    """Gera o relatório direto no disco (escrita atômica); retorna o tamanho em bytes"""
+    content = render(kind, data, user_name, vector_charts)
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return len(content)
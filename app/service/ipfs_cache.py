@@ -0,0 +1,146 @@
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from ..config.settings import settings
+
+# CIDs (v0 base58 / v1 base32) só têm caracteres alfanuméricos
+_CID_PATTERN = re.compile(r"^[A-Za-z0-9]+$")
+
+
+class ContentCache:
+    """
+    Cache de conteúdo do IPFS indexado pelo CID.
+
+    Como um CID identifica exatamente um conteúdo, as entradas nunca ficam
+    desatualizadas e não há invalidação. São duas camadas:
+    - memória: LRU limitado pelo total de bytes (max_memory_bytes)
+    - disco: um arquivo por CID em cache_dir, que sobrevive a reinícios
+    """
+
+    def __init__(self, max_memory_bytes: int, cache_dir: Optional[str] = None):
+        self.max_memory_bytes = max_memory_bytes
+        self.cache_dir = cache_dir or None
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, cid: str) -> Optional[bytes]:
+        """Retorna o conteúdo do CID ou None se não estiver em nenhuma camada"""
+        with self._lock:
+            data = self._memory.get(cid)
+            if data is not None:
+                self._memory.move_to_end(cid)
+                self.memory_hits += 1
+                return data
+
+        data = self._read_disk(cid)
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            self._store_memory(cid, data)
+            return data
+
+    def put(self, cid: str, data: bytes):
+        """Guarda o conteúdo nas duas camadas"""
+        with self._lock:
+            self._store_memory(cid, data)
+        self._write_disk(cid, data)
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_enabled": self.cache_dir is not None
+            }
+
+    def _store_memory(self, cid: str, data: bytes):
+        """Insere no LRU e remove os mais antigos até caber no limite (chamar com o lock)"""
+        if len(data) > self.max_memory_bytes:
+            return
+
+        previous = self._memory.pop(cid, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+
+        self._memory[cid] = data
+        self._memory_bytes += len(data)
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _path_for(self, cid: str) -> Optional[str]:
+        if not self.cache_dir or not _CID_PATTERN.match(cid):
+            return None
+        # Subdiretório pelos dois últimos caracteres para não lotar uma única pasta
+        return os.path.join(self.cache_dir, cid[-2:], cid)
+
+    def _read_disk(self, cid: str) -> Optional[bytes]:
+        path = self._path_for(cid)
+        if not path:
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"[IPFSCache] Erro ao ler {cid} do disco: {e}")
+            return None
+
+    def _write_disk(self, cid: str, data: bytes):
+        path = self._path_for(cid)
+        if not path or os.path.exists(path):
+            return
+
+        try:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+
+            # Escreve em arquivo temporário e renomeia: leitores nunca veem arquivo parcial
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"[IPFSCache] Erro ao gravar {cid} no disco: {e}")
+
+
+# Instância global
+ipfs_cache = ContentCache(
+    max_memory_bytes=settings.IPFS_CACHE_MEMORY_BYTES,
+    cache_dir=settings.IPFS_CACHE_DIR
+)
@@ -1,6 +1,12 @@
+import asyncio
+import json
+import threading
+import time
+
 import ipfshttpclient
 from typing import Dict, Any, Optional, Tuple
 from app.config.settings import settings
+from app.service.ipfs_cache import ipfs_cache
 
 
 class IPFSService:
@@ -8,23 +14,88 @@ class IPFSService:
 
     def __init__(self, api_url: str = None):
         """
-        Inicializa conexão com IPFS
+        Configura o acesso ao IPFS. A conexão só é aberta no primeiro uso.
         Default: /ip4/127.0.0.1/tcp/5001 (IPFS local)
         """
         self.api_url = api_url or settings.IPFS_API_URL or '/ip4/127.0.0.1/tcp/5001'
 
+        self._client = None
+        self._lock = threading.Lock()
+        self._retry_delay = settings.IPFS_RECONNECT_MIN_SECONDS
+        self._next_retry_at = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def client(self):
+        """Cliente conectado; conecta (respeitando o backoff) se necessário"""
+        client = self._client
+        if client is not None:
+            return client
+
+        with self._lock:
+            if self._client is None:
+                self._connect()
+            return self._client
+
+    @property
+    def is_connected(self) -> bool:
+        return self._client is not None
+
+    def _connect(self):
+        """Abre a conexão e faz o handshake (chamar com o lock)"""
+        now = time.monotonic()
+        if now < self._next_retry_at:
+            raise Exception(f"IPFS não está disponível: {self.last_error}")
+
         try:
-            self.client = ipfshttpclient.connect(self.api_url)
+            client = ipfshttpclient.connect(self.api_url)
 
             # Verificar se IPFS está rodando
-            node_info = self.client.id()
+            node_info = client.id()
             print(f"[IPFS] Node ID: {node_info['ID']}")
 
         except Exception as e:
+            # Backoff exponencial até IPFS_RECONNECT_MAX_SECONDS
+            self.last_error = str(e)
+            self._next_retry_at = now + self._retry_delay
+            self._retry_delay = min(self._retry_delay * 2, settings.IPFS_RECONNECT_MAX_SECONDS)
             raise Exception(f"IPFS não está disponível: {e}")
 
-   
-   
+        self._client = client
+        self._retry_delay = settings.IPFS_RECONNECT_MIN_SECONDS
+        self._next_retry_at = 0.0
+        self.last_error = None
+
+    def _disconnect(self):
+        with self._lock:
+            client, self._client = self._client, None
+
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    def check_health(self) -> bool:
+        """
+        Verifica se o daemon responde. Em caso de falha descarta a conexão,
+        que será reaberta (com backoff) no próximo uso ou verificação.
+        """
+        try:
+            self.client.id()
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            self._disconnect()
+            return False
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "connected": self.is_connected,
+            "last_error": self.last_error,
+            "next_retry_in": round(max(self._next_retry_at - time.monotonic(), 0.0), 1)
+        }
+
     def add_bytes_to_ipfs(self, data_bytes: bytes) -> Tuple[bool, str, Optional[str]]:
         """
         Adiciona bytes puros (como um arquivo de imagem) ao IPFS.
@@ -47,7 +118,8 @@ class IPFSService:
                 return False, "O CID não foi encontrado na resposta do IPFS.", None
                           
             self.client.pin.add(cid)
-            
+            ipfs_cache.put(cid, data_bytes)
+
             print(f"Enviado para o IPFS!:{cid}")
             return True, "Bytes adicionados ao IPFS com sucesso", cid
 
@@ -61,12 +133,18 @@ class IPFSService:
         Retorna: (sucesso, mensagem, bytes)
         """
         try:
+            image_bytes = ipfs_cache.get(cid)
+            if image_bytes is not None:
+                return True, "Imagem recuperada do cache", image_bytes
+
             # Usar 'cat' para recuperar bytes do IPFS
             image_bytes = self.client.cat(cid)
 
             if not image_bytes:
                 return False, "Nenhum dado retornado do IPFS", None
 
+            ipfs_cache.put(cid, image_bytes)
+
             print(f"Imagem recuperada do IPFS: {cid} ({len(image_bytes)} bytes)")
             return True, "Imagem recuperada do IPFS com sucesso", image_bytes
 
@@ -104,13 +182,20 @@ class IPFSService:
         Retorna: (sucesso, mensagem, dados)
         """
         try:
-            data = self.client.get_json(cid)
+            raw = ipfs_cache.get(cid)
+            if raw is not None:
+                return True, "Dados recuperados do cache", json.loads(raw)
+
+            raw = self.client.cat(cid)
+            data = json.loads(raw)
+
+            # Só entra no cache depois de validar o JSON
+            ipfs_cache.put(cid, raw)
 
             return True, "Dados recuperados do IPFS", data
 
         except Exception as e:
             return False, f"Erro ao recuperar do IPFS: {str(e)}", None
-    
 
     def unpin_cid(self, cid: str) -> bool:
         """
@@ -120,4 +205,25 @@ class IPFSService:
             self.client.pin.rm(cid)
             return True
         except Exception as e:
-            return False
\ No newline at end of file
+            return False
+
+
+_ipfs_service: Optional[IPFSService] = None
+_ipfs_service_lock = threading.Lock()
+
+
+def get_ipfs_service() -> IPFSService:
+    """Instância única do IPFSService no processo"""
+    global _ipfs_service
+    if _ipfs_service is None:
+        with _ipfs_service_lock:
+            if _ipfs_service is None:
+                _ipfs_service = IPFSService()
+    return _ipfs_service
+
+
+async def run_ipfs_health_probe():
+    """Loop em background que verifica o daemon e reconecta quando ele volta"""
+    while True:
+        await asyncio.to_thread(get_ipfs_service().check_health)
+        await asyncio.sleep(settings.IPFS_HEALTH_INTERVAL_SECONDS)
@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, Optional, Tuple
+
+from web3 import Web3
+
+from ..config.database import SessionLocal
+from ..config.settings import fuso_local
+from ..model.bico_certo_main import JobStatus
+from ..model.job_index import IndexedJob
+
+HISTORY_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+HEADER = (
+    "job_id", "status", "categoria", "cliente", "prestador", "valor_eth", "taxa_eth",
+    "criado_em", "aceito_em", "concluido_em", "prazo", "nota_cliente", "nota_prestador"
+)
+
+# Linhas buscadas do banco por vez e tamanho dos pedaços enviados ao cliente
+FETCH_SIZE = 500
+CHUNK_SIZE = 64 * 1024
+
+
+def _timestamp(value: Optional[int]) -> Optional[datetime]:
+    # Sem fuso na saída: o Excel não aceita datetime com tzinfo
+    return datetime.fromtimestamp(value, fuso_local).replace(tzinfo=None) if value else None
+
+
+def _eth(wei: Optional[str]) -> Decimal:
+    # from_wei devolve int quando o valor é 0; Decimal mantém o tipo da coluna
+    return Decimal(Web3.from_wei(int(wei or 0), 'ether'))
+
+
+def _row(job: IndexedJob) -> Tuple:
+    return (
+        job.id,
+        JobStatus(job.status).name.lower(),
+        job.service_type or "",
+        job.client,
+        job.provider,
+        _eth(job.amount_wei),
+        _eth(job.platform_fee_wei),
+        _timestamp(job.created_at),
+        _timestamp(job.accepted_at),
+        _timestamp(job.completed_at),
+        _timestamp(job.deadline),
+        job.client_rating or 0,
+        job.provider_rating or 0,
+    )
+
+
+def iter_job_rows(address: str, role: str) -> Iterator[Tuple]:
+    """
+    Jobs do endereço no papel (provider ou client), do mais recente ao mais antigo.
+
+    Usa uma sessão própria: o gerador é consumido pelo StreamingResponse depois
+    que a sessão da requisição já foi fechada. yield_per mantém no máximo
+    FETCH_SIZE objetos carregados por vez.
+    """
+    column = IndexedJob.provider if role == "provider" else IndexedJob.client
+    db = SessionLocal()
+    try:
+        query = db.query(IndexedJob).filter(
+            column == Web3.to_checksum_address(address)
+        ).order_by(IndexedJob.created_at.desc(), IndexedJob.id).yield_per(FETCH_SIZE)
+
+        for job in query:
+            yield _row(job)
+    finally:
+        db.close()
+
+
+def stream_csv(address: str, role: str) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # BOM para o Excel abrir o CSV como UTF-8
+    buffer.write("\ufeff")
+    writer.writerow(HEADER)
+
+    for row in iter_job_rows(address, role):
+        writer.writerow(["" if value is None else value for value in row])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+def stream_ndjson(address: str, role: str) -> Iterator[bytes]:
+    lines = []
+    size = 0
+
+    for row in iter_job_rows(address, role):
+        line = json.dumps(dict(zip(HEADER, row)), default=str, ensure_ascii=False) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(lines).encode("utf-8")
+            lines, size = [], 0
+
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+def stream_xlsx(address: str, role: str) -> Iterator[bytes]:
+    """
+    Planilha em modo write_only: as linhas vão direto para o XML em disco, sem
+    manter células em memória. O .xlsx é um zip e só fica completo no save(),
+    então o arquivo temporário é enviado em pedaços e apagado em seguida.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Jobs")
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
+    header = []
+    for title in HEADER:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = header_font
+        cell.fill = header_fill
+        header.append(cell)
+    ws.append(header)
+
+    for row in iter_job_rows(address, role):
+        ws.append(row)
+
+    fd, path = tempfile.mkstemp(prefix="jobs-", suffix=".xlsx")
+    os.close(fd)
+    try:
+        wb.save(path)
+        with open(path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+    finally:
+        os.unlink(path)
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "xlsx": stream_xlsx,
+}
@@ -0,0 +1,205 @@
+import asyncio
+import threading
+from typing import Set, Tuple, Iterable
+
+from eth_utils import event_abi_to_log_topic
+from sqlalchemy.orm import Session
+
+from ..config.database import SessionLocal
+from ..config.settings import settings
+from ..model.bico_certo_main import BicoCerto
+from ..model.job_index import IndexedJob, IndexedProposal, SyncCheckpoint
+from .dashboard_stats import dashboard_aggregator, JobSnapshot
+from ..util.w3_util import get_instance
+
+# Eventos do IBicoCertoJobManager cujo primeiro tópico indexado é o jobId
+JOB_EVENTS = {
+    "JobCreated",
+    "JobOpenForProposals",
+    "JobAccepted",
+    "JobCompleted",
+    "JobApproved",
+    "JobCancelled",
+    "JobRejected",
+}
+
+# Eventos de proposta: tópicos indexados são (proposalId, jobId, provider)
+PROPOSAL_EVENTS = {
+    "ProposalSubmitted",
+    "ProposalAccepted",
+    "ProposalRejected",
+    "ProposalWithdrawn",
+}
+
+# Emitido pelo contrato de reputação: tópicos indexados são (jobId, rater)
+RATING_EVENTS = {"RatingGiven"}
+
+# Emitidos pelo DisputeResolver, que muda o status do job (Disputed, Refunded ou
+# Approved) por updateJobStatus, sem evento do JobManager: tópicos são (jobId, quem)
+DISPUTE_EVENTS = {"JobDisputed", "DisputeResolved"}
+
+
+class JobIndexer:
+    """
+    Mantém as tabelas indexed_jobs / indexed_proposals sincronizadas com a blockchain.
+
+    Lê os logs do JobManager (mais o RatingGiven da reputação e os eventos de
+    disputa do DisputeResolver) a partir do último bloco salvo em
+    sync_checkpoints, identifica os jobs e propostas tocados e atualiza apenas
+    esses registros (e os agregados dos dashboards).
+    """
+
+    CHECKPOINT_NAME = "job_manager"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bico_certo = None
+        self._addresses = None
+        self._job_topics: Set[bytes] = set()
+        self._proposal_topics: Set[bytes] = set()
+        self._rating_topics: Set[bytes] = set()
+        self._dispute_topics: Set[bytes] = set()
+
+    def _ensure_contracts(self):
+        """Resolve endereços e tópicos dos eventos na primeira sincronização"""
+        if self._bico_certo is not None:
+            return
+
+        bico_certo = BicoCerto()
+        job_manager = get_instance("BicoCertoJobManager", bico_certo.registry.get_job_manager())
+        reputation = get_instance("BicoCertoReputation", bico_certo.registry.get_reputation())
+        dispute_resolver = get_instance("BicoCertoDisputeResolver", bico_certo.registry.get_dispute_resolver())
+
+        self._job_topics = self._topics_for(job_manager.abi, JOB_EVENTS)
+        self._proposal_topics = self._topics_for(job_manager.abi, PROPOSAL_EVENTS)
+        self._rating_topics = self._topics_for(reputation.abi, RATING_EVENTS)
+        self._dispute_topics = self._topics_for(dispute_resolver.abi, DISPUTE_EVENTS)
+        self._addresses = [job_manager.address, reputation.address, dispute_resolver.address]
+        self._bico_certo = bico_certo
+
+    @staticmethod
+    def _topics_for(abi: list, names: Set[str]) -> Set[bytes]:
+        return {
+            bytes(event_abi_to_log_topic(item))
+            for item in abi
+            if item.get("type") == "event" and item.get("name") in names
+        }
+
+    def sync(self) -> int:
+        """
+        Processa todos os blocos novos desde o checkpoint.
+        Retorna a quantidade de logs processados.
+        """
+        with self._lock:
+            db = SessionLocal()
+            try:
+                return self._sync(db)
+            finally:
+                db.close()
+
+    def _sync(self, db: Session) -> int:
+        self._ensure_contracts()
+        w3 = self._bico_certo.w3
+
+        SyncCheckpoint.ensure(db, self.CHECKPOINT_NAME, settings.JOB_INDEXER_START_BLOCK - 1)
+
+        latest = w3.eth.block_number
+        processed = 0
+
+        while True:
+            # Linha do checkpoint travada até o commit do intervalo
+            checkpoint = SyncCheckpoint.lock(db, self.CHECKPOINT_NAME)
+
+            if not dashboard_aggregator.is_built(db):
+                # rebuild() faz commit e libera a trava; a volta trava de novo
+                dashboard_aggregator.rebuild(db)
+                continue
+
+            from_block = checkpoint.last_block + 1
+            if from_block > latest:
+                db.rollback()
+                break
+
+            to_block = min(from_block + settings.JOB_INDEXER_BLOCK_RANGE - 1, latest)
+
+            logs = w3.eth.get_logs({
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "address": self._addresses
+            })
+
+            job_ids, proposal_ids = self._collect_ids(logs)
+            self._refresh_jobs(db, job_ids, to_block)
+            self._refresh_proposals(db, proposal_ids, to_block)
+
+            # Checkpoint e dados são gravados na mesma transação (o commit libera a trava)
+            checkpoint.last_block = to_block
+            db.commit()
+
+            processed += len(logs)
+
+        return processed
+
+    def _collect_ids(self, logs: Iterable) -> Tuple[Set[bytes], Set[bytes]]:
+        """Extrai os IDs de jobs e propostas afetados pelos logs"""
+        job_ids = set()
+        proposal_ids = set()
+
+        for log in logs:
+            topics = log["topics"]
+            if not topics:
+                continue
+
+            signature = bytes(topics[0])
+            if signature in self._job_topics or signature in self._rating_topics or signature in self._dispute_topics:
+                job_ids.add(bytes(topics[1]))
+            elif signature in self._proposal_topics:
+                proposal_ids.add(bytes(topics[1]))
+                # O contador de propostas do job também muda
+                job_ids.add(bytes(topics[2]))
+
+        return job_ids, proposal_ids
+
+    def _refresh_jobs(self, db: Session, job_ids: Set[bytes], block_number: int):
+        job_ids = list(job_ids)
+        for job_id, job_data in zip(job_ids, self._bico_certo.get_jobs_data(job_ids)):
+            row = db.get(IndexedJob, job_id.hex())
+            old = JobSnapshot.of(row) if row else None
+            if not row:
+                row = IndexedJob(id=job_id.hex())
+                db.add(row)
+
+            row.apply_chain_data(job_data)
+            row.last_block = block_number
+
+            # Agregados dos dashboards acompanham a transição de estado
+            dashboard_aggregator.on_job_changed(db, old, JobSnapshot.of(row))
+
+    def _refresh_proposals(self, db: Session, proposal_ids: Set[bytes], block_number: int):
+        proposal_ids = list(proposal_ids)
+        for proposal_id, proposal_data in zip(proposal_ids, self._bico_certo.get_proposals(proposal_ids)):
+            row = db.get(IndexedProposal, proposal_id.hex())
+            if not row:
+                row = IndexedProposal(id=proposal_id.hex())
+                db.add(row)
+
+            row.apply_chain_data(proposal_data)
+            row.last_block = block_number
+
+    def try_sync(self):
+        """Sincroniza sem propagar erros (a leitura segue com o índice atual)"""
+        try:
+            self.sync()
+        except Exception as e:
+            print(f"[JobIndexer] Erro ao sincronizar: {e}")
+
+
+# Instância global
+job_indexer = JobIndexer()
+
+
+async def run_job_indexer():
+    """Loop em background que acompanha novos blocos"""
+    while True:
+        await asyncio.to_thread(job_indexer.try_sync)
+        await asyncio.sleep(settings.JOB_INDEXER_POLL_SECONDS)
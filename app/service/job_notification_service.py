@@ -4,18 +4,34 @@ from sqlalchemy.orm import Session
 from ..model.user import User
 from ..model.wallet import Wallet
 from .fcm_service import FCMService
-from app.service.ipfs_service import IPFSService
+from app.service.ipfs_service import get_ipfs_service
 import asyncio
+from typing import Optional
 
 
 class JobNotificationService:
     """Serviço para enviar notificações relacionadas a Jobs"""
 
+    # Loop da aplicação, definido no startup: as notificações também são
+    # disparadas de threads (handlers do TransactionTracker)
+    event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def _dispatch(coroutine):
+        """Agenda o envio pelo websocket sem aguardar, no event loop ou a partir de uma thread"""
+        try:
+            asyncio.get_running_loop().create_task(coroutine)
+        except RuntimeError:
+            if JobNotificationService.event_loop is None:
+                coroutine.close()
+                return
+            asyncio.run_coroutine_threadsafe(coroutine, JobNotificationService.event_loop)
+
     @staticmethod
     def _get_job_title(ipfs_hash: str) -> str:
         """Busca o título do job no IPFS"""
         try:
-            ipfs_service = IPFSService()
+            ipfs_service = get_ipfs_service()
             success, _, ipfs_data = ipfs_service.get_job_data(ipfs_hash)
 
             if success and ipfs_data:
@@ -138,7 +154,7 @@ class JobNotificationService:
             job_title = JobNotificationService._get_job_title(ipfs_hash)
             notification_message = f"Avalie {client_name} pelo trabalho '{job_title}'"
 
-            asyncio.create_task(
+            JobNotificationService._dispatch(
                 JobNotificationService._send_websocket_update(
                     user_id=user.id,
                     job_id=job_id,
@@ -182,7 +198,7 @@ class JobNotificationService:
             job_title = JobNotificationService._get_job_title(ipfs_hash)
             notification_message = f"{client_name} aceitou sua proposta para '{job_title}'"
 
-            asyncio.create_task(
+            JobNotificationService._dispatch(
                 JobNotificationService._send_websocket_update(
                     user_id=user.id,
                     job_id=job_id,
@@ -223,7 +239,7 @@ class JobNotificationService:
             job_title = JobNotificationService._get_job_title(ipfs_hash)
             notification_message = f"{client_name} não concorda que o trabalho '{job_title}' foi finalizado... Status voltou para 'Em Progresso'"
 
-            asyncio.create_task(
+            JobNotificationService._dispatch(
                 JobNotificationService._send_websocket_update(
                     user_id=user.id,
                     job_id=job_id,
@@ -264,7 +280,7 @@ class JobNotificationService:
             job_title = JobNotificationService._get_job_title(ipfs_hash)
             notification_message = f"{client_name} rejeitou sua proposta para '{job_title}'"
 
-            asyncio.create_task(
+            JobNotificationService._dispatch(
                 JobNotificationService._send_websocket_update(
                     user_id=user.id,
                     job_id=job_id,
@@ -305,7 +321,7 @@ class JobNotificationService:
             job_title = JobNotificationService._get_job_title(ipfs_hash)
             notification_message = f"{provider_name} concluiu o trabalho '{job_title}'. Aguardando sua aprovação."
 
-            asyncio.create_task(
+            JobNotificationService._dispatch(
                 JobNotificationService._send_websocket_update(
                     user_id=user.id,
                     job_id=job_id,
@@ -348,7 +364,7 @@ class JobNotificationService:
             stars = "⭐" * rating
             notification_message = f"{client_name} aprovou '{job_title}' - Avaliação: {stars}"
 
-            asyncio.create_task(
+            JobNotificationService._dispatch(
                 JobNotificationService._send_websocket_update(
                     user_id=user.id,
                     job_id=job_id,
@@ -390,7 +406,7 @@ class JobNotificationService:
             job_title = JobNotificationService._get_job_title(ipfs_hash)
             notification_message = f"{provider_name} aceitou o trabalho '{job_title}'"
 
-            asyncio.create_task(
+            JobNotificationService._dispatch(
                 JobNotificationService._send_websocket_update(
                     user_id=user.id,
                     job_id=job_id,
@@ -431,7 +447,7 @@ class JobNotificationService:
             job_title = JobNotificationService._get_job_title(ipfs_hash)
             notification_message = f"{provider_name} enviou uma proposta para '{job_title}'"
 
-            asyncio.create_task(
+            JobNotificationService._dispatch(
                 JobNotificationService._send_websocket_update(
                     user_id=user.id,
                     job_id=job_id,
@@ -472,7 +488,7 @@ class JobNotificationService:
             job_title = JobNotificationService._get_job_title(ipfs_hash)
             notification_message = f"{provider_name} removeu uma proposta para '{job_title}'"
 
-            asyncio.create_task(
+            JobNotificationService._dispatch(
                 JobNotificationService._send_websocket_update(
                     user_id=user.id,
                     job_id=job_id,
@@ -5,12 +5,21 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
 from reportlab.pdfgen import canvas
+from reportlab.graphics.shapes import Drawing, Group, String
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.widgets.markers import makeMarker
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.chart import BarChart, LineChart, Reference, PieChart
+from collections import OrderedDict
 from datetime import datetime
 from io import BytesIO
 from typing import Dict, Any, List
+import functools
+import hashlib
+import json
 import matplotlib
 
 matplotlib.use('Agg')
@@ -52,10 +61,45 @@ def format_brl(amount):
     return formato_us.translate(str.maketrans(',.', '.,'))
 
 
+# PNGs já renderizados, por processo (cada worker do pool de exportação tem o seu)
+CHART_CACHE_SIZE = 32
+_chart_cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+def cached_chart(func):
+    """
+    Reaproveita o PNG quando o tipo de gráfico, os dados e o estilo são os mesmos.
+    A chave é o hash dos argumentos; mantém os CHART_CACHE_SIZE mais recentes.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        payload = json.dumps([func.__name__, args, kwargs], sort_keys=True, default=str)
+        key = hashlib.sha256(payload.encode()).hexdigest()
+
+        content = _chart_cache.get(key)
+        if content is None:
+            content = func(*args, **kwargs).getvalue()
+            _chart_cache[key] = content
+            if len(_chart_cache) > CHART_CACHE_SIZE:
+                _chart_cache.popitem(last=False)
+        else:
+            _chart_cache.move_to_end(key)
+
+        return BytesIO(content)
+
+    return wrapper
+
+
+def _money_label(value) -> str:
+    return f'R$ {format_brl(value)}'
+
+
 class ReportGenerator:
     """Gerador de relatórios em PDF e Excel"""
 
     @staticmethod
+    @cached_chart
     def _create_line_chart(data: List[Dict], title: str, ylabel: str, color: str = '#4F46E5') -> BytesIO:
         """Cria gráfico de linha com proporções corretas"""
         fig, ax = plt.subplots(figsize=(10, 5))
@@ -90,6 +134,7 @@ class ReportGenerator:
         return buffer
 
     @staticmethod
+    @cached_chart
     def _create_bar_chart(data: List[Dict], title: str, xlabel: str, ylabel: str, color: str = '#10B981') -> BytesIO:
         """Cria gráfico de barras com proporções corretas"""
         fig, ax = plt.subplots(figsize=(10, 5))
@@ -130,6 +175,7 @@ class ReportGenerator:
         return buffer
 
     @staticmethod
+    @cached_chart
     def _create_pie_chart(data: List[Dict], title: str) -> BytesIO:
         """Cria gráfico de pizza com proporções corretas"""
         fig, ax = plt.subplots(figsize=(8, 8))
@@ -167,6 +213,7 @@ class ReportGenerator:
         return buffer
 
     @staticmethod
+    @cached_chart
     def _create_gauge_chart(value: float, max_value: float, title: str) -> BytesIO:
         """Cria gráfico de medidor estilo termômetro horizontal"""
         fig, ax = plt.subplots(figsize=(8, 3), facecolor='white')
@@ -215,7 +262,131 @@ class ReportGenerator:
         return buffer
 
     @staticmethod
-    def generate_provider_pdf(data: Dict[str, Any], user_name: str) -> BytesIO:
+    def _chart_title(drawing: Drawing, title: str):
+        drawing.add(String(drawing.width / 2, drawing.height - 16, title, textAnchor='middle',
+                           fontName='Helvetica-Bold', fontSize=13, fillColor=colors.HexColor('#1F2937')))
+
+    @staticmethod
+    def _vertical_label(text: str, x: float, y: float) -> Group:
+        # Rotação de 90 graus em torno de (x, y)
+        return Group(
+            String(0, 0, text, textAnchor='middle', fontName='Helvetica-Bold', fontSize=9,
+                   fillColor=colors.HexColor('#374151')),
+            transform=(0, 1, -1, 0, x, y)
+        )
+
+    @staticmethod
+    def _create_line_drawing(data: List[Dict], title: str, ylabel: str, color: str = '#4F46E5',
+                             width: float = 6.5 * inch, height: float = 3.25 * inch) -> Drawing:
+        """Versão vetorial (gráficos nativos do ReportLab) do gráfico de linha"""
+        drawing = Drawing(width, height)
+        ReportGenerator._chart_title(drawing, title)
+
+        chart = HorizontalLineChart()
+        chart.x, chart.y = 80, 30
+        chart.width, chart.height = width - 100, height - 70
+        chart.data = [[item['value'] for item in data]]
+        chart.joinedLines = 1
+
+        chart.lines[0].strokeColor = colors.HexColor(color)
+        chart.lines[0].strokeWidth = 2.5
+        chart.lines[0].symbol = makeMarker('FilledCircle', size=6, fillColor=colors.white,
+                                           strokeColor=colors.HexColor(color), strokeWidth=2)
+
+        chart.categoryAxis.categoryNames = [item['month'] for item in data]
+        chart.categoryAxis.labels.fontSize = 9
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.labels.fontSize = 9
+        chart.valueAxis.labelTextFormat = _money_label
+        chart.valueAxis.visibleGrid = 1
+        chart.valueAxis.gridStrokeColor = colors.HexColor('#E5E7EB')
+        chart.valueAxis.gridStrokeDashArray = (2, 2)
+
+        drawing.add(chart)
+        drawing.add(ReportGenerator._vertical_label(ylabel, 12, chart.y + chart.height / 2))
+        return drawing
+
+    @staticmethod
+    def _create_bar_drawing(data: List[Dict], title: str, xlabel: str, ylabel: str, color: str = '#10B981',
+                            width: float = 6.5 * inch, height: float = 3.25 * inch) -> Drawing:
+        """Versão vetorial do gráfico de barras"""
+        drawing = Drawing(width, height)
+        ReportGenerator._chart_title(drawing, title)
+
+        chart = VerticalBarChart()
+        chart.x, chart.y = 80, 60
+        chart.width, chart.height = width - 100, height - 100
+        chart.data = [[item.get('earnings', item.get('spent', 0)) for item in data]]
+
+        chart.bars[0].fillColor = colors.HexColor(color)
+        chart.bars[0].strokeColor = colors.white
+        chart.barLabelFormat = _money_label
+        chart.barLabels.fontSize = 8
+        chart.barLabels.nudge = 7
+
+        chart.categoryAxis.categoryNames = [item['category'][:15] for item in data]
+        chart.categoryAxis.labels.angle = 30
+        chart.categoryAxis.labels.boxAnchor = 'ne'
+        chart.categoryAxis.labels.fontSize = 8
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.labels.fontSize = 9
+        chart.valueAxis.labelTextFormat = _money_label
+        chart.valueAxis.visibleGrid = 1
+        chart.valueAxis.gridStrokeColor = colors.HexColor('#E5E7EB')
+        chart.valueAxis.gridStrokeDashArray = (2, 2)
+
+        drawing.add(chart)
+        drawing.add(ReportGenerator._vertical_label(ylabel, 12, chart.y + chart.height / 2))
+        drawing.add(String(width / 2, 4, xlabel, textAnchor='middle', fontName='Helvetica-Bold', fontSize=9,
+                           fillColor=colors.HexColor('#374151')))
+        return drawing
+
+    @staticmethod
+    def _create_pie_drawing(data: List[Dict], title: str,
+                            width: float = 5 * inch, height: float = 5 * inch) -> Drawing:
+        """Versão vetorial do gráfico de pizza"""
+        drawing = Drawing(width, height)
+        ReportGenerator._chart_title(drawing, title)
+
+        sizes = [item.get('earnings', item.get('spent', 0)) for item in data[:5]]
+        total = sum(sizes)
+        colors_palette = ['#4F46E5', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6']
+
+        size = min(width, height - 40) * 0.6
+        pie = Pie()
+        pie.x, pie.y = (width - size) / 2, (height - 40 - size) / 2
+        pie.width = pie.height = size
+        pie.data = sizes
+        pie.labels = [
+            f"{item['category']} ({value / total * 100:.1f}%)" if total else item['category']
+            for item, value in zip(data[:5], sizes)
+        ]
+        pie.startAngle = 90
+        pie.direction = 'clockwise'
+        pie.sideLabels = 1
+        pie.slices.strokeColor = colors.white
+        pie.slices.strokeWidth = 2
+        pie.slices.fontSize = 9
+        pie.slices.fontName = 'Helvetica-Bold'
+        for i in range(len(sizes)):
+            pie.slices[i].fillColor = colors.HexColor(colors_palette[i % len(colors_palette)])
+
+        drawing.add(pie)
+        return drawing
+
+    @staticmethod
+    def _chart(kind: str, width: float, height: float, vector: bool, *args):
+        """
+        Gráfico pronto para o documento: Drawing nativo do ReportLab (vetorial, sem
+        PNG para codificar) ou a imagem renderizada pelo matplotlib
+        """
+        if vector:
+            return getattr(ReportGenerator, f"_create_{kind}_drawing")(*args, width=width, height=height)
+        buffer = getattr(ReportGenerator, f"_create_{kind}_chart")(*args)
+        return Image(buffer, width=width, height=height)
+
+    @staticmethod
+    def generate_provider_pdf(data: Dict[str, Any], user_name: str, vector_charts: bool = False) -> BytesIO:
         """Gera relatório PDF do dashboard do prestador com gráficos"""
         buffer = BytesIO()
         doc = SimpleDocTemplate(
@@ -438,13 +609,13 @@ class ReportGenerator:
 
         monthly_earnings = data.get('monthlyEarnings', [])
         if monthly_earnings:
-            chart_buffer = ReportGenerator._create_line_chart(
+            chart_img = ReportGenerator._chart(
+                'line', 6.5 * inch, 3.25 * inch, vector_charts,
                 monthly_earnings,
                 'Ganhos Mensais (Ultimos 6 meses)',
                 'Ganhos (R$)',
                 '#4F46E5'
             )
-            chart_img = Image(chart_buffer, width=6.5 * inch, height=3.25 * inch)
             elements.append(chart_img)
         else:
             elements.append(Paragraph(
@@ -487,22 +658,22 @@ class ReportGenerator:
 
         categories = data.get('jobsByCategory', [])
         if categories:
-            chart_buffer = ReportGenerator._create_bar_chart(
+            chart_img = ReportGenerator._chart(
+                'bar', 6.5 * inch, 3.25 * inch, vector_charts,
                 categories,
                 'Ganhos por Categoria',
                 'Categoria',
                 'Ganhos (R$)',
                 '#10B981'
             )
-            chart_img = Image(chart_buffer, width=6.5 * inch, height=3.25 * inch)
             elements.append(chart_img)
             elements.append(Spacer(1, 40))
 
-            pie_buffer = ReportGenerator._create_pie_chart(
+            pie_img = ReportGenerator._chart(
+                'pie', 5 * inch, 5 * inch, vector_charts,
                 categories,
                 'Distribuicao de Ganhos por Categoria'
             )
-            pie_img = Image(pie_buffer, width=5 * inch, height=5 * inch)
 
             pie_container = Table([[pie_img]], colWidths=[6.5 * inch])
             pie_container.setStyle(TableStyle([
@@ -599,7 +770,7 @@ class ReportGenerator:
         return buffer
 
     @staticmethod
-    def generate_client_pdf(data: Dict[str, Any], user_name: str) -> BytesIO:
+    def generate_client_pdf(data: Dict[str, Any], user_name: str, vector_charts: bool = False) -> BytesIO:
         """Gera relatório PDF do dashboard do cliente com gráficos"""
         buffer = BytesIO()
         doc = SimpleDocTemplate(
@@ -791,13 +962,13 @@ class ReportGenerator:
 
         monthly_spending = data.get('monthlySpending', [])
         if monthly_spending:
-            chart_buffer = ReportGenerator._create_line_chart(
+            chart_img = ReportGenerator._chart(
+                'line', 6.5 * inch, 3.25 * inch, vector_charts,
                 monthly_spending,
                 'Gastos Mensais (Ultimos 6 meses)',
                 'Gastos (R$)',
                 '#059669'
             )
-            chart_img = Image(chart_buffer, width=6.5 * inch, height=3.25 * inch)
             elements.append(chart_img)
 
         elements.append(Spacer(1, 2 * inch))
@@ -808,22 +979,22 @@ class ReportGenerator:
 
         categories = data.get('spendingByCategory', [])
         if categories:
-            chart_buffer = ReportGenerator._create_bar_chart(
+            chart_img = ReportGenerator._chart(
+                'bar', 6.5 * inch, 3.25 * inch, vector_charts,
                 categories,
                 'Gastos por Categoria',
                 'Categoria',
                 'Gastos (R$)',
                 '#8B5CF6'
             )
-            chart_img = Image(chart_buffer, width=6.5 * inch, height=3.25 * inch)
             elements.append(chart_img)
             elements.append(Spacer(1, 40))
 
-            pie_buffer = ReportGenerator._create_pie_chart(
+            pie_img = ReportGenerator._chart(
+                'pie', 5 * inch, 5 * inch, vector_charts,
                 categories,
                 'Distribuicao de Gastos por Categoria'
             )
-            pie_img = Image(pie_buffer, width=5 * inch, height=5 * inch)
 
             pie_container = Table([[pie_img]], colWidths=[6.5 * inch])
             pie_container.setStyle(TableStyle([
@@ -0,0 +1,193 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, Optional
+
+from hexbytes import HexBytes
+from sqlalchemy.orm import Session
+from web3.exceptions import TransactionNotFound
+
+from ..config.database import SessionLocal
+from ..config.settings import settings, fuso_local
+from ..model.pending_transaction import PendingTransaction, TransactionStatus
+from ..model.user import User
+from ..util.w3_util import async_w3
+from ..websocket.notifications_handler import notifications_manager
+
+# handler(db, usuário que enviou, contexto da ação, recibo) -> dados extras do resultado
+ConfirmationHandler = Callable[[Session, User, Dict[str, Any], Any], Optional[Dict[str, Any]]]
+
+
+class TransactionTracker:
+    """
+    Acompanha as transações enviadas sem esperar o recibo.
+
+    A cada novo bloco busca os recibos de todas as transações pendentes,
+    grava o resultado em pending_transactions, executa o handler registrado
+    para a ação (notificações, extração de IDs dos eventos) e avisa o
+    usuário pelo websocket de notificações.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, ConfirmationHandler] = {}
+        self._last_block: Optional[int] = None
+
+    def register_handler(self, action: str, handler: ConfirmationHandler):
+        """Registra o que fazer quando uma transação da ação for confirmada"""
+        self._handlers[action] = handler
+
+    def track(
+            self,
+            db: Session,
+            tx_hash: str,
+            user_id: str,
+            action: str,
+            context: Optional[Dict[str, Any]] = None
+    ) -> PendingTransaction:
+        """Registra uma transação já enviada para acompanhamento"""
+        pending = PendingTransaction(
+            tx_hash=tx_hash,
+            user_id=user_id,
+            action=action,
+            context=json.dumps(context or {})
+        )
+        db.add(pending)
+        db.commit()
+        db.refresh(pending)
+        return pending
+
+    async def poll(self) -> int:
+        """
+        Resolve as transações pendentes se houver bloco novo.
+        Retorna quantas foram resolvidas.
+        """
+        block_number = await async_w3.eth.block_number
+        if block_number == self._last_block:
+            return 0
+
+        db = SessionLocal()
+        try:
+            pending = db.query(PendingTransaction).filter(
+                PendingTransaction.status == TransactionStatus.PENDING
+            ).order_by(PendingTransaction.created_at).limit(settings.TX_TRACKER_BATCH_SIZE).all()
+
+            receipts = await asyncio.gather(*(self._get_receipt(row.tx_hash) for row in pending))
+
+            resolved = 0
+            for row, receipt in zip(pending, receipts):
+                if receipt is not None and await self._resolve(db, row, receipt):
+                    resolved += 1
+
+            await self._expire(db)
+
+            self._last_block = block_number
+            return resolved
+        finally:
+            db.close()
+
+    @staticmethod
+    async def _get_receipt(tx_hash: str):
+        try:
+            return await async_w3.eth.get_transaction_receipt(HexBytes(tx_hash))
+        except TransactionNotFound:
+            return None
+
+    async def _resolve(self, db: Session, row: PendingTransaction, receipt) -> bool:
+        status = TransactionStatus.CONFIRMED if receipt["status"] == 1 else TransactionStatus.FAILED
+
+        # Update condicional: com vários workers, só um resolve cada transação
+        claimed = db.query(PendingTransaction).filter(
+            PendingTransaction.id == row.id,
+            PendingTransaction.status == TransactionStatus.PENDING
+        ).update({
+            PendingTransaction.status: status,
+            PendingTransaction.block_number: receipt["blockNumber"],
+            PendingTransaction.error: None if status == TransactionStatus.CONFIRMED else "Transação falhou na blockchain",
+            PendingTransaction.resolved_at: datetime.now(fuso_local)
+        }, synchronize_session=False)
+        db.commit()
+
+        if not claimed:
+            return False
+
+        db.refresh(row)
+
+        if status == TransactionStatus.CONFIRMED:
+            # Handlers fazem chamadas bloqueantes (blockchain, IPFS, FCM): rodam em uma thread
+            result = await asyncio.to_thread(self._run_handler, row.action, row.user_id, row.context, receipt)
+            if result:
+                row.result = json.dumps(result)
+                db.commit()
+
+        await self._notify(row)
+        return True
+
+    def _run_handler(self, action: str, user_id: str, context: Optional[str], receipt) -> Optional[Dict[str, Any]]:
+        """Executa o handler da ação com uma sessão própria (roda fora do event loop)"""
+        handler = self._handlers.get(action)
+        if not handler:
+            return None
+
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            return handler(db, user, json.loads(context or "{}"), receipt)
+        except Exception as e:
+            print(f"[TransactionTracker] Erro no handler de '{action}': {e}")
+            return None
+        finally:
+            db.close()
+
+    async def _expire(self, db: Session):
+        """Marca como descartadas as transações sem recibo após TX_TRACKER_TIMEOUT_SECONDS"""
+        cutoff = datetime.now(fuso_local) - timedelta(seconds=settings.TX_TRACKER_TIMEOUT_SECONDS)
+
+        expired = db.query(PendingTransaction).filter(
+            PendingTransaction.status == TransactionStatus.PENDING,
+            PendingTransaction.created_at < cutoff
+        ).all()
+
+        for row in expired:
+            row.status = TransactionStatus.DROPPED
+            row.error = "Recibo não encontrado dentro do prazo"
+            row.resolved_at = datetime.now(fuso_local)
+        db.commit()
+
+        for row in expired:
+            await self._notify(row)
+
+    @staticmethod
+    async def _notify(row: PendingTransaction):
+        await notifications_manager.send_to_user(row.user_id, {
+            "type": "transaction_update",
+            "data": TransactionTracker.to_dict(row)
+        })
+
+    @staticmethod
+    def to_dict(row: PendingTransaction) -> Dict[str, Any]:
+        return {
+            "tracking_id": row.id,
+            "transaction_hash": row.tx_hash,
+            "action": row.action,
+            "status": row.status.value,
+            "block_number": row.block_number,
+            "context": json.loads(row.context or "{}"),
+            "result": json.loads(row.result) if row.result else None,
+            "error": row.error,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "resolved_at": row.resolved_at.isoformat() if row.resolved_at else None
+        }
+
+
+# Instância global
+transaction_tracker = TransactionTracker()
+
+
+async def run_transaction_tracker():
+    """Loop em background que resolve as transações pendentes a cada bloco"""
+    while True:
+        try:
+            await transaction_tracker.poll()
+        except Exception as e:
+            print(f"[TransactionTracker] Erro ao verificar transações: {e}")
+        await asyncio.sleep(settings.TX_TRACKER_POLL_SECONDS)
@@ -0,0 +1,283 @@
+import asyncio
+import base64
+import json
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+from eth_utils import event_abi_to_log_topic
+from sqlalchemy.orm import Session
+from web3 import Web3
+
+from ..config.database import SessionLocal
+from ..config.settings import settings
+from ..model.address_transaction import AddressTransaction
+from ..model.job_index import SyncCheckpoint
+from ..util.w3_util import get_web3, load_abi
+
+# Eventos do PaymentGateway que acompanham uma transferência interna de ETH:
+# tópicos indexados (jobId, destinatário), valor no data
+PAYOUT_EVENTS = {"PaymentReleased", "RefundIssued"}
+
+
+class TxHistoryIndexer:
+    """
+    Ingestão incremental dos blocos para o histórico de transações por endereço.
+
+    A partir do checkpoint "tx_history" lê os blocos novos (com as transações
+    completas) e os recibos em batch JSON-RPC, e grava uma linha em
+    address_transactions para o remetente e outra para o destinatário.
+
+    Transferências internas só são vistas quando o contrato emite um evento
+    para elas: os pagamentos e reembolsos do PaymentGateway entram; a taxa
+    enviada à carteira da plataforma e qualquer outra transferência interna
+    sem evento não aparecem no histórico.
+    """
+
+    CHECKPOINT_NAME = "tx_history"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.w3 = get_web3()
+        self._gateway_address: Optional[str] = None
+        self._payout_topics: set = set()
+
+    def _ensure_gateway(self):
+        """Resolve o endereço do PaymentGateway e os tópicos dos eventos de pagamento"""
+        if self._gateway_address is not None:
+            return
+
+        from ..model.bico_certo_main import BicoCerto
+
+        self._payout_topics = {
+            bytes(event_abi_to_log_topic(item))
+            for item in load_abi("BicoCertoPaymentGateway")
+            if item.get("type") == "event" and item.get("name") in PAYOUT_EVENTS
+        }
+        self._gateway_address = BicoCerto().registry.get_payment_gateway().lower()
+
+    def sync(self) -> int:
+        """
+        Processa todos os blocos novos desde o checkpoint.
+        Retorna a quantidade de transações gravadas.
+        """
+        with self._lock:
+            db = SessionLocal()
+            try:
+                return self._sync(db)
+            finally:
+                db.close()
+
+    def _sync(self, db: Session) -> int:
+        self._ensure_gateway()
+
+        SyncCheckpoint.ensure(db, self.CHECKPOINT_NAME, settings.TX_HISTORY_START_BLOCK - 1)
+
+        latest = self.w3.eth.block_number
+        processed = 0
+
+        while True:
+            # Linha do checkpoint travada até o commit do intervalo: com vários
+            # workers, cada bloco é gravado por um só
+            checkpoint = SyncCheckpoint.lock(db, self.CHECKPOINT_NAME)
+
+            from_block = checkpoint.last_block + 1
+            if from_block > latest:
+                db.rollback()
+                break
+
+            to_block = min(from_block + settings.TX_HISTORY_BLOCK_BATCH - 1, latest)
+
+            blocks = self._get_blocks(range(from_block, to_block + 1))
+            transactions = [(block, tx) for block in blocks for tx in block["transactions"]]
+            receipts = self._get_receipts([tx["hash"] for _, tx in transactions])
+
+            if transactions:
+                # Intervalo reprocessado (ex: checkpoint voltado manualmente): as linhas são substituídas
+                db.query(AddressTransaction).filter(
+                    AddressTransaction.tx_hash.in_([tx["hash"].hex() for _, tx in transactions])
+                ).delete(synchronize_session=False)
+
+            for (block, tx), receipt in zip(transactions, receipts):
+                db.add_all(self._rows_for(block, tx, receipt))
+                db.add_all(self._internal_rows_for(block, tx, receipt))
+
+            # Checkpoint e histórico são gravados na mesma transação (o commit libera a trava)
+            checkpoint.last_block = to_block
+            db.commit()
+
+            processed += len(transactions)
+
+        return processed
+
+    def _get_blocks(self, numbers: range) -> List:
+        with self.w3.batch_requests() as batch:
+            for number in numbers:
+                batch.add(self.w3.eth.get_block(number, full_transactions=True))
+            return batch.execute()
+
+    def _get_receipts(self, tx_hashes: List) -> List:
+        receipts = []
+        batch_size = settings.WEB3_BATCH_SIZE
+
+        for start in range(0, len(tx_hashes), batch_size):
+            with self.w3.batch_requests() as batch:
+                for tx_hash in tx_hashes[start:start + batch_size]:
+                    batch.add(self.w3.eth.get_transaction_receipt(tx_hash))
+                receipts.extend(batch.execute())
+
+        return receipts
+
+    @staticmethod
+    def _rows_for(block, tx, receipt) -> List[AddressTransaction]:
+        sender = tx["from"].lower()
+        recipient = tx["to"].lower() if tx.get("to") else None
+        contract_address = receipt.get("contractAddress")
+
+        common = dict(
+            tx_hash=tx["hash"].hex(),
+            block_number=block["number"],
+            tx_index=tx["transactionIndex"],
+            timestamp=block["timestamp"],
+            from_address=tx["from"],
+            to_address=tx.get("to"),
+            contract_address=contract_address,
+            value_wei=str(tx["value"]),
+            has_value=tx["value"] > 0,
+            is_contract_call=recipient is not None and len(tx.get("input") or b"") > 0,
+            gas=tx["gas"],
+            gas_price_wei=str(tx.get("gasPrice", 0)),
+            gas_used=receipt["gasUsed"],
+            status=receipt["status"]
+        )
+
+        rows = [AddressTransaction(address=sender, direction="send", **common)]
+        if recipient and recipient != sender:
+            rows.append(AddressTransaction(address=recipient, direction="receive", **common))
+        return rows
+
+    def _internal_rows_for(self, block, tx, receipt) -> List[AddressTransaction]:
+        """Linhas "receive" das transferências do PaymentGateway, a partir dos eventos do recibo"""
+        rows = []
+        for log in receipt.get("logs") or []:
+            topics = log["topics"]
+            if (
+                log["address"].lower() != self._gateway_address
+                or len(topics) < 3
+                or bytes(topics[0]) not in self._payout_topics
+            ):
+                continue
+
+            recipient = "0x" + bytes(topics[2])[-20:].hex()
+            amount = int.from_bytes(bytes(log["data"])[:32], "big")
+
+            rows.append(AddressTransaction(
+                address=recipient,
+                direction="receive",
+                tx_hash=tx["hash"].hex(),
+                block_number=block["number"],
+                tx_index=tx["transactionIndex"],
+                log_index=log["logIndex"],
+                timestamp=block["timestamp"],
+                from_address=log["address"],
+                to_address=Web3.to_checksum_address(recipient),
+                value_wei=str(amount),
+                has_value=amount > 0,
+                is_contract_call=False,
+                is_internal=True,
+                # O gas foi pago por quem enviou a transação
+                gas=0,
+                gas_price_wei="0",
+                gas_used=0,
+                status=receipt["status"]
+            ))
+        return rows
+
+    @staticmethod
+    def encode_cursor(row: AddressTransaction) -> str:
+        """Cursor opaco com a posição (block_number, tx_index, log_index) da linha"""
+        raw = json.dumps([row.block_number, row.tx_index, row.log_index])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[Tuple[int, int, int]]:
+        """Posição do cursor, ou None se for inválido"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            block_number, tx_index, log_index = (int(value) for value in json.loads(raw))
+            return block_number, tx_index, log_index
+        except (ValueError, TypeError):
+            return None
+
+    def get_history(
+            self,
+            db: Session,
+            address: str,
+            limit: int = 20,
+            before: Optional[Tuple[int, int, int]] = None,
+            direction: Optional[str] = None,
+            only_value: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Página do histórico do endereço, da transação mais recente para a mais antiga.
+
+        Com `before` (cursor decodificado) a página começa logo após a linha
+        do cursor, percorrendo o índice (address, block_number, tx_index,
+        log_index) sem OFFSET. Busca limit + 1 linhas para saber se há
+        próxima página sem contar o total.
+        """
+        query = db.query(AddressTransaction).filter(AddressTransaction.address == address.lower())
+
+        if direction in ("send", "receive"):
+            query = query.filter(AddressTransaction.direction == direction)
+        if only_value:
+            query = query.filter(AddressTransaction.has_value.is_(True))
+
+        if before is not None:
+            block_number, tx_index, log_index = before
+            query = query.filter(
+                (AddressTransaction.block_number < block_number) |
+                ((AddressTransaction.block_number == block_number) & (
+                    (AddressTransaction.tx_index < tx_index) |
+                    ((AddressTransaction.tx_index == tx_index) & (AddressTransaction.log_index < log_index))
+                ))
+            )
+
+        rows = query.order_by(
+            AddressTransaction.block_number.desc(),
+            AddressTransaction.tx_index.desc(),
+            AddressTransaction.log_index.desc()
+        ).limit(limit + 1).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        checkpoint = db.get(SyncCheckpoint, self.CHECKPOINT_NAME)
+        latest_block = checkpoint.last_block if checkpoint else 0
+        zero_gas = settings.ZERO_GAS_COST if hasattr(settings, 'ZERO_GAS_COST') else True
+
+        return {
+            "transactions": [row.to_dict(latest_block, zero_gas) for row in rows],
+            "address": Web3.to_checksum_address(address),
+            "limit": limit,
+            "has_more": has_more,
+            "next_cursor": self.encode_cursor(rows[-1]) if has_more else None,
+            "indexed_block": latest_block
+        }
+
+    def try_sync(self):
+        """Sincroniza sem propagar erros (a leitura segue com o histórico atual)"""
+        try:
+            self.sync()
+        except Exception as e:
+            print(f"[TxHistoryIndexer] Erro ao sincronizar: {e}")
+
+
+# Instância global
+tx_history_indexer = TxHistoryIndexer()
+
+
+async def run_tx_history_indexer():
+    """Loop em background que acompanha novos blocos"""
+    while True:
+        await asyncio.to_thread(tx_history_indexer.try_sync)
+        await asyncio.sleep(settings.TX_HISTORY_POLL_SECONDS)
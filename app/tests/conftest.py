@@ -0,0 +1,23 @@
+"""
+Configuração comum dos testes
+Arquivo: tests/conftest.py
+"""
+
+from unittest.mock import patch
+
+from web3.eth import Eth
+
+# app.util.w3_util lê w3.eth.accounts[0] ao ser importado (cadeia de import de
+# bico_certo_main, chat_service, dashboard_analytics...), o que exige um nó em
+# WEB3_PROVIDER_URL. Os testes não falam com a blockchain: a conta é fixa
+TEST_ACCOUNT = "0x" + "00" * 20
+
+_accounts_patch = patch.object(Eth, "accounts", property(lambda self: [TEST_ACCOUNT]))
+
+
+def pytest_configure(config):
+    _accounts_patch.start()
+
+
+def pytest_unconfigure(config):
+    _accounts_patch.stop()
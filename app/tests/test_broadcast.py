@@ -0,0 +1,191 @@
+"""
+Testes da distribuição de eventos de websocket entre workers
+Arquivo: tests/test_broadcast.py
+"""
+
+import asyncio
+
+import pytest
+
+from app.websocket.broadcast import Broadcaster, MemoryBroadcastBackend, MemoryHub
+from app.websocket.notifications_handler import NotificationsManager
+from app.websocket.outbound import OutboundConnection, OutboundMetrics
+from app.websocket.presence import PresenceRegistry
+
+
+class FakeWebSocket:
+    def __init__(self, fail: bool = False, blocked: bool = False):
+        self.sent = []
+        self.fail = fail
+        self.closed_with = None
+        self._unblocked = asyncio.Event()
+        if not blocked:
+            self._unblocked.set()
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        await self._unblocked.wait()
+        if self.fail:
+            raise RuntimeError("conexão fechada")
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+    def unblock(self):
+        self._unblocked.set()
+
+
+def make_worker(hub: MemoryHub):
+    """Um 'worker': broadcaster próprio ligado ao hub e um NotificationsManager local"""
+    broadcaster = Broadcaster(MemoryBroadcastBackend(hub))
+    manager = NotificationsManager()
+    broadcaster.register("user", manager._deliver_to_user)
+    return broadcaster, manager
+
+
+class TestBroadcaster:
+    """Entrega entre workers com o backend em memória compartilhado"""
+
+    @pytest.mark.asyncio
+    async def test_event_reaches_connection_on_other_worker(self):
+        hub = MemoryHub()
+        worker_a, _ = make_worker(hub)
+        worker_b, manager_b = make_worker(hub)
+        await worker_b.start()
+
+        websocket = FakeWebSocket()
+        outbound = await manager_b.connect("user-1", websocket)
+
+        await worker_a.publish("user", "user-1", {"type": "room_update"})
+        await outbound.flush()
+
+        assert websocket.sent == [{"type": "room_update"}]
+
+    @pytest.mark.asyncio
+    async def test_options_are_passed_to_handler(self):
+        hub = MemoryHub()
+        worker_a = Broadcaster(MemoryBroadcastBackend(hub))
+        worker_b = Broadcaster(MemoryBroadcastBackend(hub))
+        received = []
+
+        async def deliver(room_id, message, exclude_user=None):
+            received.append((room_id, message, exclude_user))
+
+        worker_b.register("room", deliver)
+        await worker_b.start()
+
+        await worker_a.publish("room", "room-1", {"type": "typing"}, exclude_user="user-2")
+
+        assert received == [("room-1", {"type": "typing"}, "user-2")]
+
+    @pytest.mark.asyncio
+    async def test_stopped_worker_no_longer_receives(self):
+        hub = MemoryHub()
+        worker_a, _ = make_worker(hub)
+        worker_b, manager_b = make_worker(hub)
+        await worker_b.start()
+        await worker_b.stop()
+
+        websocket = FakeWebSocket()
+        outbound = await manager_b.connect("user-1", websocket)
+
+        await worker_a.publish("user", "user-1", {"type": "room_update"})
+        await outbound.flush()
+
+        assert websocket.sent == []
+
+    @pytest.mark.asyncio
+    async def test_dead_connection_is_dropped_without_affecting_others(self):
+        hub = MemoryHub()
+        worker, manager = make_worker(hub)
+
+        alive, dead = FakeWebSocket(), FakeWebSocket(fail=True)
+        alive_outbound = await manager.connect("user-1", alive)
+        dead_outbound = await manager.connect("user-1", dead)
+
+        await worker.publish("user", "user-1", {"type": "export_update"})
+        await asyncio.gather(alive_outbound.flush(), dead_outbound.flush())
+        await worker.publish("user", "user-1", {"type": "export_update"})
+        await alive_outbound.flush()
+
+        assert alive.sent == [{"type": "export_update"}] * 2
+        assert dead_outbound.closed
+        assert list(manager.active_connections["user-1"]) == [alive]
+
+
+class TestOutboundConnection:
+    """Fila de saída por conexão"""
+
+    @pytest.mark.asyncio
+    async def test_send_does_not_wait_for_slow_socket(self):
+        websocket = FakeWebSocket(blocked=True)
+        outbound = OutboundConnection(websocket, max_size=10, metrics=OutboundMetrics())
+
+        assert outbound.send({"n": 1})
+        assert websocket.sent == []
+
+        websocket.unblock()
+        await outbound.flush()
+        assert websocket.sent == [{"n": 1}]
+        outbound.close()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_disconnects_slow_consumer(self):
+        metrics = OutboundMetrics()
+        websocket = FakeWebSocket(blocked=True)
+        outbound = OutboundConnection(websocket, max_size=2, policy="disconnect", metrics=metrics)
+
+        results = [outbound.send({"n": i}) for i in range(4)]
+        await asyncio.sleep(0)
+
+        assert results[-1] is False
+        assert outbound.closed
+        assert websocket.closed_with == 1013
+        assert metrics.slow_disconnects == 1
+        assert metrics.stats()["connections"] == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_oldest_message(self):
+        metrics = OutboundMetrics()
+        websocket = FakeWebSocket(blocked=True)
+        outbound = OutboundConnection(websocket, max_size=2, policy="drop_oldest", metrics=metrics)
+        assert outbound.send({"n": 0})
+        await asyncio.sleep(0)  # writer pega a primeira mensagem e fica preso no envio
+
+        for i in range(1, 5):
+            assert outbound.send({"n": i})
+
+        assert metrics.dropped == 2
+        assert metrics.stats()["max_queue_depth"] == 2
+
+        websocket.unblock()
+        await outbound.flush()
+        assert websocket.sent == [{"n": 0}, {"n": 3}, {"n": 4}]
+        outbound.close()
+
+
+class TestPresenceRegistry:
+    """Presença por sala e por usuário, com vários dispositivos"""
+
+    @pytest.mark.asyncio
+    async def test_second_device_does_not_replace_first(self):
+        presence = PresenceRegistry()
+        phone = OutboundConnection(FakeWebSocket(), metrics=OutboundMetrics())
+        laptop = OutboundConnection(FakeWebSocket(), metrics=OutboundMetrics())
+
+        assert presence.add("room-1", "user-1", "Ana", phone) is True
+        assert presence.add("room-1", "user-1", "Ana", laptop) is False
+        assert presence.online_users("room-1") == [{"user_id": "user-1", "user_name": "Ana", "devices": 2}]
+
+        assert presence.remove("room-1", "user-1", phone) is False
+        assert presence.is_in_room("room-1", "user-1")
+
+        assert presence.remove("room-1", "user-1", laptop) is True
+        assert not presence.is_in_room("room-1", "user-1")
+        assert not presence.is_online("user-1")
+        assert presence.online_users("room-1") == []
+        phone.close()
+        laptop.close()
@@ -0,0 +1,206 @@
+"""
+Testes do histórico de mensagens e dos contadores das salas do chat
+Arquivo: tests/test_chat_service.py
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Modelos referenciados pelos relacionamentos de User
+import app.model.device
+import app.model.password_reset
+import app.model.session
+import app.model.two_factor
+import app.model.wallet
+from app.api.chat import get_room_messages
+from app.config.database import Base
+from app.config.settings import fuso_local
+from app.model.chat_model import ChatMessage, ChatRoom, MessageStatus
+from app.model.user import User
+from app.service import chat_writer
+from app.service.chat_service import ChatService
+from app.service.chat_writer import ChatWriter, DeadLetterJournal, persist_messages
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def room(db):
+    db.add_all([
+        User(id="client", email="cliente@teste.com", password_hash="x", full_name="Cliente"),
+        User(id="provider", email="prestador@teste.com", password_hash="x", full_name="Prestador"),
+    ])
+    room = ChatRoom(id="room", job_id="ab" * 32, client_id="client", provider_id="provider")
+    db.add(room)
+    db.commit()
+    return room
+
+
+def add_messages(db, room_id: str, created_at: list) -> list:
+    """Uma mensagem por horário (horários repetidos geram empates); retorna os ids"""
+    ids = []
+    for i, moment in enumerate(created_at):
+        message_id = f"msg-{i:02d}"
+        db.add(ChatMessage(id=message_id, room_id=room_id, sender_id="client", message=f"m{i}", created_at=moment))
+        ids.append(message_id)
+    db.commit()
+    return ids
+
+
+class TestMessageHistory:
+    """Paginação por cursor (created_at, id)"""
+
+    def test_pages_with_ties_have_no_duplicates_or_gaps(self, db, room):
+        base = datetime(2026, 1, 10, 12, 0, tzinfo=fuso_local)
+        # Três grupos de mensagens no mesmo instante, que atravessam os limites das páginas
+        moments = [base] * 4 + [base + timedelta(seconds=1)] * 5 + [base + timedelta(seconds=2)] * 3
+        ids = add_messages(db, room.id, moments)
+        service = ChatService(db)
+
+        seen = []
+        before = None
+        while True:
+            success, _, messages, next_cursor = service.get_room_messages(room.id, "client", limit=5, before=before)
+            assert success
+            # Cada página vem em ordem cronológica; as páginas vão das recentes para as antigas
+            seen = [message["id"] for message in messages] + seen
+            if not next_cursor:
+                break
+            before = ChatService.decode_cursor(next_cursor)
+
+        assert len(seen) == len(set(seen))
+        assert sorted(seen) == sorted(ids)
+
+    def test_cursor_round_trip(self, db, room):
+        created_at = datetime(2026, 1, 10, 12, 0, 0, 123456, tzinfo=fuso_local)
+        message = ChatMessage(id="msg-1", room_id=room.id, sender_id="client", message="oi", created_at=created_at)
+
+        cursor = ChatService.encode_cursor(message)
+
+        assert "=" not in cursor
+        assert ChatService.decode_cursor(cursor) == (created_at, "msg-1")
+
+    @pytest.mark.parametrize("cursor", ["não-é-base64", "bm9wZQ", "WzFd", "WyJvbnRlbSIsICJtc2ctMSJd"])
+    def test_malformed_cursor_is_none(self, cursor):
+        # "bm9wZQ" = nope, "WzFd" = [1], o último = ["ontem", "msg-1"]
+        assert ChatService.decode_cursor(cursor) is None
+
+    @pytest.mark.asyncio
+    async def test_malformed_cursor_is_rejected(self, db, room):
+        client = db.get(User, "client")
+
+        with pytest.raises(HTTPException) as error:
+            await get_room_messages(room.id, limit=50, offset=0, cursor="bm9wZQ", current_user=client, db=db)
+
+        assert error.value.status_code == 400
+
+
+def counters(db, room_id: str) -> tuple:
+    room = db.get(ChatRoom, room_id)
+    db.refresh(room)
+    return room.total_messages, room.unread_client, room.unread_provider
+
+
+class TestRoomCounters:
+    """Contadores alterados por UPDATE atômico e reconciliados a partir das mensagens"""
+
+    def test_increment_counters(self, db, room):
+        service = ChatService(db)
+
+        service.increment_counters(room.id, sender_is_client=True, count=2)
+        service.increment_counters(room.id, sender_is_client=False)
+        db.commit()
+
+        # Mensagens do cliente são não lidas do provider e vice-versa
+        assert counters(db, room.id) == (3, 1, 2)
+
+    def test_reset_unread_only_touches_the_user_side(self, db, room):
+        service = ChatService(db)
+        service.increment_counters(room.id, sender_is_client=True, count=2)
+        service.increment_counters(room.id, sender_is_client=False, count=3)
+        db.commit()
+
+        service.reset_unread("provider", ["outra-sala"])
+        db.commit()
+        assert counters(db, room.id) == (5, 3, 2)
+
+        service.reset_unread("provider", [room.id])
+        db.commit()
+        assert counters(db, room.id) == (5, 3, 0)
+
+        service.reset_unread("client")
+        db.commit()
+        assert counters(db, room.id) == (5, 0, 0)
+
+    def test_reconcile_counters(self, db, room):
+        moment = datetime(2026, 1, 10, 12, 0, tzinfo=fuso_local)
+        add_messages(db, room.id, [moment, moment])
+        db.add(ChatMessage(
+            id="msg-provider", room_id=room.id, sender_id="provider", message="lida",
+            status=MessageStatus.READ, created_at=moment
+        ))
+        db.commit()
+
+        # Contadores divergentes (ex: mensagem entre marcar como lidas e zerar)
+        service = ChatService(db)
+        service.increment_counters(room.id, sender_is_client=False, count=7)
+        db.commit()
+
+        assert service.reconcile_counters() == 1
+        assert counters(db, room.id) == (3, 0, 2)
+
+        # Nada mais a corrigir
+        assert service.reconcile_counters() == 0
+
+
+def make_record(message_id: str, room_id: str) -> dict:
+    return {
+        "id": message_id,
+        "room_id": room_id,
+        "sender_id": "client",
+        "sender_name": "Cliente",
+        "receiver_id": "provider",
+        "message": f"mensagem {message_id}",
+        "message_type": "text",
+        "json_metadata": None,
+        "reply_to_id": None,
+        "created_at": "2026-01-10T12:00:00-03:00"
+    }
+
+
+class TestPersistMessages:
+    """Gravação dos lotes do ChatWriter"""
+
+    @pytest.mark.asyncio
+    async def test_message_for_missing_room_goes_to_dead_letter(self, db, room, tmp_path, monkeypatch):
+        monkeypatch.setattr(chat_writer, "SessionLocal", sessionmaker(autoflush=False, bind=db.get_bind()))
+        writer = ChatWriter(str(tmp_path), persist=persist_messages)
+        await writer.start()
+
+        writer.accept(make_record("m1", room.id))
+        writer.accept(make_record("m2", "sala-apagada"))
+
+        assert await writer.flush()
+        assert await writer.wait_persisted("m1")
+        assert writer.get_pending("m2") is None
+
+        assert [row.id for row in db.query(ChatMessage.id)] == ["m1"]
+        assert counters(db, room.id) == (1, 0, 1)
+
+        dead = DeadLetterJournal(str(tmp_path)).read()
+        assert [entry["record"]["id"] for entry in dead] == ["m2"]
+        assert "sala-apagada" in dead[0]["error"]
+        await writer.stop()
@@ -0,0 +1,155 @@
+"""
+Testes da gravação em lote das mensagens do chat
+Arquivo: tests/test_chat_writer.py
+"""
+
+import glob
+import os
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.service.chat_writer import ChatWriter, DeadLetterJournal
+
+
+def make_record(message_id: str) -> dict:
+    return {
+        "id": message_id,
+        "room_id": "room-1",
+        "sender_id": "user-1",
+        "sender_name": "Ana",
+        "receiver_id": "user-2",
+        "message": f"mensagem {message_id}",
+        "message_type": "text",
+        "json_metadata": None,
+        "reply_to_id": None,
+        "created_at": "2026-01-01T10:00:00-03:00"
+    }
+
+
+class FakeStore:
+    def __init__(self, fail: bool = False, poison: tuple = ()):
+        self.batches = []
+        self.fail = fail
+        # Mensagens que nunca gravam (ex: remetente apagado)
+        self.poison = set(poison)
+
+    def persist(self, records):
+        if self.fail:
+            raise OperationalError("INSERT", {}, Exception("banco indisponível"))
+        if any(record["id"] in self.poison for record in records):
+            raise IntegrityError("INSERT", {}, Exception("violação de chave estrangeira"))
+        self.batches.append([record["id"] for record in records])
+
+
+def journals(directory) -> list:
+    return glob.glob(os.path.join(directory, "*.journal"))
+
+
+class TestChatWriter:
+    """Fila, journal e recuperação"""
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_batch_and_removes_journal(self, tmp_path):
+        store = FakeStore()
+        writer = ChatWriter(str(tmp_path), persist=store.persist)
+        await writer.start()
+
+        assert writer.accept(make_record("m1"))
+        assert writer.accept(make_record("m2"))
+        assert not writer.accept(make_record("m1"))
+        assert writer.get_pending("m2")["sender_name"] == "Ana"
+
+        assert await writer.flush()
+        await writer.wait_persisted("m1")
+
+        assert store.batches == [["m1", "m2"]]
+        assert writer.get_pending("m1") is None
+        assert len(journals(tmp_path)) == 1  # só o journal novo, vazio
+
+        await writer.stop()
+        assert journals(tmp_path) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_retried(self, tmp_path):
+        store = FakeStore(fail=True)
+        writer = ChatWriter(str(tmp_path), persist=store.persist)
+        await writer.start()
+
+        writer.accept(make_record("m1"))
+        assert not await writer.flush()
+        assert writer.get_pending("m1")
+
+        writer.accept(make_record("m2"))
+        store.fail = False
+        assert await writer.flush()
+
+        assert store.batches == [["m1", "m2"]]
+        await writer.stop()
+        assert journals(tmp_path) == []
+
+    @pytest.mark.asyncio
+    async def test_journal_of_crashed_worker_is_recovered(self, tmp_path):
+        crashed = ChatWriter(str(tmp_path), persist=FakeStore().persist)
+        await crashed.start()
+        crashed.accept(make_record("m1"))
+        crashed.accept(make_record("m2"))
+
+        # Worker vivo: o journal dele está travado e não é recuperado
+        store = FakeStore()
+        other = ChatWriter(str(tmp_path), persist=store.persist)
+        assert other.recover() == 0
+
+        # Queda: o processo morre sem gravar e a trava do arquivo é liberada
+        crashed._task.cancel()
+        crashed._segment._file.close()
+
+        assert other.recover() == 2
+        assert store.batches == [["m1", "m2"]]
+        assert journals(tmp_path) == []
+
+    @pytest.mark.asyncio
+    async def test_failing_message_goes_to_dead_letter(self, tmp_path):
+        store = FakeStore(poison=("m2",))
+        writer = ChatWriter(str(tmp_path), persist=store.persist)
+        await writer.start()
+
+        for message_id in ("m1", "m2", "m3"):
+            writer.accept(make_record(message_id))
+
+        # O lote falha por causa de m2: as outras são gravadas uma a uma
+        assert await writer.flush()
+        assert store.batches == [["m1"], ["m3"]]
+        assert await writer.wait_persisted("m1")
+        assert writer.get_pending("m2") is None
+
+        dead = DeadLetterJournal(str(tmp_path)).read()
+        assert [entry["record"]["id"] for entry in dead] == ["m2"]
+        assert "IntegrityError" in dead[0]["error"]
+
+        # A fila não fica travada
+        writer.accept(make_record("m4"))
+        assert await writer.flush()
+        assert store.batches[-1] == ["m4"]
+        await writer.stop()
+        assert journals(tmp_path) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_recovery_keeps_journal(self, tmp_path):
+        crashed = ChatWriter(str(tmp_path), persist=FakeStore().persist)
+        await crashed.start()
+        crashed.accept(make_record("m1"))
+        crashed._task.cancel()
+        crashed._segment._file.close()
+
+        # Banco fora do ar na inicialização: o start não falha e o journal fica
+        store = FakeStore(fail=True)
+        writer = ChatWriter(str(tmp_path), persist=store.persist)
+        await writer.start()
+        assert len(journals(tmp_path)) == 2
+
+        store.fail = False
+        assert writer.recover() == 1
+        assert store.batches == [["m1"]]
+        await writer.stop()
+        assert journals(tmp_path) == []
@@ -0,0 +1,107 @@
+"""
+Testes dos agrupamentos mensais do dashboard
+Arquivo: tests/test_dashboard_analytics.py
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from app.config.settings import fuso_local
+from app.model.bico_certo_main import JobStatus
+from app.service.dashboard_analytics import JobColumns, month_boundaries, _bucket, monthly_series
+
+ETH = 10 ** 18
+CLIENT = "0x" + "11" * 20
+PROVIDER = "0x" + "22" * 20
+
+
+def local_ts(*args) -> int:
+    return int(datetime(*args, tzinfo=fuso_local).timestamp())
+
+
+def make_jobs(*jobs) -> JobColumns:
+    """jobs: tuplas (valor em ETH, status, conclusão em epoch)"""
+    return JobColumns([
+        (f"job-{i}", CLIENT, PROVIDER, str(value * ETH), str(ETH // 10), status.value, "Pintura", 0, 0, completed_at)
+        for i, (value, status, completed_at) in enumerate(jobs)
+    ])
+
+
+class TestMonthBoundaries:
+    """Limites dos meses no fuso local"""
+
+    def test_boundaries_cross_the_year(self):
+        bounds, labels = month_boundaries(3, now=datetime(2026, 2, 15, tzinfo=fuso_local))
+
+        assert labels == ["Dec", "Jan", "Feb"]
+        assert list(bounds) == [
+            local_ts(2025, 12, 1),
+            local_ts(2026, 1, 1),
+            local_ts(2026, 2, 1),
+            local_ts(2026, 3, 1)
+        ]
+
+    def test_december_is_followed_by_january(self):
+        bounds, labels = month_boundaries(1, now=datetime(2025, 12, 31, 23, 59, tzinfo=fuso_local))
+
+        assert labels == ["Dec"]
+        assert list(bounds) == [local_ts(2025, 12, 1), local_ts(2026, 1, 1)]
+
+
+class TestBucket:
+    """Distribuição por intervalo [início, próximo início)"""
+
+    def test_month_edges(self):
+        bounds = np.array([local_ts(2026, 1, 1), local_ts(2026, 2, 1), local_ts(2026, 3, 1)], dtype=np.int64)
+        timestamps = np.array([
+            local_ts(2025, 12, 31, 23, 59, 59),  # antes do primeiro mês: fora
+            local_ts(2026, 1, 1),  # primeiro segundo de janeiro
+            local_ts(2026, 1, 31, 23, 59, 59),  # último segundo de janeiro
+            local_ts(2026, 2, 1),  # primeiro segundo de fevereiro
+            local_ts(2026, 3, 1),  # início do mês seguinte: fora
+        ], dtype=np.int64)
+
+        assert list(_bucket(timestamps, bounds)) == [2, 1]
+
+        weights = np.array([1, 2, 3, 4, 5], dtype=np.int64)
+        assert list(_bucket(timestamps, bounds, weights)) == [5.0, 4.0]
+
+    def test_empty(self):
+        bounds = np.array([local_ts(2026, 1, 1), local_ts(2026, 2, 1)], dtype=np.int64)
+
+        assert list(_bucket(np.array([], dtype=np.int64), bounds)) == [0]
+
+
+class TestMonthlySeries:
+    """Valor dos jobs aprovados por mês de conclusão"""
+
+    def test_january_of_different_years_are_separate(self):
+        jobs = make_jobs(
+            (1, JobStatus.APPROVED, local_ts(2025, 1, 10)),
+            (2, JobStatus.APPROVED, local_ts(2026, 1, 10)),
+            (4, JobStatus.COMPLETED, local_ts(2026, 1, 12)),  # não aprovado: fora
+        )
+
+        series = monthly_series(jobs, include_fee=False, months=13, now=datetime(2026, 1, 20, tzinfo=fuso_local))
+
+        assert len(series) == 13
+        assert series[0] == {"month": "Jan", "value": 1.0}
+        assert series[-1] == {"month": "Jan", "value": 2.0}
+        assert sum(item["value"] for item in series) == 3.0
+
+    def test_month_edges_use_local_timezone(self):
+        jobs = make_jobs(
+            # 23:30 de 31/01 no fuso local já é 01/02 em UTC
+            (1, JobStatus.APPROVED, local_ts(2026, 1, 31, 23, 30)),
+            (2, JobStatus.APPROVED, local_ts(2026, 2, 1, 0, 0)),
+        )
+
+        series = monthly_series(jobs, include_fee=True, months=2, now=datetime(2026, 2, 5, tzinfo=fuso_local))
+
+        assert series == [{"month": "Jan", "value": 1.1}, {"month": "Feb", "value": 2.1}]
+
+    def test_no_jobs(self):
+        series = monthly_series(make_jobs(), include_fee=False, months=2, now=datetime(2026, 2, 5, tzinfo=fuso_local))
+
+        assert series == [{"month": "Jan", "value": 0.0}, {"month": "Feb", "value": 0.0}]
@@ -0,0 +1,161 @@
+"""
+Testes dos agregados dos dashboards
+Arquivo: tests/test_dashboard_stats.py
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config.database import Base
+from app.config.settings import fuso_local
+from app.model.bico_certo_main import JobStatus
+from app.model.dashboard_stats import DashboardStatusCount, DashboardDailyBucket, DashboardCounterparty
+from app.model.job_index import IndexedJob
+from app.service.dashboard_stats import DashboardAggregator, DashboardStats, JobSnapshot
+
+CLIENT = "0x" + "AA" * 20
+PROVIDER = "0x" + "BB" * 20
+OTHER_PROVIDER = "0x" + "CC" * 20
+ZERO_ADDRESS = "0x" + "00" * 20
+ETH = 10 ** 18
+
+
+def local_ts(*args) -> int:
+    return int(datetime(*args, tzinfo=fuso_local).timestamp())
+
+
+def snapshot(status: JobStatus, provider: str = PROVIDER, amount: int = 2, completed_at: int = 0,
+             category: str = "Pintura") -> JobSnapshot:
+    accepted_at = local_ts(2026, 1, 1) if provider != ZERO_ADDRESS else 0
+    return JobSnapshot(
+        client=CLIENT, provider=provider, amount_wei=amount * ETH, platform_fee_wei=amount * ETH // 10,
+        status=status.value, category=category, accepted_at=accepted_at, completed_at=completed_at
+    )
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def aggregates(db) -> dict:
+    """Linhas dos agregados com contagens não nulas (linhas zeradas ficam na tabela)"""
+    db.expire_all()
+    return {
+        "status": sorted(
+            (row.address, row.role, row.status, row.count)
+            for row in db.query(DashboardStatusCount) if row.count
+        ),
+        "buckets": sorted(
+            (row.address, row.role, row.day, row.category, row.completed_count, row.approved_count,
+             row.approved_amount_wei, row.delivery_seconds, row.delivery_count)
+            for row in db.query(DashboardDailyBucket) if row.completed_count
+        ),
+        "counterparties": sorted(
+            (row.address, row.role, row.counterparty, row.jobs, row.approved_jobs)
+            for row in db.query(DashboardCounterparty) if row.jobs
+        ),
+    }
+
+
+def record(db, job_id: str, job: JobSnapshot):
+    """Grava o estado final do job em indexed_jobs, como o JobIndexer"""
+    db.merge(IndexedJob(
+        id=job_id, client=job.client, provider=job.provider, amount_wei=str(job.amount_wei),
+        platform_fee_wei=str(job.platform_fee_wei), status=job.status, service_type=job.category,
+        accepted_at=job.accepted_at, completed_at=job.completed_at
+    ))
+
+
+class TestDashboardAggregator:
+    """Incrementos por transição de estado e rebuild a partir de indexed_jobs"""
+
+    def test_transitions_match_rebuild(self, db):
+        aggregator = DashboardAggregator()
+        completed_at = local_ts(2026, 1, 3, 12)
+
+        # Job aprovado: aberto, aceito, concluído e aprovado
+        history = [
+            snapshot(JobStatus.OPEN, provider=ZERO_ADDRESS),
+            snapshot(JobStatus.ACCEPTED),
+            snapshot(JobStatus.COMPLETED, completed_at=completed_at),
+            snapshot(JobStatus.APPROVED, completed_at=completed_at),
+        ]
+        for old, new in zip([None] + history, history):
+            aggregator.on_job_changed(db, old, new)
+        record(db, "job-1", history[-1])
+
+        # Job cancelado depois de aceito por outro provider
+        accepted = snapshot(JobStatus.ACCEPTED, provider=OTHER_PROVIDER, amount=5, category="Elétrica")
+        cancelled = snapshot(JobStatus.CANCELLED, provider=OTHER_PROVIDER, amount=5, category="Elétrica")
+        aggregator.on_job_changed(db, None, accepted)
+        aggregator.on_job_changed(db, accepted, cancelled)
+        record(db, "job-2", cancelled)
+        db.commit()
+
+        incremental = aggregates(db)
+        assert incremental["status"] == sorted([
+            (CLIENT.lower(), "client", JobStatus.APPROVED.value, 1),
+            (CLIENT.lower(), "client", JobStatus.CANCELLED.value, 1),
+            (PROVIDER.lower(), "provider", JobStatus.APPROVED.value, 1),
+            (OTHER_PROVIDER.lower(), "provider", JobStatus.CANCELLED.value, 1),
+        ])
+        # Cancelado não conta como contraparte
+        assert incremental["counterparties"] == sorted([
+            (CLIENT.lower(), "client", PROVIDER.lower(), 1, 1),
+            (PROVIDER.lower(), "provider", CLIENT.lower(), 1, 1),
+        ])
+
+        aggregator.rebuild(db)
+        assert aggregates(db) == incremental
+        assert aggregator.is_built(db)
+
+    def test_same_state_is_a_no_op(self, db):
+        aggregator = DashboardAggregator()
+        job = snapshot(JobStatus.APPROVED, completed_at=local_ts(2026, 1, 3))
+        aggregator.on_job_changed(db, None, job)
+        db.commit()
+        before = aggregates(db)
+
+        # O mesmo job reindexado sem mudança de estado
+        aggregator.on_job_changed(db, job, job)
+        db.commit()
+
+        assert aggregates(db) == before
+
+
+class TestDashboardStats:
+    """Leitura dos agregados de um endereço"""
+
+    def test_provider_and_client_views(self, db):
+        aggregator = DashboardAggregator()
+        aggregator.on_job_changed(db, None, snapshot(JobStatus.APPROVED, amount=2, completed_at=local_ts(2026, 1, 3)))
+        aggregator.on_job_changed(db, None, snapshot(JobStatus.APPROVED, amount=4, completed_at=local_ts(2026, 2, 5)))
+        aggregator.on_job_changed(db, None, snapshot(JobStatus.IN_PROGRESS, amount=8))
+        db.commit()
+
+        provider = DashboardStats(db, PROVIDER, "provider")
+        assert provider.total_jobs == 3
+        assert provider.count(JobStatus.APPROVED) == 2
+        assert provider.approved_amount() == 6.0
+        assert provider.approved_amount(since="2026-02-01") == 4.0
+        assert provider.approved_count(until="2026-02-01") == 1
+        assert provider.highest_amount() == 4.0
+        assert provider.last_approved_day() == "2026-02-05"
+        assert provider.counterparty_count() == 1
+        # Aceitos em 01/01 e concluídos em 03/01 e 05/02
+        assert provider.average_delivery_days() == pytest.approx((2 + 35) / 2, abs=1 / 24)
+
+        # O cliente paga o valor mais a taxa da plataforma
+        client = DashboardStats(db, CLIENT.lower(), "client")
+        assert client.approved_amount() == pytest.approx(6.6)
+        assert client.by_category("spent") == [{"category": "Pintura", "count": 2, "spent": 6.6}]
@@ -0,0 +1,79 @@
+"""
+Testes do cache de conteúdo do IPFS
+Arquivo: tests/test_ipfs_cache.py
+"""
+
+import os
+
+from app.service.ipfs_cache import ContentCache
+
+CID_A = "QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdA"
+CID_B = "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"
+CID_C = "bafybeigdyrzt5sfp7udm7hu76uh7y26nf3efuylqabf3oclgtqy55fbzdi"
+
+
+class TestMemoryTier:
+    """Testes da camada em memória"""
+
+    def test_get_after_put(self):
+        cache = ContentCache(max_memory_bytes=1024)
+        cache.put(CID_A, b'{"data": {}}')
+
+        assert cache.get(CID_A) == b'{"data": {}}'
+        assert cache.memory_hits == 1
+
+    def test_miss(self):
+        cache = ContentCache(max_memory_bytes=1024)
+
+        assert cache.get(CID_A) is None
+        assert cache.misses == 1
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = ContentCache(max_memory_bytes=10)
+        cache.put(CID_A, b"aaaa")
+        cache.put(CID_B, b"bbbb")
+
+        # Acessar A o torna o mais recente; B deve sair ao inserir C
+        cache.get(CID_A)
+        cache.put(CID_C, b"cccc")
+
+        assert cache.get(CID_B) is None
+        assert cache.get(CID_A) == b"aaaa"
+        assert cache.get(CID_C) == b"cccc"
+        assert cache.stats()["memory_bytes"] == 8
+
+    def test_skips_items_larger_than_limit(self):
+        cache = ContentCache(max_memory_bytes=4)
+        cache.put(CID_A, b"too large")
+
+        assert cache.stats()["memory_entries"] == 0
+
+
+class TestDiskTier:
+    """Testes da camada em disco"""
+
+    def test_survives_new_instance(self, tmp_path):
+        ContentCache(max_memory_bytes=1024, cache_dir=str(tmp_path)).put(CID_A, b"conteudo")
+
+        cache = ContentCache(max_memory_bytes=1024, cache_dir=str(tmp_path))
+
+        assert cache.get(CID_A) == b"conteudo"
+        assert cache.disk_hits == 1
+
+        # A leitura do disco promove a entrada para a memória
+        assert cache.get(CID_A) == b"conteudo"
+        assert cache.memory_hits == 1
+
+    def test_no_temporary_files_left(self, tmp_path):
+        cache = ContentCache(max_memory_bytes=1024, cache_dir=str(tmp_path))
+        cache.put(CID_A, b"conteudo")
+
+        files = [name for _, _, names in os.walk(tmp_path) for name in names]
+        assert files == [CID_A]
+
+    def test_rejects_invalid_cid_path(self, tmp_path):
+        cache = ContentCache(max_memory_bytes=1024, cache_dir=str(tmp_path))
+        cache.put("../escape", b"conteudo")
+
+        assert not (tmp_path.parent / "escape").exists()
+        assert list(tmp_path.iterdir()) == []
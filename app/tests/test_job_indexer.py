@@ -0,0 +1,186 @@
+"""
+Testes do indexador de jobs e propostas
+Arquivo: tests/test_job_indexer.py
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config.database import Base
+from app.config.settings import settings
+from app.model.bico_certo_main import JobStatus, ProposalStatus
+from app.model.dashboard_stats import DashboardStatusCount
+from app.model.job_index import IndexedJob, IndexedProposal, SyncCheckpoint
+from app.service.job_indexer import JobIndexer
+
+CLIENT = "0x" + "11" * 20
+PROVIDER = "0x" + "22" * 20
+ZERO_ADDRESS = "0x" + "00" * 20
+ETH = 10 ** 18
+
+JOB_TOPIC = b"\x01" * 32
+PROPOSAL_TOPIC = b"\x02" * 32
+RATING_TOPIC = b"\x03" * 32
+DISPUTE_TOPIC = b"\x04" * 32
+OTHER_TOPIC = b"\x05" * 32
+
+JOB_ID = b"\xaa" * 32
+PROPOSAL_ID = b"\xbb" * 32
+
+
+def job_data(status: JobStatus, provider: str = ZERO_ADDRESS, total_proposals: int = 0) -> tuple:
+    """Tupla no formato de getJob"""
+    return (
+        JOB_ID, CLIENT, provider, 2 * ETH, ETH // 10, 1_767_000_000, 0, 0, 1_768_000_000,
+        status.value, "Pintura", "QmJob", 0, 0, status == JobStatus.OPEN, total_proposals
+    )
+
+
+def proposal_data(status: ProposalStatus) -> tuple:
+    """Tupla no formato de getProposal"""
+    return PROPOSAL_ID, JOB_ID, PROVIDER, 2 * ETH, 86400, 1_767_000_100, status.value, "QmProposal"
+
+
+class FakeChain:
+    """Logs por bloco e o estado atual dos jobs e propostas"""
+
+    def __init__(self):
+        self.block_number = 0
+        self.logs = []
+        self.jobs = {}
+        self.proposals = {}
+        self.get_logs_calls = []
+        self.w3 = self
+        self.eth = self
+
+    def emit(self, block: int, *topics: bytes):
+        self.logs.append({"blockNumber": block, "topics": list(topics)})
+        self.block_number = max(self.block_number, block)
+
+    def get_logs(self, params: dict) -> list:
+        self.get_logs_calls.append((params["fromBlock"], params["toBlock"]))
+        return [log for log in self.logs if params["fromBlock"] <= log["blockNumber"] <= params["toBlock"]]
+
+    def get_jobs_data(self, job_ids: list) -> list:
+        return [self.jobs[job_id] for job_id in job_ids]
+
+    def get_proposals(self, proposal_ids: list) -> list:
+        return [self.proposals[proposal_id] for proposal_id in proposal_ids]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_INDEXER_START_BLOCK", 1)
+    monkeypatch.setattr(settings, "JOB_INDEXER_BLOCK_RANGE", 2)
+    return FakeChain()
+
+
+@pytest.fixture
+def indexer(chain):
+    indexer = JobIndexer()
+    # Contratos já resolvidos: o _ensure_contracts não consulta o registry
+    indexer._bico_certo = chain
+    indexer._addresses = []
+    indexer._job_topics = {JOB_TOPIC}
+    indexer._proposal_topics = {PROPOSAL_TOPIC}
+    indexer._rating_topics = {RATING_TOPIC}
+    indexer._dispute_topics = {DISPUTE_TOPIC}
+    return indexer
+
+
+def status_counts(db) -> dict:
+    db.expire_all()
+    return {
+        (row.address, row.role, JobStatus(row.status)): row.count
+        for row in db.query(DashboardStatusCount)
+        if row.count
+    }
+
+
+class TestJobIndexer:
+    """Sincronização a partir dos logs, em intervalos de JOB_INDEXER_BLOCK_RANGE blocos"""
+
+    def test_indexes_jobs_and_proposals(self, db, chain, indexer):
+        chain.jobs[JOB_ID] = job_data(JobStatus.OPEN, total_proposals=1)
+        chain.proposals[PROPOSAL_ID] = proposal_data(ProposalStatus.PENDING)
+        chain.emit(1, JOB_TOPIC, JOB_ID)
+        chain.emit(4, PROPOSAL_TOPIC, PROPOSAL_ID, JOB_ID, PROVIDER)
+        chain.emit(5, OTHER_TOPIC, b"\xcc" * 32)
+
+        assert indexer._sync(db) == 3
+
+        # Intervalos de 2 blocos a partir de JOB_INDEXER_START_BLOCK
+        assert chain.get_logs_calls == [(1, 2), (3, 4), (5, 5)]
+        assert db.get(SyncCheckpoint, JobIndexer.CHECKPOINT_NAME).last_block == 5
+
+        job = db.get(IndexedJob, JOB_ID.hex())
+        assert job.status == JobStatus.OPEN.value
+        assert job.client == CLIENT
+        assert job.amount_wei == str(2 * ETH)
+        assert job.total_proposals == 1
+        assert job.open_for_proposals
+        # Atualizado pela proposta no segundo intervalo
+        assert job.last_block == 4
+
+        proposal = db.get(IndexedProposal, PROPOSAL_ID.hex())
+        assert proposal.job_id == JOB_ID.hex()
+        assert proposal.status_name == "PENDING"
+        assert proposal.last_block == 4
+
+        assert status_counts(db) == {(CLIENT.lower(), "client", JobStatus.OPEN): 1}
+
+    def test_nothing_new(self, db, chain, indexer):
+        chain.jobs[JOB_ID] = job_data(JobStatus.OPEN)
+        chain.emit(1, JOB_TOPIC, JOB_ID)
+        indexer._sync(db)
+        chain.get_logs_calls.clear()
+
+        assert indexer._sync(db) == 0
+        assert chain.get_logs_calls == []
+
+    def test_status_transitions_move_the_aggregates(self, db, chain, indexer):
+        chain.jobs[JOB_ID] = job_data(JobStatus.OPEN)
+        chain.emit(1, JOB_TOPIC, JOB_ID)
+        indexer._sync(db)
+
+        # Disputa aberta pelo DisputeResolver: nenhum evento do JobManager
+        chain.jobs[JOB_ID] = job_data(JobStatus.DISPUTED, provider=PROVIDER)
+        chain.emit(3, DISPUTE_TOPIC, JOB_ID, CLIENT)
+        indexer._sync(db)
+
+        assert db.get(IndexedJob, JOB_ID.hex()).status == JobStatus.DISPUTED.value
+        assert status_counts(db) == {
+            (CLIENT.lower(), "client", JobStatus.DISPUTED): 1,
+            (PROVIDER.lower(), "provider", JobStatus.DISPUTED): 1,
+        }
+
+    def test_rerunning_a_range_is_idempotent(self, db, chain, indexer):
+        chain.jobs[JOB_ID] = job_data(JobStatus.OPEN, total_proposals=1)
+        chain.proposals[PROPOSAL_ID] = proposal_data(ProposalStatus.PENDING)
+        chain.emit(1, JOB_TOPIC, JOB_ID)
+        chain.emit(2, PROPOSAL_TOPIC, PROPOSAL_ID, JOB_ID, PROVIDER)
+        chain.emit(3, RATING_TOPIC, JOB_ID, CLIENT)
+        indexer._sync(db)
+        before = status_counts(db)
+
+        # Checkpoint voltado (ex: reindexação manual): os mesmos blocos de novo
+        db.get(SyncCheckpoint, JobIndexer.CHECKPOINT_NAME).last_block = 0
+        db.commit()
+        indexer._sync(db)
+
+        assert db.query(IndexedJob).count() == 1
+        assert db.query(IndexedProposal).count() == 1
+        assert db.get(SyncCheckpoint, JobIndexer.CHECKPOINT_NAME).last_block == 3
+        assert status_counts(db) == before
@@ -0,0 +1,117 @@
+"""
+Testes do alocador de nonces
+Arquivo: tests/test_nonce_manager.py
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from app.wallet.nonce_manager import NonceManager
+
+ADDRESS = "0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1"
+
+
+class FakeEth:
+    def __init__(self, pending_nonce):
+        self.pending_nonce = pending_nonce
+        self.calls = 0
+
+    def get_transaction_count(self, address, block_identifier):
+        self.calls += 1
+        return self.pending_nonce
+
+
+class FakeWeb3:
+    def __init__(self, pending_nonce=0):
+        self.eth = FakeEth(pending_nonce)
+
+
+class TestMemoryNonceManager:
+    """Testes do backend em memória"""
+
+    def test_sequential_without_rpc(self):
+        w3 = FakeWeb3(pending_nonce=5)
+        manager = NonceManager(backend="memory", resync_seconds=60)
+
+        nonces = [manager.allocate(w3, ADDRESS) for _ in range(3)]
+
+        assert nonces == [5, 6, 7]
+        assert w3.eth.calls == 1
+
+    def test_address_case_shares_state(self):
+        w3 = FakeWeb3(pending_nonce=0)
+        manager = NonceManager(backend="memory", resync_seconds=60)
+
+        assert manager.allocate(w3, ADDRESS) == 0
+        assert manager.allocate(w3, ADDRESS.lower()) == 1
+
+    def test_concurrent_allocations_are_unique(self):
+        w3 = FakeWeb3(pending_nonce=0)
+        manager = NonceManager(backend="memory", resync_seconds=60)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            nonces = list(pool.map(lambda _: manager.allocate(w3, ADDRESS), range(50)))
+
+        assert sorted(nonces) == list(range(50))
+
+    def test_released_nonce_is_reused_without_dropping_others(self):
+        w3 = FakeWeb3(pending_nonce=3)
+        manager = NonceManager(backend="memory", resync_seconds=60)
+        first, second, third = (manager.allocate(w3, ADDRESS) for _ in range(3))
+
+        # A assinatura do 4 falhou; 3 e 5 continuam em voo
+        manager.release(ADDRESS, second)
+
+        assert manager.allocate(w3, ADDRESS) == 4
+        assert manager.allocate(w3, ADDRESS) == 6
+        assert w3.eth.calls == 1
+
+    def test_send_error_releases_nonce(self):
+        w3 = FakeWeb3(pending_nonce=0)
+        manager = NonceManager(backend="memory", resync_seconds=60)
+        nonce = manager.allocate(w3, ADDRESS)
+        manager.allocate(w3, ADDRESS)
+
+        manager.on_send_error(ADDRESS, nonce, ValueError("insufficient funds"))
+
+        assert manager.allocate(w3, ADDRESS) == 0
+
+    def test_nonce_too_low_resyncs_from_chain(self):
+        w3 = FakeWeb3(pending_nonce=0)
+        manager = NonceManager(backend="memory", resync_seconds=60)
+        nonce = manager.allocate(w3, ADDRESS)
+
+        # Outra carteira com a mesma chave enviou transações por fora
+        w3.eth.pending_nonce = 7
+        manager.on_send_error(ADDRESS, nonce, ValueError("nonce too low"))
+
+        assert manager.allocate(w3, ADDRESS) == 7
+        assert w3.eth.calls == 2
+
+    def test_busy_address_still_resyncs(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("app.wallet.nonce_manager.time.time", lambda: clock[0])
+
+        w3 = FakeWeb3(pending_nonce=0)
+        manager = NonceManager(backend="memory", resync_seconds=30)
+        for _ in range(10):
+            manager.confirm(ADDRESS, manager.allocate(w3, ADDRESS))
+            clock[0] += 5
+
+        assert w3.eth.calls == 2
+
+    def test_resync_never_goes_below_nonce_in_flight(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("app.wallet.nonce_manager.time.time", lambda: clock[0])
+
+        w3 = FakeWeb3(pending_nonce=0)
+        manager = NonceManager(backend="memory", resync_seconds=30)
+        manager.confirm(ADDRESS, manager.allocate(w3, ADDRESS))
+        in_flight = manager.allocate(w3, ADDRESS)
+
+        # A rede ainda não viu o nonce 1, que está sendo assinado
+        clock[0] += 20
+        w3.eth.pending_nonce = 1
+        manager._backend.mark_stale(manager._key(ADDRESS))
+
+        assert in_flight == 1
+        assert manager.allocate(w3, ADDRESS) == 2
@@ -0,0 +1,190 @@
+"""
+Testes do histórico de transações por endereço
+Arquivo: tests/test_tx_history_indexer.py
+"""
+
+import pytest
+from hexbytes import HexBytes
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config.database import Base
+from app.config.settings import settings
+from app.model.address_transaction import AddressTransaction
+from app.model.job_index import SyncCheckpoint
+from app.service.tx_history_indexer import TxHistoryIndexer
+
+CLIENT = "0x" + "11" * 20
+PROVIDER = "0x" + "22" * 20
+GATEWAY = "0x" + "33" * 20
+ETH = 10 ** 18
+
+PAYOUT_TOPIC = b"\x01" * 32
+
+
+class FakeBatch:
+    def __init__(self):
+        self.results = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def add(self, result):
+        # O fake já resolve a chamada; o batch só junta os resultados
+        self.results.append(result)
+
+    def execute(self) -> list:
+        return self.results
+
+
+class FakeWeb3:
+    """Blocos com as transações completas e os recibos"""
+
+    def __init__(self):
+        self.block_number = 0
+        self.blocks = {}
+        self.receipts = {}
+        self.eth = self
+
+    def add_block(self, number: int, *transactions):
+        """transactions: tuplas (remetente, destinatário, valor, logs do recibo)"""
+        txs = []
+        for index, (sender, recipient, value, logs) in enumerate(transactions):
+            tx_hash = HexBytes(bytes([number, index]) * 16)
+            txs.append({
+                "hash": tx_hash,
+                "from": sender,
+                "to": recipient,
+                "value": value,
+                "transactionIndex": index,
+                "input": b"\x12" if recipient == GATEWAY else b"",
+                "gas": 21000,
+                "gasPrice": 0
+            })
+            self.receipts[tx_hash] = {"gasUsed": 21000, "status": 1, "contractAddress": None, "logs": logs}
+
+        self.blocks[number] = {"number": number, "timestamp": 1_767_000_000 + number, "transactions": txs}
+        self.block_number = max(self.block_number, number)
+
+    def batch_requests(self) -> FakeBatch:
+        return FakeBatch()
+
+    def get_block(self, number: int, full_transactions: bool = False) -> dict:
+        return self.blocks.get(number, {"number": number, "timestamp": 1_767_000_000 + number, "transactions": []})
+
+    def get_transaction_receipt(self, tx_hash) -> dict:
+        return self.receipts[tx_hash]
+
+
+def payout_log(recipient: str, amount: int, log_index: int = 0) -> dict:
+    return {
+        "address": GATEWAY,
+        "topics": [PAYOUT_TOPIC, b"\xaa" * 32, bytes(12) + bytes.fromhex(recipient[2:])],
+        "data": amount.to_bytes(32, "big"),
+        "logIndex": log_index
+    }
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def w3(monkeypatch):
+    monkeypatch.setattr(settings, "TX_HISTORY_START_BLOCK", 1)
+    monkeypatch.setattr(settings, "TX_HISTORY_BLOCK_BATCH", 2)
+
+    w3 = FakeWeb3()
+    w3.add_block(1, (CLIENT, GATEWAY, 2 * ETH, []))
+    w3.add_block(2, (PROVIDER, CLIENT, 0, []))
+    w3.add_block(
+        3,
+        (CLIENT, PROVIDER, ETH, []),
+        # Aprovação: o gateway paga o provider em uma transferência interna
+        (CLIENT, GATEWAY, 0, [payout_log(PROVIDER, 3 * ETH // 2)])
+    )
+    w3.add_block(5, (PROVIDER, CLIENT, 3 * ETH, []))
+    return w3
+
+
+@pytest.fixture
+def indexer(w3):
+    indexer = TxHistoryIndexer()
+    # Gateway já resolvido: o _ensure_gateway não consulta o registry
+    indexer.w3 = w3
+    indexer._gateway_address = GATEWAY
+    indexer._payout_topics = {PAYOUT_TOPIC}
+    return indexer
+
+
+def positions(page: dict) -> list:
+    return [(tx["blockNumber"], tx["type"], tx["is_internal"]) for tx in page["transactions"]]
+
+
+class TestTxHistoryIndexer:
+    """Ingestão dos blocos e paginação por cursor (block_number, tx_index, log_index)"""
+
+    def test_indexes_both_sides_and_internal_transfers(self, db, indexer):
+        assert indexer._sync(db) == 5
+        assert db.get(SyncCheckpoint, TxHistoryIndexer.CHECKPOINT_NAME).last_block == 5
+
+        # Uma linha por lado de cada transação, mais a transferência interna
+        assert db.query(AddressTransaction).count() == 11
+
+        client = indexer.get_history(db, CLIENT, only_value=False)
+        assert positions(client) == [
+            (5, "receive", False), (3, "send", False), (3, "send", False), (2, "receive", False), (1, "send", False)
+        ]
+
+        internal = db.query(AddressTransaction).filter_by(is_internal=True).one()
+        assert internal.address == PROVIDER
+        assert internal.value_wei == str(3 * ETH // 2)
+        assert (internal.block_number, internal.tx_index, internal.log_index) == (3, 1, 0)
+
+    def test_cursor_pagination(self, db, indexer):
+        indexer._sync(db)
+
+        first = indexer.get_history(db, PROVIDER, limit=2)
+        assert positions(first) == [(5, "send", False), (3, "receive", True)]
+        assert first["has_more"]
+
+        second = indexer.get_history(db, PROVIDER, limit=2, before=TxHistoryIndexer.decode_cursor(first["next_cursor"]))
+        # A transação de valor zero do bloco 2 fica de fora (only_value)
+        assert positions(second) == [(3, "receive", False)]
+        assert not second["has_more"]
+        assert second["next_cursor"] is None
+
+    def test_new_blocks_continue_from_checkpoint(self, db, indexer, w3):
+        indexer._sync(db)
+        w3.add_block(6, (CLIENT, PROVIDER, ETH, []))
+
+        assert indexer._sync(db) == 1
+        assert indexer._sync(db) == 0
+        assert positions(indexer.get_history(db, PROVIDER, limit=1)) == [(6, "receive", False)]
+
+    def test_rerunning_a_range_is_idempotent(self, db, indexer):
+        indexer._sync(db)
+        rows = sorted(
+            (row.tx_hash, row.address, row.log_index, row.direction)
+            for row in db.query(AddressTransaction)
+        )
+
+        # Checkpoint voltado (ex: reindexação manual): os mesmos blocos de novo
+        db.get(SyncCheckpoint, TxHistoryIndexer.CHECKPOINT_NAME).last_block = 2
+        db.commit()
+
+        assert indexer._sync(db) == 3
+        assert sorted(
+            (row.tx_hash, row.address, row.log_index, row.direction)
+            for row in db.query(AddressTransaction)
+        ) == rows
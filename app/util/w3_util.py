@@ -1,16 +1,95 @@
-from web3 import Web3
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from requests import Session
+from requests.adapters import HTTPAdapter
+from web3 import Web3, AsyncWeb3
+from typing import Dict, Optional
 import json
 import os
+import threading
+
+from app.config.settings import settings
+
+# Uma instância Web3 por URL do nó, compartilhada por todo o processo
+_web3_instances: Dict[str, Web3] = {}
+_chain_ids: Dict[str, int] = {}
+_web3_lock = threading.Lock()
+
+
+def get_web3(provider_url: Optional[str] = None) -> Web3:
+    """
+    Retorna o Web3 compartilhado para a URL (padrão: settings.WEB3_PROVIDER_URL).
+    As requisições usam uma sessão keep-alive com até WEB3_POOL_SIZE conexões.
+    """
+    url = provider_url or settings.WEB3_PROVIDER_URL
+
+    with _web3_lock:
+        if url not in _web3_instances:
+            session = Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.WEB3_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+
+            _web3_instances[url] = Web3(Web3.HTTPProvider(
+                url,
+                session=session,
+                request_kwargs={"timeout": settings.WEB3_TIMEOUT_SECONDS}
+            ))
+
+        return _web3_instances[url]
+
+
+def get_chain_id(web3: Optional[Web3] = None) -> int:
+    """Chain ID do nó, consultado uma única vez por processo"""
+    web3 = web3 or get_web3()
+    url = web3.provider.endpoint_uri
+
+    if url not in _chain_ids:
+        _chain_ids[url] = web3.eth.chain_id
+    return _chain_ids[url]
+
 
 # Conectar ao Ganache
-w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
+w3 = get_web3()
 
 # Usar a primeira conta do Ganache como default
 w3.eth.default_account = w3.eth.accounts[0]
 
+# Cliente assíncrono para as leituras feitas dentro dos handlers do FastAPI
+async_w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(settings.WEB3_PROVIDER_URL))
+
 # Arquivo onde os endereços serão salvos
 CONTRACTS_FILE = "./deployed_contracts.json"
 
+# ABI mínima do Multicall3 (https://www.multicall3.com), apenas aggregate3
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
 
 def deploy_contract(contract_name, *args):
     print(f"Fazendo deploy de {contract_name}...")
@@ -30,13 +109,49 @@ def deploy_contract(contract_name, *args):
     return w3.eth.contract(address=tx_receipt.contractAddress, abi=abi)
 
 
-def get_instance(contract_name, contract_address):
+def load_abi(contract_name):
     build_path = './build'
-    
+
     with open(os.path.join(build_path, f'{contract_name}_sol_{contract_name}.abi'), 'r') as f:
-        abi = json.load(f)
-    
-    return w3.eth.contract(address=contract_address, abi=abi)
+        return json.load(f)
+
+
+def get_instance(contract_name, contract_address):
+    return w3.eth.contract(address=contract_address, abi=load_abi(contract_name))
+
+
+def get_async_instance(contract_name, contract_address):
+    """Mesmo contrato de get_instance, porém ligado ao AsyncWeb3"""
+    return async_w3.eth.contract(address=contract_address, abi=load_abi(contract_name))
+
+
+def get_multicall():
+    """Retorna o contrato Multicall3 configurado, ou None se não houver um implantado"""
+    if not settings.MULTICALL_ADDRESS:
+        return None
+    return w3.eth.contract(address=Web3.to_checksum_address(settings.MULTICALL_ADDRESS), abi=MULTICALL3_ABI)
+
+
+def get_async_multicall():
+    if not settings.MULTICALL_ADDRESS:
+        return None
+    return async_w3.eth.contract(address=Web3.to_checksum_address(settings.MULTICALL_ADDRESS), abi=MULTICALL3_ABI)
+
+
+async def init_async_w3():
+    """
+    Registra no provider assíncrono uma sessão aiohttp com pool de conexões
+    limitado por WEB3_ASYNC_POOL_SIZE. Deve ser chamado com o event loop rodando.
+    """
+    session = ClientSession(
+        connector=TCPConnector(limit=settings.WEB3_ASYNC_POOL_SIZE),
+        timeout=ClientTimeout(total=settings.WEB3_ASYNC_TIMEOUT_SECONDS)
+    )
+    await async_w3.provider.cache_async_session(session)
+
+
+async def close_async_w3():
+    await async_w3.provider.disconnect()
 
 
 def set_default_account(account_address):
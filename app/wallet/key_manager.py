@@ -1,13 +1,14 @@
 from eth_account import Account
-from web3 import Web3
 from typing import Optional
 
+from ..util.w3_util import get_web3
+
 
 class KeyManager:
     """Gerenciamento de chaves privadas Ethereum"""
 
     def __init__(self):
-        self.w3 = Web3()
+        self.w3 = get_web3()
         Account.enable_unaudited_hdwallet_features()
 
     def import_private_key(self, private_key: str) -> Optional[str]:
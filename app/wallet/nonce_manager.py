@@ -0,0 +1,228 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from web3 import Web3
+
+from ..config.settings import settings
+
+# Chaves de um endereço no Redis (mesmo slot no cluster por causa do {hash tag}):
+#   nonce:{addr}              hash com next (próximo nonce novo) e synced (última leitura da rede)
+#   nonce:{addr}:released     zset de nonces devolvidos, reutilizados antes de um novo
+#   nonce:{addr}:outstanding  zset nonce -> momento da reserva, ainda não enviados
+_TAKE = """
+local synced = redis.call('HGET', KEYS[1], 'synced')
+if not synced or tonumber(ARGV[1]) - tonumber(synced) > tonumber(ARGV[2]) then
+    return -1
+end
+local nonce
+local released = redis.call('ZRANGE', KEYS[2], 0, 0)
+if #released > 0 then
+    nonce = tonumber(released[1])
+    redis.call('ZREM', KEYS[2], released[1])
+else
+    nonce = redis.call('HINCRBY', KEYS[1], 'next', 1) - 1
+end
+redis.call('ZADD', KEYS[3], ARGV[1], nonce)
+for i = 1, 3 do
+    redis.call('EXPIRE', KEYS[i], ARGV[3])
+end
+return nonce
+"""
+
+_RESYNC = """
+local now = tonumber(ARGV[1])
+local chain = tonumber(ARGV[2])
+for _, nonce in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now - tonumber(ARGV[3]))) do
+    redis.call('ZREM', KEYS[3], nonce)
+    if tonumber(nonce) >= chain then
+        redis.call('ZADD', KEYS[2], nonce, nonce)
+    end
+end
+local next = chain
+if redis.call('ZCARD', KEYS[3]) > 0 then
+    next = math.max(tonumber(redis.call('HGET', KEYS[1], 'next') or chain), chain)
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. chain)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], next, '+inf')
+redis.call('HSET', KEYS[1], 'next', next, 'synced', now)
+for i = 1, 3 do
+    redis.call('EXPIRE', KEYS[i], ARGV[4])
+end
+"""
+
+_RELEASE = """
+if redis.call('ZREM', KEYS[3], ARGV[1]) == 1 then
+    local next = tonumber(redis.call('HGET', KEYS[1], 'next') or 0)
+    if tonumber(ARGV[1]) < next then
+        redis.call('ZADD', KEYS[2], ARGV[1], ARGV[1])
+    end
+end
+"""
+
+# Estado de endereços ociosos é descartado depois disso
+_STATE_TTL_SECONDS = 24 * 3600
+
+
+class _AddressState:
+    def __init__(self):
+        self.next = 0
+        self.synced = 0.0
+        self.released = set()
+        self.outstanding: Dict[int, float] = {}
+
+
+class MemoryNonceBackend:
+    """Nonces por endereço em memória (válido com um único worker)"""
+
+    def __init__(self):
+        self._state: Dict[str, _AddressState] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, max_age: int) -> Optional[int]:
+        with self._lock:
+            state = self._state.get(key)
+            now = time.time()
+            if state is None or now - state.synced > max_age:
+                return None
+
+            if state.released:
+                nonce = min(state.released)
+                state.released.discard(nonce)
+            else:
+                nonce = state.next
+                state.next += 1
+            state.outstanding[nonce] = now
+            return nonce
+
+    def resync(self, key: str, chain_nonce: int, abandon_after: int):
+        with self._lock:
+            state = self._state.setdefault(key, _AddressState())
+            now = time.time()
+
+            for nonce, reserved_at in list(state.outstanding.items()):
+                if now - reserved_at > abandon_after:
+                    del state.outstanding[nonce]
+                    if nonce >= chain_nonce:
+                        state.released.add(nonce)
+
+            state.next = max(state.next, chain_nonce) if state.outstanding else chain_nonce
+            state.released = {nonce for nonce in state.released if chain_nonce <= nonce < state.next}
+            state.synced = now
+
+    def release(self, key: str, nonce: int):
+        with self._lock:
+            state = self._state.get(key)
+            if state and state.outstanding.pop(nonce, None) is not None and nonce < state.next:
+                state.released.add(nonce)
+
+    def confirm(self, key: str, nonce: int):
+        with self._lock:
+            state = self._state.get(key)
+            if state:
+                state.outstanding.pop(nonce, None)
+
+    def mark_stale(self, key: str):
+        with self._lock:
+            state = self._state.get(key)
+            if state:
+                state.synced = 0.0
+
+
+class RedisNonceBackend:
+    """Nonces por endereço no Redis, compartilhados entre workers"""
+
+    def __init__(self):
+        from ..config.redis_config import get_redis
+
+        self._redis = get_redis()
+        self._take = self._redis.register_script(_TAKE)
+        self._resync = self._redis.register_script(_RESYNC)
+        self._release = self._redis.register_script(_RELEASE)
+
+    @staticmethod
+    def _keys(key: str):
+        return [key, f"{key}:released", f"{key}:outstanding"]
+
+    def take(self, key: str, max_age: int) -> Optional[int]:
+        nonce = int(self._take(keys=self._keys(key), args=[time.time(), max_age, _STATE_TTL_SECONDS]))
+        return nonce if nonce >= 0 else None
+
+    def resync(self, key: str, chain_nonce: int, abandon_after: int):
+        self._resync(keys=self._keys(key), args=[time.time(), chain_nonce, abandon_after, _STATE_TTL_SECONDS])
+
+    def release(self, key: str, nonce: int):
+        self._release(keys=self._keys(key), args=[nonce])
+
+    def confirm(self, key: str, nonce: int):
+        self._redis.zrem(f"{key}:outstanding", nonce)
+
+    def mark_stale(self, key: str):
+        self._redis.hset(key, "synced", 0)
+
+
+class NonceManager:
+    """
+    Aloca nonces por endereço sem consultar a rede a cada transação.
+
+    Cada nonce reservado fica "em voo" até ser enviado (confirm) ou
+    devolvido (release). Nonces devolvidos são reutilizados antes de um
+    novo, então uma falha entre a reserva e o envio não deixa lacuna nem
+    atrapalha os nonces que outras requisições já reservaram.
+
+    O nonce da rede (get_transaction_count 'pending') é relido a cada
+    NONCE_RESYNC_SECONDS, mesmo com o endereço em uso, e quando o nó
+    responde "nonce too low/high". A releitura nunca recua abaixo de um
+    nonce em voo; reservas esquecidas há mais de NONCE_RESYNC_SECONDS
+    (ex: processo que caiu) são tratadas como devolvidas.
+    """
+
+    def __init__(self, backend: str = None, resync_seconds: int = None):
+        backend = backend or settings.NONCE_BACKEND
+        self.resync_seconds = resync_seconds or settings.NONCE_RESYNC_SECONDS
+        self._backend = RedisNonceBackend() if backend == "redis" else MemoryNonceBackend()
+
+    @staticmethod
+    def _key(address: str) -> str:
+        return f"nonce:{{{address.lower()}}}"
+
+    def allocate(self, w3: Web3, address: str) -> int:
+        """Reserva o próximo nonce do endereço"""
+        key = self._key(address)
+
+        nonce = self._backend.take(key, self.resync_seconds)
+        if nonce is not None:
+            return nonce
+
+        # 'pending' já conta as transações do endereço que estão no mempool
+        chain_nonce = w3.eth.get_transaction_count(Web3.to_checksum_address(address), "pending")
+        self._backend.resync(key, chain_nonce, self.resync_seconds)
+
+        nonce = self._backend.take(key, self.resync_seconds)
+        return nonce if nonce is not None else chain_nonce
+
+    def release(self, address: str, nonce: int):
+        """O nonce não chegou ao mempool (falha ao montar, assinar ou enviar): volta para reuso"""
+        self._backend.release(self._key(address), nonce)
+
+    def confirm(self, address: str, nonce: int):
+        """O nó aceitou a transação com este nonce"""
+        self._backend.confirm(self._key(address), nonce)
+
+    def on_send_error(self, address: str, nonce: int, error: Exception):
+        """Trata a falha no envio de uma transação com nonce reservado"""
+        message = str(error).lower()
+
+        if "nonce too low" in message or "already known" in message:
+            # A rede já usou este nonce: não reaproveitar e reler na próxima alocação
+            self.confirm(address, nonce)
+            self._backend.mark_stale(self._key(address))
+        elif "nonce too high" in message:
+            self.release(address, nonce)
+            self._backend.mark_stale(self._key(address))
+        else:
+            self.release(address, nonce)
+
+
+# Instância global
+nonce_manager = NonceManager()
@@ -1,18 +1,16 @@
-from web3 import Web3
 from eth_account import Account
 from typing import Dict, Any, Optional, Tuple
 from ..config.settings import settings
+from ..util.w3_util import get_web3, get_chain_id
+from .nonce_manager import nonce_manager
 
 
 class TransactionSigner:
     """Assinatura e envio de transações com gas adequado"""
 
     def __init__(self, web3_provider_url: str = None):
-        if web3_provider_url:
-            self.w3 = Web3(Web3.HTTPProvider(web3_provider_url))
-        else:
-            # Default para rede local
-            self.w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
+        # Provider compartilhado (default: settings.WEB3_PROVIDER_URL)
+        self.w3 = get_web3(web3_provider_url)
 
         # Configuração para rede privada
         self.is_private_network = settings.NETWORK_TYPE == "private"
@@ -38,7 +36,7 @@ class TransactionSigner:
                 gas_limit = 100000
 
         if nonce is None:
-            nonce = self.w3.eth.get_transaction_count(from_address)
+            nonce = nonce_manager.allocate(self.w3, from_address)
 
         # Montar transação
         transaction = {
@@ -49,7 +47,7 @@ class TransactionSigner:
             'gasPrice': 0,
             'nonce': nonce,
             'data': data,
-            'chainId': self.w3.eth.chain_id
+            'chainId': get_chain_id(self.w3)
         }
 
         return transaction
@@ -75,10 +73,7 @@ class TransactionSigner:
                 data=data
             )
 
-            account = Account.from_key(private_key)
-            signed_tx = account.sign_transaction(transaction)
-
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            tx_hash = self.sign_and_send(private_key, transaction)
             tx_hash_hex = tx_hash.hex()
 
             return True, "Transação enviada com sucesso", tx_hash_hex
@@ -97,6 +92,34 @@ class TransactionSigner:
         except Exception as e:
             return False, f"Erro: {str(e)}", None
 
+    def sign_and_send(self, private_key: str, transaction: Dict[str, Any]):
+        """
+        Assina e envia uma transação montada com nonce reservado. Se a
+        assinatura falhar, o nonce volta para reuso
+        """
+        try:
+            signed_tx = Account.from_key(private_key).sign_transaction(transaction)
+        except Exception:
+            nonce_manager.release(transaction['from'], transaction['nonce'])
+            raise
+
+        return self.send_signed_transaction(signed_tx, transaction)
+
+    def send_signed_transaction(self, signed_tx, transaction: Dict[str, Any]):
+        """
+        Envia a transação assinada e informa o resultado ao nonce_manager:
+        aceita, o nonce sai de "em voo"; recusada, volta para reuso (ou o
+        endereço é relido da rede, se o erro for de nonce)
+        """
+        try:
+            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception as e:
+            nonce_manager.on_send_error(transaction['from'], transaction['nonce'], e)
+            raise
+
+        nonce_manager.confirm(transaction['from'], transaction['nonce'])
+        return tx_hash
+
     def get_balance(self, address: str) -> float:
         """
         Retorna saldo em ETH
@@ -0,0 +1,142 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from ..config.settings import settings
+
+# Recebe o envelope serializado publicado por qualquer worker
+OnMessage = Callable[[str], Awaitable[None]]
+
+
+class MemoryHub:
+    """
+    Barramento em memória. Cada backend ligado ao mesmo hub recebe tudo o que
+    os outros publicam; nos testes, um hub compartilhado simula vários workers.
+    """
+
+    def __init__(self):
+        self.subscribers: List[OnMessage] = []
+
+
+class MemoryBroadcastBackend:
+    """Entrega só dentro do processo (desenvolvimento, um único worker)"""
+
+    def __init__(self, hub: Optional[MemoryHub] = None):
+        self._hub = hub or MemoryHub()
+        self._on_message: Optional[OnMessage] = None
+
+    async def start(self, on_message: OnMessage):
+        self._on_message = on_message
+        self._hub.subscribers.append(on_message)
+
+    async def stop(self):
+        if self._on_message in self._hub.subscribers:
+            self._hub.subscribers.remove(self._on_message)
+        self._on_message = None
+
+    async def publish(self, data: str):
+        for on_message in list(self._hub.subscribers):
+            await on_message(data)
+
+
+class RedisBroadcastBackend:
+    """Pub/sub do Redis: todos os workers (e nós) assinam o mesmo canal"""
+
+    def __init__(self, channel: str):
+        from ..config.redis_config import get_async_redis
+
+        self._redis = get_async_redis()
+        self._channel = channel
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, on_message: OnMessage):
+        self._pubsub = self._redis.pubsub()
+        await self._pubsub.subscribe(self._channel)
+        self._task = asyncio.create_task(self._listen(on_message))
+
+    async def _listen(self, on_message: OnMessage):
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] == "message":
+                        await on_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # O PubSub reconecta e reassina o canal na próxima leitura
+                print(f"[Broadcast] Erro na assinatura do Redis: {e}")
+                await asyncio.sleep(1)
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._pubsub:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def publish(self, data: str):
+        await self._redis.publish(self._channel, data)
+
+
+class Broadcaster:
+    """
+    Distribui os eventos de websocket entre os workers.
+
+    Quem envia não escreve direto nos sockets: publica um envelope
+    (kind, target, message) e todo worker, inclusive o de origem, entrega às
+    conexões que ele mesmo mantém, pelo handler registrado para aquele kind
+    ("room" para as salas de chat, "user" para as notificações).
+    """
+
+    CHANNEL = "ws:broadcast"
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = (
+                RedisBroadcastBackend(self.CHANNEL)
+                if settings.BROADCAST_BACKEND == "redis"
+                else MemoryBroadcastBackend()
+            )
+        self._backend = backend
+        self._handlers: Dict[str, Callable[..., Awaitable[None]]] = {}
+        self._started = False
+
+    def register(self, kind: str, handler: Callable[..., Awaitable[None]]):
+        """handler(target, message, **options) entrega às conexões locais"""
+        self._handlers[kind] = handler
+
+    async def start(self):
+        if self._started:
+            return
+        self._started = True
+        await self._backend.start(self._dispatch)
+
+    async def stop(self):
+        if self._started:
+            self._started = False
+            await self._backend.stop()
+
+    async def publish(self, kind: str, target: str, message: dict, **options):
+        # Sem o startup (ex: scripts), assina na primeira publicação
+        await self.start()
+        await self._backend.publish(json.dumps({
+            "kind": kind,
+            "target": target,
+            "message": message,
+            "options": options
+        }, default=str))
+
+    async def _dispatch(self, data: str):
+        try:
+            envelope = json.loads(data)
+            handler = self._handlers.get(envelope["kind"])
+            if handler:
+                await handler(envelope["target"], envelope["message"], **envelope.get("options", {}))
+        except Exception as e:
+            print(f"[Broadcast] Erro ao entregar evento: {e}")
+
+
+# Instância global
+broadcaster = Broadcaster()
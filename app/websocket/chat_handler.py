@@ -2,19 +2,28 @@ from fastapi import WebSocket, WebSocketDisconnect, Depends, Query
 from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 from ..config.database import get_db, SessionLocal
-from ..model.chat_model import ChatMessage
+from ..model.chat_model import ChatMessage, ChatRoom
 from ..service.chat_service import ChatService
+from ..service.chat_writer import chat_writer
 from ..auth.jwt_handler import decode_token
 from ..model.user import User
+import asyncio
 import json
+import uuid
 from datetime import datetime
+from ..config.settings import fuso_local, settings
 from ..websocket.notifications_handler import notifications_manager
+from ..websocket.broadcast import broadcaster
+from ..websocket.outbound import OutboundConnection
+from ..websocket.presence import PresenceRegistry, RedisPresence
 
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[str, List[Dict]] = {}
-        self.user_connections: Dict[str, WebSocket] = {}
+        # Sockets deste worker por sala e por usuário; um usuário pode ter vários dispositivos
+        self.presence = PresenceRegistry()
+        # Com vários workers, quem está na sala vem do Redis (conexões de todos eles)
+        self.shared = RedisPresence() if settings.BROADCAST_BACKEND == "redis" else None
 
     async def connect(
             self,
@@ -22,43 +31,37 @@ class ConnectionManager:
             room_id: str,
             user_id: str,
             user_name: str
-    ):
+    ) -> OutboundConnection:
         await websocket.accept()
 
-        if room_id not in self.active_connections:
-            self.active_connections[room_id] = []
-
-        self.active_connections[room_id].append({
-            "websocket": websocket,
-            "user_id": user_id,
-            "user_name": user_name
-        })
-
-        self.user_connections[user_id] = websocket
-
-        await self.broadcast_to_room(
-            room_id,
-            {
-                "type": "user_joined",
-                "user_id": user_id,
-                "user_name": user_name,
-                "timestamp": datetime.now().isoformat()
-            },
-            exclude_user=user_id
-        )
-
-    def disconnect(self, room_id: str, user_id: str):
-        if room_id in self.active_connections:
-            self.active_connections[room_id] = [
-                conn for conn in self.active_connections[room_id]
-                if conn["user_id"] != user_id
-            ]
-
-            if not self.active_connections[room_id]:
-                del self.active_connections[room_id]
-
-        if user_id in self.user_connections:
-            del self.user_connections[user_id]
+        # Tudo o que vai para este socket passa pela fila dele
+        outbound = OutboundConnection(websocket)
+
+        first_device = self.presence.add(room_id, user_id, user_name, outbound)
+        if self.shared:
+            first_device = await self.shared.add(room_id, user_id, user_name, outbound)
+
+        if first_device:
+            await self.broadcast_to_room(
+                room_id,
+                {
+                    "type": "user_joined",
+                    "user_id": user_id,
+                    "user_name": user_name,
+                    "timestamp": datetime.now().isoformat()
+                },
+                exclude_user=user_id
+            )
+
+        return outbound
+
+    async def disconnect(self, room_id: str, user_id: str, outbound: OutboundConnection) -> bool:
+        """Remove só este socket. Retorna True se o usuário saiu da sala (último dispositivo)"""
+        outbound.close()
+        left = self.presence.remove(room_id, user_id, outbound)
+        if self.shared:
+            left = await self.shared.remove(room_id, user_id, outbound)
+        return left
 
     async def broadcast_to_room(
             self,
@@ -66,37 +69,55 @@ class ConnectionManager:
             message: dict,
             exclude_user: Optional[str] = None
     ):
-        if room_id in self.active_connections:
-            for connection in self.active_connections[room_id]:
-                if exclude_user and connection["user_id"] == exclude_user:
-                    continue
+        """Envia aos participantes da sala conectados em qualquer worker"""
+        await broadcaster.publish("room", room_id, message, exclude_user=exclude_user)
 
-                try:
-                    await connection["websocket"].send_json(message)
-                except:
-                    pass
+    async def _deliver_to_room(
+            self,
+            room_id: str,
+            message: dict,
+            exclude_user: Optional[str] = None
+    ):
+        """
+        Enfileira para as conexões da sala mantidas por este worker, sem
+        aguardar a rede de nenhuma delas. Uma conexão fechada por erro de
+        envio ou consumidor lento continua registrada até a limpeza do
+        endpoint, que é quem avisa a saída (user_left)
+        """
+        for user_id, outbound in self.presence.room_connections(room_id):
+            if exclude_user and user_id == exclude_user:
+                continue
+            outbound.send(message)
 
     async def send_to_user(self, user_id: str, message: dict):
-        if user_id in self.user_connections:
-            try:
-                await self.user_connections[user_id].send_json(message)
-            except:
-                pass
+        """Envia a todos os dispositivos do usuário, em qualquer sala"""
+        for outbound in self.presence.user_connections(user_id):
+            outbound.send(message)
 
-    def get_room_users(self, room_id: str) -> List[Dict]:
-        if room_id not in self.active_connections:
-            return []
+    async def is_user_in_room(self, room_id: str, user_id: str) -> bool:
+        if self.shared:
+            return await self.shared.is_in_room(room_id, user_id)
+        return self.presence.is_in_room(room_id, user_id)
 
-        return [
-            {
-                "user_id": conn["user_id"],
-                "user_name": conn["user_name"]
-            }
-            for conn in self.active_connections[room_id]
-        ]
+    async def get_room_users(self, room_id: str) -> List[Dict]:
+        """Usuários conectados à sala em qualquer worker, com o número de dispositivos"""
+        if self.shared:
+            return await self.shared.online_users(room_id)
+        return self.presence.online_users(room_id)
 
 
 manager = ConnectionManager()
+broadcaster.register("room", manager._deliver_to_room)
+
+
+async def run_presence_heartbeat():
+    """Loop em background que renova a presença das conexões deste worker no Redis"""
+    while True:
+        await asyncio.sleep(settings.PRESENCE_HEARTBEAT_SECONDS)
+        try:
+            await manager.shared.heartbeat()
+        except Exception as e:
+            print(f"[Chat] Erro ao renovar presença: {e}")
 
 
 async def get_current_user_ws(
@@ -115,6 +136,108 @@ async def get_current_user_ws(
     return user
 
 
+async def accept_message(
+        outbound: OutboundConnection,
+        room_id: str,
+        participants,
+        user: User,
+        message_data: dict
+):
+    """
+    Caminho write-behind: confirma ao remetente (message_ack) e distribui a
+    mensagem sem esperar o banco; o chat_writer grava em lote. O id vem do
+    cliente (client_message_id), então um reenvio não duplica a mensagem
+    """
+    message_id = str(message_data.get("client_message_id") or uuid.uuid4())
+    try:
+        uuid.UUID(message_id)
+    except ValueError:
+        outbound.send({"type": "error", "message": "client_message_id inválido"})
+        return
+
+    # Reenvio (inclusive depois da gravação ou por outro worker): só confirma de novo
+    existing = await chat_writer.find_existing(message_id) if message_data.get("client_message_id") else None
+    if existing:
+        if existing["room_id"] != room_id or existing["sender_id"] != user.id:
+            outbound.send({"type": "error", "message": "client_message_id já usado por outra mensagem"})
+            return
+        outbound.send({
+            "type": "message_ack",
+            "client_message_id": message_id,
+            "status": "accepted"
+        })
+        return
+
+    reply_to_data = None
+    reply_to_id = message_data.get("reply_to_id")
+    if reply_to_id:
+        reply_to_data = await chat_writer.find_reply(room_id, reply_to_id)
+        if not reply_to_data:
+            outbound.send({"type": "error", "message": "Mensagem de resposta não encontrada"})
+            return
+
+    receiver_id = participants.provider_id if user.id == participants.client_id else participants.client_id
+    json_metadata = message_data.get("json_metadata")
+    created_at = datetime.now(fuso_local)
+
+    chat_writer.accept({
+        "id": message_id,
+        "room_id": room_id,
+        "sender_id": user.id,
+        "sender_name": user.full_name,
+        "receiver_id": receiver_id,
+        "message": message_data["message"],
+        "message_type": message_data.get("message_type", "text"),
+        "json_metadata": json.dumps(json_metadata) if json_metadata else None,
+        "reply_to_id": reply_to_id,
+        "created_at": created_at.isoformat()
+    })
+
+    outbound.send({
+        "type": "message_ack",
+        "client_message_id": message_id,
+        "status": "accepted"
+    })
+
+    await manager.broadcast_to_room(room_id, {
+        "type": "new_message",
+        "message": {
+            "id": message_id,
+            "sender": {
+                "id": user.id,
+                "name": user.full_name
+            },
+            "message": message_data["message"],
+            "message_type": message_data.get("message_type", "text"),
+            "json_metadata": json_metadata,
+            "created_at": created_at.strftime('%d/%m/%Y às %H:%M'),
+            "status": "sent",
+            "reply_to": reply_to_data
+        }
+    })
+
+    if receiver_id and not await manager.is_user_in_room(room_id, receiver_id):
+        asyncio.create_task(notify_receiver_when_persisted(room_id, receiver_id, message_id))
+
+
+async def notify_receiver_when_persisted(room_id: str, receiver_id: str, message_id: str):
+    """room_update só depois da gravação, para o resumo da sala já trazer a mensagem"""
+    if not await chat_writer.wait_persisted(message_id):
+        return
+
+    db = SessionLocal()
+    try:
+        room_data = ChatService(db).get_room_data_for_notification(room_id, receiver_id)
+    finally:
+        db.close()
+
+    if room_data:
+        await notifications_manager.send_to_user(receiver_id, {
+            "type": "room_update",
+            "data": room_data
+        })
+
+
 async def websocket_chat_endpoint(
         websocket: WebSocket,
         room_id: str,
@@ -128,24 +251,28 @@ async def websocket_chat_endpoint(
         return
 
     chat_service = ChatService(db)
-    rooms = chat_service.get_user_rooms(user.id)
 
-    if room_id not in [r["room_id"] for r in rooms]:
+    if not chat_service.is_room_member(room_id, user.id):
         if not getattr(user, 'is_admin', False):
             await websocket.close(code=4003, reason="Access Denied")
             db.close()
             return
 
-    await manager.connect(websocket, room_id, user.id, user.full_name)
+    # Com o write-behind, as mensagens não consultam a sala: os participantes vêm daqui
+    participants = None
+    if chat_writer.enabled:
+        participants = db.query(ChatRoom.client_id, ChatRoom.provider_id).filter(ChatRoom.id == room_id).first()
+
+    outbound = await manager.connect(websocket, room_id, user.id, user.full_name)
 
     db.close()
 
     try:
-        await websocket.send_json({
+        outbound.send({
             "type": "welcome",
             "room_id": room_id,
             "user_id": user.id,
-            "online_users": manager.get_room_users(room_id)
+            "online_users": await manager.get_room_users(room_id)
         })
 
         db_temp = SessionLocal()
@@ -153,7 +280,7 @@ async def websocket_chat_endpoint(
             temp_service = ChatService(db_temp)
             unread_messages = temp_service.get_unread_messages_status(room_id, user.id)
             if unread_messages:
-                await websocket.send_json({
+                outbound.send({
                     "type": "unread_status",
                     "messages": unread_messages
                 })
@@ -175,11 +302,15 @@ async def websocket_chat_endpoint(
             data = await websocket.receive_text()
 
             if data == "ping":
-                await websocket.send_json({"type": "pong"})
+                outbound.send({"type": "pong"})
                 continue
 
             message_data = json.loads(data)
 
+            if message_data["type"] == "message" and participants:
+                await accept_message(outbound, room_id, participants, user, message_data)
+                continue
+
             db_operation = SessionLocal()
             try:
                 chat_service = ChatService(db_operation)
@@ -232,12 +363,7 @@ async def websocket_chat_endpoint(
                         })
 
                         if receiver_id:
-                            is_receiver_in_room = any(
-                                conn["user_id"] == receiver_id
-                                for conn in manager.active_connections.get(room_id, [])
-                            )
-
-                            if not is_receiver_in_room:
+                            if not await manager.is_user_in_room(room_id, receiver_id):
                                 room_data = chat_service.get_room_data_for_notification(room_id, receiver_id)
                                 if room_data:
                                     await notifications_manager.send_to_user(receiver_id, {
@@ -245,7 +371,7 @@ async def websocket_chat_endpoint(
                                         "data": room_data
                                     })
                     else:
-                        await websocket.send_json({
+                        outbound.send({
                             "type": "error",
                             "message": msg
                         })
@@ -279,13 +405,19 @@ async def websocket_chat_endpoint(
                 db_operation.close()
 
     except WebSocketDisconnect:
-        manager.disconnect(room_id, user.id)
+        await leave_room(room_id, user, outbound)
+
+    except Exception as e:
+        print(f"[Chat] Erro na conexão de {user.id} na sala {room_id}: {e}")
+        await leave_room(room_id, user, outbound)
+
+
+async def leave_room(room_id: str, user: User, outbound: OutboundConnection):
+    """Fecha o socket e avisa a sala se era o último dispositivo do usuário"""
+    if await manager.disconnect(room_id, user.id, outbound):
         await manager.broadcast_to_room(room_id, {
             "type": "user_left",
             "user_id": user.id,
             "user_name": user.full_name,
             "timestamp": datetime.now().isoformat()
         })
-
-    except Exception as e:
-        manager.disconnect(room_id, user.id)
\ No newline at end of file
@@ -1,28 +1,35 @@
 from fastapi import WebSocket
-from typing import Dict, Set
+from typing import Dict
 import logging
 
+from .broadcast import broadcaster
+from .outbound import OutboundConnection
+
 logger = logging.getLogger(__name__)
 
 
 class NotificationsManager:
     def __init__(self):
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+        self.active_connections: Dict[str, Dict[WebSocket, OutboundConnection]] = {}
 
-    async def connect(self, user_id: str, websocket: WebSocket):
+    async def connect(self, user_id: str, websocket: WebSocket) -> OutboundConnection:
         """Conecta um usuário ao sistema de notificações"""
 
         await websocket.accept()
 
         if user_id not in self.active_connections:
-            self.active_connections[user_id] = set()
+            self.active_connections[user_id] = {}
 
-        self.active_connections[user_id].add(websocket)
+        outbound = OutboundConnection(websocket)
+        self.active_connections[user_id][websocket] = outbound
+        return outbound
 
     def disconnect(self, user_id: str, websocket: WebSocket):
         """Desconecta um usuário"""
         if user_id in self.active_connections:
-            self.active_connections[user_id].discard(websocket)
+            outbound = self.active_connections[user_id].pop(websocket, None)
+            if outbound:
+                outbound.close()
 
             if not self.active_connections[user_id]:
                 del self.active_connections[user_id]
@@ -30,23 +37,25 @@ class NotificationsManager:
             logger.info(f"User {user_id} disconnected from notifications")
 
     async def send_to_user(self, user_id: str, message: dict):
-        """Envia mensagem para todas as conexões de um usuário"""
-        if user_id not in self.active_connections:
-            return
+        """Envia mensagem para todas as conexões do usuário, em qualquer worker"""
+        await broadcaster.publish("user", user_id, message)
 
-        disconnected = set()
+    async def _deliver_to_user(self, user_id: str, message: dict):
+        """Enfileira para as conexões do usuário mantidas por este worker"""
+        connections = self.active_connections.get(user_id)
+        if not connections:
+            return
 
-        for connection in self.active_connections[user_id]:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending to user {user_id}: {e}")
-                disconnected.add(connection)
+        # Remove conexões fechadas (erro de envio ou consumidor lento)
+        for websocket, outbound in list(connections.items()):
+            if not outbound.send(message):
+                logger.warning(f"Dropping notifications connection of user {user_id}")
+                del connections[websocket]
 
-        # Remove conexões mortas
-        for conn in disconnected:
-            self.active_connections[user_id].discard(conn)
+        if not connections:
+            del self.active_connections[user_id]
 
 
 # Instância global
 notifications_manager = NotificationsManager()
+broadcaster.register("user", notifications_manager._deliver_to_user)
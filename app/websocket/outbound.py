@@ -0,0 +1,130 @@
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from fastapi import WebSocket
+
+from ..config.settings import settings
+
+# Código de fechamento para consumidor lento ("try again later")
+CLOSE_SLOW_CONSUMER = 1013
+
+
+class OutboundMetrics:
+    """Contadores das filas de saída dos websockets (expostos em /health)"""
+
+    def __init__(self):
+        self.connections: Set["OutboundConnection"] = set()
+        self.sent = 0
+        self.dropped = 0
+        self.slow_disconnects = 0
+        self.send_errors = 0
+
+    def stats(self) -> Dict[str, Any]:
+        depths = [connection.queue.qsize() for connection in self.connections]
+        return {
+            "connections": len(depths),
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "slow_disconnects": self.slow_disconnects,
+            "send_errors": self.send_errors
+        }
+
+
+# Instância global
+outbound_metrics = OutboundMetrics()
+
+
+class OutboundConnection:
+    """
+    Fila de saída limitada de um websocket, drenada por uma task própria.
+
+    send() só enfileira, então um broadcast nunca espera a rede de um
+    participante. Com a fila cheia vale WS_SLOW_CONSUMER_POLICY:
+    "drop_oldest" descarta a mensagem mais antiga da fila e "disconnect"
+    fecha a conexão. Erro ou timeout de envio também fecham a conexão; o
+    loop de recepção do endpoint então termina e faz a limpeza.
+    """
+
+    def __init__(
+            self,
+            websocket: WebSocket,
+            max_size: Optional[int] = None,
+            policy: Optional[str] = None,
+            send_timeout: Optional[float] = None,
+            metrics: OutboundMetrics = outbound_metrics
+    ):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size or settings.WS_SEND_QUEUE_SIZE)
+        self.policy = policy or settings.WS_SLOW_CONSUMER_POLICY
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT_SECONDS
+        self.closed = False
+
+        self._metrics = metrics
+        self._metrics.connections.add(self)
+        self._task = asyncio.create_task(self._writer())
+
+    def send(self, message: dict) -> bool:
+        """Enfileira sem aguardar o envio. Retorna False se a conexão foi (ou está) fechada"""
+        if self.closed:
+            return False
+
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.policy == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.queue.put_nowait(message)
+            self._metrics.dropped += 1
+            return True
+
+        self._metrics.slow_disconnects += 1
+        self.close(CLOSE_SLOW_CONSUMER, "Slow consumer")
+        return False
+
+    async def flush(self):
+        """Aguarda o envio de tudo o que já foi enfileirado"""
+        await self.queue.join()
+
+    async def _writer(self):
+        try:
+            while True:
+                message = await self.queue.get()
+                try:
+                    await asyncio.wait_for(self.websocket.send_json(message), self.send_timeout)
+                    self._metrics.sent += 1
+                finally:
+                    self.queue.task_done()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"[Websocket] Erro ao enviar, fechando conexão: {e}")
+            self._metrics.send_errors += 1
+            self.close(reason="Send failed")
+
+    def close(self, code: int = 1000, reason: str = ""):
+        if self.closed:
+            return
+
+        self.closed = True
+        self._metrics.connections.discard(self)
+
+        # Libera quem estiver aguardando flush()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.queue.task_done()
+
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+        asyncio.create_task(self._close_socket(code, reason))
+
+    async def _close_socket(self, code: int, reason: str):
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
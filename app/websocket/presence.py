@@ -0,0 +1,208 @@
+import time
+import uuid
+from typing import Dict, Iterator, List, Set, Tuple
+
+from ..config.settings import settings
+from .outbound import OutboundConnection
+
+# Dispositivos de uma sala no Redis (mesmo slot no cluster por causa do {hash tag}):
+#   presence:{room}        zset "usuário|dispositivo" -> momento em que expira sem heartbeat
+#   presence:{room}:names  hash usuário -> nome
+_JOIN = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+local prefix = ARGV[3] .. '|'
+local first = 1
+for _, member in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    if string.sub(member, 1, #prefix) == prefix then
+        first = 0
+        break
+    end
+end
+redis.call('ZADD', KEYS[1], ARGV[2], prefix .. ARGV[4])
+redis.call('HSET', KEYS[2], ARGV[3], ARGV[5])
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+redis.call('EXPIRE', KEYS[2], ARGV[6])
+return first
+"""
+
+_LEAVE = """
+redis.call('ZREM', KEYS[1], ARGV[2] .. '|' .. ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+local prefix = ARGV[2] .. '|'
+for _, member in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    if string.sub(member, 1, #prefix) == prefix then
+        return 0
+    end
+end
+redis.call('HDEL', KEYS[2], ARGV[2])
+return 1
+"""
+
+
+class PresenceRegistry:
+    """
+    Conexões de chat indexadas por sala e por usuário.
+
+    Cada usuário pode ter vários sockets (um por dispositivo) na mesma sala.
+    Verificar se alguém está na sala é uma consulta de dicionário; a saída
+    só acontece quando o último dispositivo do usuário se desconecta.
+    """
+
+    def __init__(self):
+        # sala -> usuário -> conexões
+        self._rooms: Dict[str, Dict[str, Set[OutboundConnection]]] = {}
+        # usuário -> salas em que está conectado
+        self._users: Dict[str, Set[str]] = {}
+        self._names: Dict[str, str] = {}
+
+    def add(self, room_id: str, user_id: str, user_name: str, connection: OutboundConnection) -> bool:
+        """Registra a conexão. Retorna True se é o primeiro dispositivo do usuário na sala"""
+        members = self._rooms.setdefault(room_id, {})
+        first = user_id not in members
+
+        members.setdefault(user_id, set()).add(connection)
+        self._users.setdefault(user_id, set()).add(room_id)
+        self._names[user_id] = user_name
+        return first
+
+    def remove(self, room_id: str, user_id: str, connection: OutboundConnection) -> bool:
+        """Remove a conexão. Retorna True se o usuário não tem mais dispositivos na sala"""
+        members = self._rooms.get(room_id)
+        if not members or user_id not in members:
+            return False
+
+        members[user_id].discard(connection)
+        if members[user_id]:
+            return False
+
+        del members[user_id]
+        if not members:
+            del self._rooms[room_id]
+
+        rooms = self._users.get(user_id)
+        if rooms is not None:
+            rooms.discard(room_id)
+            if not rooms:
+                del self._users[user_id]
+                self._names.pop(user_id, None)
+        return True
+
+    def is_in_room(self, room_id: str, user_id: str) -> bool:
+        return user_id in self._rooms.get(room_id, {})
+
+    def is_online(self, user_id: str) -> bool:
+        return user_id in self._users
+
+    def rooms_of(self, user_id: str) -> Set[str]:
+        return self._users.get(user_id, set())
+
+    def room_connections(self, room_id: str) -> Iterator[Tuple[str, OutboundConnection]]:
+        """(user_id, conexão) de todos os dispositivos conectados à sala"""
+        for user_id, connections in list(self._rooms.get(room_id, {}).items()):
+            for connection in list(connections):
+                yield user_id, connection
+
+    def user_connections(self, user_id: str) -> Iterator[OutboundConnection]:
+        for room_id in list(self.rooms_of(user_id)):
+            yield from list(self._rooms[room_id][user_id])
+
+    def online_users(self, room_id: str) -> List[Dict]:
+        return [
+            {
+                "user_id": user_id,
+                "user_name": self._names.get(user_id),
+                "devices": len(connections)
+            }
+            for user_id, connections in self._rooms.get(room_id, {}).items()
+        ]
+
+
+class RedisPresence:
+    """
+    Quem está em cada sala, somando os dispositivos de todos os workers.
+
+    Cada socket é um membro da sala no Redis com prazo de validade; o
+    worker renova os prazos das suas conexões a cada PRESENCE_HEARTBEAT_SECONDS
+    (heartbeat()). Conexões de um worker que caiu somem sozinhas depois de
+    PRESENCE_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        from ..config.redis_config import get_async_redis
+
+        self._redis = get_async_redis()
+        self._join = self._redis.register_script(_JOIN)
+        self._leave = self._redis.register_script(_LEAVE)
+        self._worker = uuid.uuid4().hex[:12]
+        # (sala, usuário, dispositivo) -> nome, das conexões deste worker
+        self._local: Dict[Tuple[str, str, str], str] = {}
+
+    @staticmethod
+    def _keys(room_id: str) -> List[str]:
+        return [f"presence:{{{room_id}}}", f"presence:{{{room_id}}}:names"]
+
+    def _device(self, connection: OutboundConnection) -> str:
+        return f"{self._worker}-{id(connection)}"
+
+    async def add(self, room_id: str, user_id: str, user_name: str, connection: OutboundConnection) -> bool:
+        """Registra a conexão. Retorna True se é o primeiro dispositivo do usuário na sala"""
+        device = self._device(connection)
+        self._local[(room_id, user_id, device)] = user_name
+
+        now = time.time()
+        first = await self._join(keys=self._keys(room_id), args=[
+            now, now + settings.PRESENCE_TTL_SECONDS, user_id, device, user_name, settings.PRESENCE_TTL_SECONDS
+        ])
+        return bool(int(first))
+
+    async def remove(self, room_id: str, user_id: str, connection: OutboundConnection) -> bool:
+        """Remove a conexão. Retorna True se o usuário não tem mais dispositivos na sala"""
+        device = self._device(connection)
+        if self._local.pop((room_id, user_id, device), None) is None:
+            return False
+
+        gone = await self._leave(keys=self._keys(room_id), args=[time.time(), user_id, device])
+        return bool(int(gone))
+
+    async def heartbeat(self):
+        """Renova o prazo das conexões deste worker (e as recoloca, se o Redis as perdeu)"""
+        if not self._local:
+            return
+
+        expires_at = time.time() + settings.PRESENCE_TTL_SECONDS
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for (room_id, user_id, device), user_name in list(self._local.items()):
+                room_key, names_key = self._keys(room_id)
+                pipe.zadd(room_key, {f"{user_id}|{device}": expires_at})
+                pipe.hset(names_key, user_id, user_name)
+                pipe.expire(room_key, settings.PRESENCE_TTL_SECONDS)
+                pipe.expire(names_key, settings.PRESENCE_TTL_SECONDS)
+            await pipe.execute()
+
+    async def _devices(self, room_id: str) -> Dict[str, int]:
+        """usuário -> dispositivos com prazo válido"""
+        room_key, _ = self._keys(room_id)
+        devices: Dict[str, int] = {}
+        for member in await self._redis.zrangebyscore(room_key, time.time(), "+inf"):
+            user_id = member.rsplit("|", 1)[0]
+            devices[user_id] = devices.get(user_id, 0) + 1
+        return devices
+
+    async def is_in_room(self, room_id: str, user_id: str) -> bool:
+        return user_id in await self._devices(room_id)
+
+    async def online_users(self, room_id: str) -> List[Dict]:
+        devices = await self._devices(room_id)
+        if not devices:
+            return []
+
+        _, names_key = self._keys(room_id)
+        names = await self._redis.hmget(names_key, list(devices))
+        return [
+            {
+                "user_id": user_id,
+                "user_name": name,
+                "devices": count
+            }
+            for (user_id, count), name in zip(devices.items(), names)
+        ]
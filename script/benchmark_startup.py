@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Pacotes pesados que só devem ser carregados na primeira exportação / relatório
+HEAVY_MODULES = ["matplotlib", "reportlab", "openpyxl", "numpy"]
+
+# Executado em um processo novo a cada rodada, para medir o import a frio
+CHILD = r"""
+import asyncio, json, resource, sys, time
+
+start = time.perf_counter()
+import app.main
+import_seconds = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+import httpx
+
+async def first_request():
+    # ASGITransport não executa o startup: mede só o caminho da requisição
+    transport = httpx.ASGITransport(app=app.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        response = await client.get(sys.argv[1])
+        return time.perf_counter() - start, response.status_code
+
+request_seconds, status = asyncio.run(first_request())
+
+print(json.dumps({
+    "import_seconds": import_seconds,
+    "request_seconds": request_seconds,
+    "status": status,
+    "rss_mb": rss_kb / 1024,
+    "heavy_loaded": [name for name in json.loads(sys.argv[2]) if name in sys.modules],
+}))
+"""
+
+
+def run_once(path: str) -> dict:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, path, json.dumps(HEAVY_MODULES)],
+        cwd=project_root,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark_startup(runs: int, path: str):
+    """
+    Mede o tempo de `import app.main`, a memória residente do processo e a
+    latência da primeira requisição. Precisa do mesmo ambiente da API
+    (.env, Ganache e contratos publicados), pois o import conecta no nó.
+    """
+    print(f"Executando {runs} rodadas (primeira requisição: GET {path})...")
+    samples = [run_once(path) for _ in range(runs)]
+
+    for name, key, unit in [
+        ("import app.main", "import_seconds", "ms"),
+        ("Primeira requisição", "request_seconds", "ms"),
+        ("RSS após o import", "rss_mb", "MB"),
+    ]:
+        values = [sample[key] * (1000 if unit == "ms" else 1) for sample in samples]
+        print(f"{name:<22} mediana {statistics.median(values):8.1f} {unit}   "
+              f"mín {min(values):8.1f} {unit}   máx {max(values):8.1f} {unit}")
+
+    loaded = sorted({name for sample in samples for name in sample["heavy_loaded"]})
+    print(f"Status da requisição: {samples[-1]['status']}")
+    print(f"Pacotes pesados carregados no startup: {', '.join(loaded) if loaded else 'nenhum'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização da API")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/health")
+    args = parser.parse_args()
+
+    benchmark_startup(args.runs, args.path)
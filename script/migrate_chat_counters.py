@@ -0,0 +1,56 @@
+import sys
+import os
+
+# Adicionar o diretório raiz do projeto ao Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import Integer, inspect, text
+
+from app.config.database import engine, SessionLocal
+from app.service.chat_service import ChatService
+
+COUNTERS = ["total_messages", "unread_client", "unread_provider"]
+
+
+def migrate_chat_counters():
+    """
+    Converte os contadores de chat_rooms (antes String) para INTEGER e os
+    recalcula a partir de chat_messages. O create_all não altera tabelas
+    existentes, então bancos criados antes da mudança precisam deste script.
+    Pode ser executado mais de uma vez
+    """
+    columns = {column["name"]: column["type"] for column in inspect(engine).get_columns("chat_rooms")}
+    pending = [name for name in COUNTERS if not isinstance(columns[name], Integer)]
+
+    with engine.begin() as conn:
+        for name in pending:
+            print(f"Convertendo chat_rooms.{name} para INTEGER...")
+
+            if engine.dialect.name == "postgresql":
+                conn.execute(text(f"ALTER TABLE chat_rooms ALTER COLUMN {name} DROP DEFAULT"))
+                conn.execute(text(
+                    f"ALTER TABLE chat_rooms ALTER COLUMN {name} TYPE INTEGER "
+                    f"USING COALESCE(NULLIF({name}, '')::integer, 0)"
+                ))
+                conn.execute(text(f"ALTER TABLE chat_rooms ALTER COLUMN {name} SET DEFAULT 0"))
+                conn.execute(text(f"ALTER TABLE chat_rooms ALTER COLUMN {name} SET NOT NULL"))
+            else:
+                # SQLite não muda o tipo de uma coluna: cria outra e troca o nome.
+                # Os valores vêm da reconciliação abaixo
+                conn.execute(text(f"ALTER TABLE chat_rooms ADD COLUMN {name}_int INTEGER NOT NULL DEFAULT 0"))
+                conn.execute(text(f"ALTER TABLE chat_rooms DROP COLUMN {name}"))
+                conn.execute(text(f"ALTER TABLE chat_rooms RENAME COLUMN {name}_int TO {name}"))
+
+    db = SessionLocal()
+    try:
+        fixed = ChatService(db).reconcile_counters()
+    finally:
+        db.close()
+
+    print(f"Colunas convertidas: {', '.join(pending) if pending else 'nenhuma'}")
+    print(f"Salas com contadores recalculados: {fixed}")
+
+
+if __name__ == "__main__":
+    migrate_chat_counters()
@@ -0,0 +1,64 @@
+import sys
+import os
+
+# Adicionar o diretório raiz do projeto ao Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import inspect, text
+
+from app.config.database import engine
+from app.model.chat_model import ChatRoom
+
+# Resumo desnormalizado da sala (título do job, participantes e última mensagem)
+SUMMARY_COLUMNS = [
+    "job_title",
+    "job_title_checked_at",
+    "client_name",
+    "client_email",
+    "provider_name",
+    "provider_email",
+    "last_message_id",
+    "last_message_preview",
+    "last_message_sender_name",
+]
+
+SUMMARY_INDEXES = [
+    "ix_chat_rooms_client_last_message",
+    "ix_chat_rooms_provider_last_message",
+]
+
+
+def migrate_chat_room_summary():
+    """
+    Adiciona a chat_rooms as colunas e índices do resumo das salas. O
+    create_all não altera tabelas existentes, então bancos criados antes da
+    mudança precisam deste script. As colunas começam vazias e são
+    preenchidas na primeira vez que a sala aparece na lista. Pode ser
+    executado mais de uma vez
+    """
+    table = ChatRoom.__table__
+    inspector = inspect(engine)
+    existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+    existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+
+    added_columns = [name for name in SUMMARY_COLUMNS if name not in existing_columns]
+    added_indexes = [name for name in SUMMARY_INDEXES if name not in existing_indexes]
+
+    with engine.begin() as conn:
+        for name in added_columns:
+            print(f"Adicionando chat_rooms.{name}...")
+            column_type = table.c[name].type.compile(dialect=engine.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"))
+
+        for index in table.indexes:
+            if index.name in added_indexes:
+                print(f"Criando índice {index.name}...")
+                index.create(conn)
+
+    print(f"Colunas adicionadas: {', '.join(added_columns) if added_columns else 'nenhuma'}")
+    print(f"Índices criados: {', '.join(added_indexes) if added_indexes else 'nenhum'}")
+
+
+if __name__ == "__main__":
+    migrate_chat_room_summary()
@@ -0,0 +1,39 @@
+import sys
+import os
+
+# Adicionar o diretório raiz do projeto ao Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import inspect, text
+
+from app.config.database import engine
+from app.model.export_job import ExportJob
+
+# Início da geração e sinal de vida do processo dono do job
+NEW_COLUMNS = ["started_at", "heartbeat_at"]
+
+
+def migrate_export_jobs():
+    """
+    Adiciona a export_jobs as colunas usadas pela limpeza das exportações
+    presas. O create_all não altera tabelas existentes, então bancos criados
+    antes da mudança precisam deste script. Registros antigos ficam com as
+    colunas vazias e a limpeza usa created_at no lugar do heartbeat. Pode ser
+    executado mais de uma vez
+    """
+    table = ExportJob.__table__
+    existing_columns = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    added_columns = [name for name in NEW_COLUMNS if name not in existing_columns]
+
+    with engine.begin() as conn:
+        for name in added_columns:
+            print(f"Adicionando export_jobs.{name}...")
+            column_type = table.c[name].type.compile(dialect=engine.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"))
+
+    print(f"Colunas adicionadas: {', '.join(added_columns) if added_columns else 'nenhuma'}")
+
+
+if __name__ == "__main__":
+    migrate_export_jobs()
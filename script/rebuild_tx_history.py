@@ -0,0 +1,35 @@
+import sys
+import os
+
+# Adicionar o diretório raiz do projeto ao Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.config.database import engine, SessionLocal
+from app.model.address_transaction import AddressTransaction
+from app.model.job_index import SyncCheckpoint
+from app.service.tx_history_indexer import TxHistoryIndexer
+
+
+def rebuild_tx_history():
+    """
+    Recria address_transactions com o esquema atual (log_index e
+    transferências internas) e zera o checkpoint; o indexador reprocessa os
+    blocos desde TX_HISTORY_START_BLOCK. O create_all não altera tabelas
+    existentes, e o histórico é só um índice derivado da blockchain
+    """
+    AddressTransaction.__table__.drop(engine, checkfirst=True)
+    AddressTransaction.__table__.create(engine)
+
+    db = SessionLocal()
+    try:
+        db.query(SyncCheckpoint).filter(SyncCheckpoint.name == TxHistoryIndexer.CHECKPOINT_NAME).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    print("Tabela address_transactions recriada; o histórico será reindexado pelo indexador")
+
+
+if __name__ == "__main__":
+    rebuild_tx_history()
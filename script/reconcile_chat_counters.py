@@ -0,0 +1,28 @@
+import sys
+import os
+
+# Adicionar o diretório raiz do projeto ao Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.config.database import SessionLocal
+from app.service.chat_service import ChatService
+
+
+def reconcile_chat_counters():
+    """
+    Recalcula total/não lidas de chat_rooms a partir de chat_messages e
+    corrige as salas que divergiram. Roda uma vez para o cluster inteiro
+    (ex: cron a cada hora), não em cada worker da API
+    """
+    db = SessionLocal()
+    try:
+        fixed = ChatService(db).reconcile_counters()
+    finally:
+        db.close()
+
+    print(f"Salas com contadores corrigidos: {fixed}")
+
+
+if __name__ == "__main__":
+    reconcile_chat_counters()